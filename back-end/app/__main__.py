@@ -0,0 +1,10 @@
+"""Server entry point: `python -m app`, run from back-end/.
+
+Kept apart from app.main because multiprocessing's spawn and forkserver
+workers re-import the entry module unless it is a package's __main__; the
+OCR pool workers then only import what they need (app.ocr), not the app.
+"""
+from .main import run
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,218 @@
+"""Content-addressed caches for /process analysis results and translations.
+
+Two tiers: a small in-memory LRU in front of a persistent SQLite table.
+Analysis entries are keyed by the SHA-256 of the uploaded bytes plus the
+request options and pipeline version, so re-uploads of the same report skip
+OCR, NER, summarization, Gemini and translation entirely. Translation
+entries are keyed by segment text, target language and backend.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Disk hits whose access time is written in one UPDATE batch
+TOUCH_BATCH = 256
+# Eviction frees space down to this fraction of max_bytes, LRU rows EVICT_BATCH at a time
+EVICT_TO = 0.9
+EVICT_BATCH = 256
+
+
+def content_hash(data):
+    """Return the hex SHA-256 digest of raw upload bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(digest, *parts):
+    """Build a cache key from a content digest and extra key parts."""
+    return ":".join([digest] + [str(p) for p in parts])
+
+
+class AnalysisCache:
+    """In-memory LRU backed by an SQLite table with size-based eviction."""
+
+    def __init__(self, db_path=None, memory_items=128, max_bytes=256 * 1024 * 1024, table="analysis_cache"):
+        if not table.isidentifier():
+            raise ValueError(f"invalid cache table name: {table!r}")
+        self.table = table
+        self.db_path = str(db_path) if db_path else None
+        self.memory_items = max(0, int(memory_items))
+        self.max_bytes = max(0, int(max_bytes))
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._touched = {}
+        self._disk_bytes = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        if self.db_path:
+            try:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    " key TEXT PRIMARY KEY,"
+                    " payload BLOB NOT NULL,"
+                    " size INTEGER NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " accessed_at REAL NOT NULL)"
+                )
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_accessed ON {table} (accessed_at)"
+                )
+                self._conn.commit()
+                self._disk_bytes = self._table_bytes()
+            except Exception as e:
+                print(f"Cache {table}: SQLite tier disabled ({e})")
+                self._conn = None
+
+    def _remember(self, key, value):
+        if not self.memory_items:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return json.loads(self._memory[key])
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        f"SELECT payload FROM {self.table} WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row:
+                        # accessed_at is written with the next store, not per read
+                        self._touched[key] = time.time()
+                        if len(self._touched) >= TOUCH_BATCH:
+                            self._flush_touched()
+                            self._conn.commit()
+                        payload = row[0]
+                        if isinstance(payload, bytes):
+                            payload = payload.decode("utf-8")
+                        self._remember(key, payload)
+                        self.stats["disk_hits"] += 1
+                        return json.loads(payload)
+                except Exception as e:
+                    print(f"Cache {self.table} read error: {e}")
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, value):
+        """Store a JSON-serializable value under key."""
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """Store (key, value) pairs in one transaction."""
+        rows = []
+        for key, value in items:
+            try:
+                rows.append((key, json.dumps(value)))
+            except (TypeError, ValueError) as e:
+                print(f"Cache {self.table}: value not serializable ({e})")
+        if not rows:
+            return
+        with self._lock:
+            for key, payload in rows:
+                self._remember(key, payload)
+            self.stats["stores"] += len(rows)
+            if self._conn is None:
+                return
+            now = time.time()
+            records = []
+            for key, payload in rows:
+                size = len(payload.encode("utf-8"))
+                if self.max_bytes and size > self.max_bytes:
+                    continue
+                records.append((key, payload, size, now, now))
+                self._touched.pop(key, None)
+            try:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (key, payload, size, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    records,
+                )
+                self._flush_touched()
+                self._disk_bytes += sum(r[2] for r in records)
+                self._evict()
+                self._conn.commit()
+            except Exception as e:
+                self._conn.rollback()
+                print(f"Cache {self.table} write error: {e}")
+
+    def _flush_touched(self):
+        """Write the access times of disk hits since the last flush (caller holds the lock and commits)."""
+        if self._touched:
+            self._conn.executemany(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _table_bytes(self):
+        return self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+
+    def _evict(self):
+        """Drop least-recently-used rows once the table outgrows max_bytes, down to EVICT_TO of it.
+
+        The byte total is kept in memory and only re-read from the table
+        after an eviction (other processes may share the file), so a store
+        normally costs no scan; the headroom left by EVICT_TO spreads
+        evictions out.
+        """
+        if not self.max_bytes or self._disk_bytes <= self.max_bytes:
+            return
+        self._disk_bytes = self._table_bytes()
+        target = int(self.max_bytes * EVICT_TO)
+        while self._disk_bytes > target:
+            rows = self._conn.execute(
+                f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                if self._disk_bytes <= target:
+                    break
+                victims.append((key,))
+                self._memory.pop(key, None)
+                self._disk_bytes -= size
+            self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+            self.stats["evictions"] += len(victims)
+
+    def info(self):
+        """Return counters and tier sizes for /healthz."""
+        with self._lock:
+            info = dict(self.stats)
+            info["memory_entries"] = len(self._memory)
+            info["persistent"] = self._conn is not None
+            if self._conn is not None:
+                try:
+                    count, total = self._conn.execute(
+                        f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+                    ).fetchone()
+                    info["disk_entries"] = count
+                    info["disk_bytes"] = total
+                except Exception:
+                    pass
+        lookups = info["memory_hits"] + info["disk_hits"] + info["misses"]
+        info["hit_rate"] = round((info["memory_hits"] + info["disk_hits"]) / lookups, 3) if lookups else None
+        return info
+
+
+def cache_from_env(default_path, prefix="ANALYSIS_CACHE", table="analysis_cache", memory_items=128, max_mb=256):
+    """Build a cache from <prefix>_ENABLED/_PATH/_MEMORY_ITEMS/_MAX_MB environment variables."""
+    if os.getenv(f"{prefix}_ENABLED", "true").lower() != "true":
+        return None
+    path = os.getenv(f"{prefix}_PATH", str(default_path))
+    memory_items = int(os.getenv(f"{prefix}_MEMORY_ITEMS", str(memory_items)))
+    max_mb = int(os.getenv(f"{prefix}_MAX_MB", str(max_mb)))
+    return AnalysisCache(path, memory_items=memory_items, max_bytes=max_mb * 1024 * 1024, table=table)
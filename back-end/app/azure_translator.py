@@ -0,0 +1,145 @@
+"""Pooled, batched client for the Azure Translator v3 API.
+
+One requests.Session keeps connections to the endpoint alive, and each
+request carries as many segments and target languages as the service
+allows (1000 texts, 50,000 characters counted once per target language).
+429 and 5xx answers are retried, honouring Retry-After.
+"""
+import os
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_ELEMENTS = 1000
+MAX_CHARS = 50000
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class AzureTranslator:
+    """Translate lists of segments into several languages per API call."""
+
+    def __init__(self, key, endpoint, region=None, timeout=30, max_retries=3, max_retry_after=30,
+                 pool_size=10, max_elements=MAX_ELEMENTS, max_chars=MAX_CHARS):
+        self.url = endpoint.rstrip("/") + "/translate"
+        self.timeout = timeout
+        self.max_retries = max(0, int(max_retries))
+        self.max_retry_after = max_retry_after
+        self.max_elements = max_elements
+        self.max_chars = max_chars
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Ocp-Apim-Subscription-Key": key, "Content-type": "application/json"})
+        if region:
+            self.session.headers["Ocp-Apim-Subscription-Region"] = region
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "segments": 0, "chars": 0, "throttled": 0, "retries": 0,
+                      "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+    def batches(self, segments, n_targets):
+        """Split segment indexes into request-sized groups (characters count once per target)."""
+        budget = max(1, self.max_chars // max(1, n_targets))
+        batch, chars = [], 0
+        for i, segment in enumerate(segments):
+            size = len(segment)
+            if batch and (len(batch) >= self.max_elements or chars + size > budget):
+                yield batch
+                batch, chars = [], 0
+            batch.append(i)
+            chars += size
+        if batch:
+            yield batch
+
+    def _retry_delay(self, response, attempt):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = min(self.max_retry_after, 0.5 * 2 ** attempt)
+        return min(self.max_retry_after, max(0.0, delay))
+
+    def _post(self, texts, targets):
+        params = [("api-version", "3.0"), ("from", "en")] + [("to", lang) for lang in targets]
+        body = [{"text": text} for text in texts]
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            response = None
+            try:
+                response = self.session.post(self.url, params=params, json=body, timeout=self.timeout,
+                                             headers={"X-ClientTraceId": str(uuid.uuid4())})
+                status = response.status_code
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                status, error = None, e
+            ms = (time.perf_counter() - start) * 1000
+            with self._stats_lock:
+                self.stats["requests"] += 1
+                self.stats["total_ms"] += ms
+                self.stats["max_ms"] = max(self.stats["max_ms"], ms)
+                if status == 429:
+                    self.stats["throttled"] += 1
+
+            if status is not None and status not in RETRYABLE_STATUS:
+                if status >= 400:
+                    with self._stats_lock:
+                        self.stats["errors"] += 1
+                response.raise_for_status()
+                with self._stats_lock:
+                    self.stats["segments"] += len(texts)
+                    self.stats["chars"] += sum(len(t) for t in texts) * len(targets)
+                return response.json()
+
+            if attempt >= self.max_retries:
+                with self._stats_lock:
+                    self.stats["errors"] += 1
+                if status is None:
+                    raise error
+                response.raise_for_status()
+            delay = self._retry_delay(response, attempt)
+            print(f"Azure Translator {'HTTP ' + str(status) if status else 'connection error'}; retrying in {delay:.1f}s")
+            with self._stats_lock:
+                self.stats["retries"] += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def translate(self, segments, targets):
+        """Return {target: [translation per segment]} using as few requests as the limits allow."""
+        out = {lang: [None] * len(segments) for lang in targets}
+        for batch in self.batches(segments, len(targets)):
+            result = self._post([segments[i] for i in batch], targets)
+            if len(result) != len(batch):
+                raise RuntimeError(f"Azure Translator returned {len(result)} results for {len(batch)} texts")
+            for i, item in zip(batch, result):
+                # translations come back in the order of the "to" parameters
+                for lang, translation in zip(targets, item["translations"]):
+                    out[lang][i] = translation["text"]
+        return out
+
+    def info(self):
+        """Call counts and latency for /healthz."""
+        with self._stats_lock:
+            info = dict(self.stats)
+        info["avg_ms"] = round(info.pop("total_ms") / info["requests"], 1) if info["requests"] else None
+        info["max_ms"] = round(info["max_ms"], 1)
+        return info
+
+
+def translator_from_env(timeout=30):
+    """Build the client from AZURE_TRANSLATOR_* settings, or None when Azure is not configured."""
+    key = os.getenv("AZURE_TRANSLATOR_KEY")
+    endpoint = os.getenv("AZURE_TRANSLATOR_ENDPOINT")
+    if not (key and endpoint):
+        return None
+    return AzureTranslator(
+        key,
+        endpoint,
+        region=os.getenv("AZURE_TRANSLATOR_REGION"),
+        timeout=timeout,
+        max_retries=int(os.getenv("AZURE_TRANSLATOR_MAX_RETRIES", "3")),
+        max_retry_after=float(os.getenv("AZURE_TRANSLATOR_MAX_RETRY_AFTER", "30")),
+        pool_size=int(os.getenv("AZURE_TRANSLATOR_POOL_SIZE", "10")),
+    )
@@ -0,0 +1,92 @@
+"""Cross-request micro-batching for model calls.
+
+Callers submit one input and block; a single worker thread collects inputs
+for up to max_wait_ms (or until max_batch_size are waiting) and runs them
+through the model in one call. Inputs are only batched together when their
+call options match.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Collect concurrent single-item calls into batched calls of fn(items, **options)."""
+
+    def __init__(self, fn, max_batch_size=8, max_wait_ms=15, name="batcher"):
+        self.fn = fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000.0)
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"batches": 0, "items": 0, "max_batch": 0}
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit_async(self, item, **options):
+        """Queue item and return a Future; cancelling it before its batch runs skips the item."""
+        fut = Future()
+        key = tuple(sorted(options.items()))
+        self._ensure_worker()
+        self._queue.put((item, key, options, fut))
+        return fut
+
+    def submit(self, item, timeout=None, **options):
+        """Queue item and wait for its result (re-raises the batch's exception)."""
+        return self.submit_async(item, **options).result(timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            groups = {}
+            for entry in batch:
+                if entry[3].set_running_or_notify_cancel():
+                    groups.setdefault(entry[1], []).append(entry)
+            for entries in groups.values():
+                items = [e[0] for e in entries]
+                try:
+                    results = self.fn(items, **entries[0][2])
+                    if len(results) != len(items):
+                        raise RuntimeError(f"{self.name}: expected {len(items)} results, got {len(results)}")
+                except Exception as e:
+                    for entry in entries:
+                        entry[3].set_exception(e)
+                    continue
+                for entry, result in zip(entries, results):
+                    entry[3].set_result(result)
+                with self._stats_lock:
+                    self.stats["batches"] += 1
+                    self.stats["items"] += len(items)
+                    self.stats["max_batch"] = max(self.stats["max_batch"], len(items))
+
+    def info(self):
+        """Batch counters for /healthz."""
+        with self._stats_lock:
+            info = dict(self.stats)
+        info["avg_batch"] = round(info["items"] / info["batches"], 2) if info["batches"] else None
+        info["max_batch_size"] = self.max_batch_size
+        info["max_wait_ms"] = int(self.max_wait * 1000)
+        return info
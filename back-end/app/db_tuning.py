@@ -0,0 +1,110 @@
+"""Database engine tuning: SQLite pragmas, pool settings and column/index back-fill.
+
+SQLite connections get WAL journaling (readers no longer block the writer),
+synchronous=NORMAL, a larger page cache, memory-mapped reads and a busy
+timeout, applied on every new connection. Server databases (DATABASE_URL)
+get configurable pool settings instead.
+"""
+import os
+
+from sqlalchemy import event, inspect
+from sqlalchemy.schema import CreateIndex
+
+
+def sqlite_pragmas_from_env():
+    """PRAGMA name -> value for each new SQLite connection (SQLITE_* overrides)."""
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        # Negative cache_size is in KiB
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-20000")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "temp_store": "MEMORY",
+    }
+
+
+def engine_options_from_env(database_uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database."""
+    if database_uri.startswith("sqlite"):
+        # The driver's own lock wait, in seconds; busy_timeout covers the same for SQLite itself
+        busy_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        return {"connect_args": {"timeout": busy_ms / 1000.0}}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Recycle before typical server/proxy idle cut-offs; pre_ping drops dead connections
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+
+def install_sqlite_pragmas(engine, pragmas=None):
+    """Apply pragmas on every new connection of a SQLite engine (no-op for other backends)."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas_from_env() if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def sqlite_settings(engine):
+    """Current values of the tuned pragmas, for /healthz."""
+    if engine.dialect.name != "sqlite":
+        return None
+    with engine.connect() as conn:
+        return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in sqlite_pragmas_from_env()}
+
+
+def ensure_columns(engine, metadata):
+    """Add nullable columns declared on the models but missing from existing tables.
+
+    Like ensure_indexes, this stands in for migrations on databases created
+    before a column was added; only the column and its type are added.
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}')
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def ensure_indexes(engine, metadata):
+    """Create indexes declared on the models but missing from existing tables.
+
+    create_all() only creates indexes together with new tables, and the app
+    has no migrations, so databases created before an index was added need this.
+    Runs at every startup; CREATE INDEX IF NOT EXISTS keeps it safe when
+    several processes start against the same database at once.
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    created = []
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+                    created.append(index.name)
+    return created
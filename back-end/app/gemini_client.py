@@ -0,0 +1,233 @@
+"""Resilient access to Gemini.
+
+Every call goes through one shared google.genai client (so its HTTP
+connection pool is reused) and is guarded by:
+- a deadline covering all attempts, with a per-attempt timeout,
+- retries with exponential backoff and full jitter for 429/5xx/transport errors,
+- a token bucket limiting the request rate, and a cap on concurrent calls,
+- a circuit breaker that skips Gemini for a while after repeated failures.
+
+GEMINI_BASE_URL points the client at another endpoint, such as the local stub in
+benchmarks/bench_gemini_client.py.
+"""
+import os
+import random
+import threading
+import time
+
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class GeminiUnavailable(RuntimeError):
+    """Gemini was not called or gave up: breaker open, rate limited or out of time."""
+
+
+class TokenBucket:
+    """Allow rate tokens per second with bursts up to capacity."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=0.0):
+        """Take one token, waiting up to timeout seconds; return False if none became free."""
+        end = time.monotonic() + max(0.0, timeout)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else float("inf")
+            if now + wait > end:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Open after failure_threshold consecutive failures; let one trial call through after reset_seconds."""
+
+    def __init__(self, failure_threshold=5, reset_seconds=30):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """Whether a call may go out now (only one trial call at a time while half-open)."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def release_trial(self):
+        """Give up a half-open trial slot without a verdict (the call never went out)."""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._trial:
+                    print(f"Gemini circuit opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+def is_retryable(error):
+    """Retry rate limits, server errors and transport failures; not bad requests."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_CODES
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        import httpx
+        return isinstance(error, httpx.TransportError)
+    except ImportError:
+        return False
+
+
+class GeminiGateway:
+    """Deadline-, rate- and breaker-guarded generate_content calls on a shared client."""
+
+    def __init__(self, client, model, timeout=15.0, max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                 rate_per_minute=60, burst=10, max_concurrency=4, breaker=None):
+        self.client = client
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self.slots = threading.BoundedSemaphore(max(1, int(max_concurrency)))
+        self.breaker = breaker or CircuitBreaker()
+        self._stats_lock = threading.Lock()
+        self.stats = {"calls": 0, "ok": 0, "failed": 0, "retries": 0, "rejected": 0,
+                      "total_ms": 0.0, "last_error": None}
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def available(self):
+        """False while the circuit breaker is open (callers can skip Gemini entirely)."""
+        return self.breaker.state != "open"
+
+    def _attempt(self, prompt, timeout):
+        from google.genai import types
+        config = types.GenerateContentConfig(http_options=types.HttpOptions(timeout=int(timeout * 1000)))
+        start = time.perf_counter()
+        try:
+            response = self.client.models.generate_content(model=self.model, contents=prompt, config=config)
+            return response.text
+        finally:
+            self._count("total_ms", (time.perf_counter() - start) * 1000)
+
+    def generate(self, prompt, deadline=30.0):
+        """Return the response text, or raise GeminiUnavailable / the final API error."""
+        end = time.monotonic() + deadline
+        if not self.available():
+            self._count("rejected")
+            raise GeminiUnavailable("Gemini circuit breaker is open")
+        if not self.slots.acquire(timeout=max(0.0, end - time.monotonic())):
+            self._count("rejected")
+            raise GeminiUnavailable("too many concurrent Gemini calls")
+        try:
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise GeminiUnavailable("Gemini circuit breaker is open")
+            attempt = 0
+            while True:
+                if not self.bucket.acquire(timeout=max(0.0, end - time.monotonic())):
+                    self._count("rejected")
+                    self.breaker.release_trial()
+                    raise GeminiUnavailable("Gemini client rate limit reached")
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    self.breaker.release_trial()
+                    raise GeminiUnavailable(f"Gemini deadline of {deadline}s exceeded")
+                self._count("calls")
+                try:
+                    text = self._attempt(prompt, min(self.timeout, remaining))
+                except Exception as e:
+                    with self._stats_lock:
+                        self.stats["last_error"] = f"{type(e).__name__}: {e}"[:200]
+                    attempt += 1
+                    # Full jitter: sleep a random amount up to the exponential backoff
+                    backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+                    if not is_retryable(e) or attempt > self.max_retries or time.monotonic() + backoff >= end:
+                        self._count("failed")
+                        self.breaker.record_failure()
+                        raise
+                    self._count("retries")
+                    time.sleep(backoff)
+                    continue
+                self._count("ok")
+                self.breaker.record_success()
+                return text
+        finally:
+            self.slots.release()
+
+    def info(self):
+        """Call counters, latency and breaker state for /healthz."""
+        with self._stats_lock:
+            info = dict(self.stats)
+        info["avg_ms"] = round(info.pop("total_ms") / info["calls"], 1) if info["calls"] else None
+        info["breaker"] = self.breaker.state
+        info["consecutive_failures"] = self.breaker.failures
+        return info
+
+
+def gateway_from_env(api_key, model):
+    """Build the shared client and gateway from GEMINI_* environment variables."""
+    import google.genai as genai
+    from google.genai import types
+
+    http_options = {"timeout": int(float(os.getenv("GEMINI_TIMEOUT", "15")) * 1000)}
+    base_url = os.getenv("GEMINI_BASE_URL")
+    if base_url:
+        http_options["base_url"] = base_url
+    client = genai.Client(api_key=api_key, http_options=types.HttpOptions(**http_options))
+    breaker = CircuitBreaker(
+        failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURES", "5")),
+        reset_seconds=float(os.getenv("GEMINI_BREAKER_RESET", "30")),
+    )
+    return GeminiGateway(
+        client,
+        model,
+        timeout=float(os.getenv("GEMINI_TIMEOUT", "15")),
+        max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "3")),
+        backoff_base=float(os.getenv("GEMINI_BACKOFF_BASE", "0.5")),
+        backoff_max=float(os.getenv("GEMINI_BACKOFF_MAX", "8")),
+        rate_per_minute=float(os.getenv("GEMINI_RATE_PER_MIN", "60")),
+        burst=int(os.getenv("GEMINI_BURST", "10")),
+        max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")),
+        breaker=breaker,
+    )
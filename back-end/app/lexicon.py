@@ -0,0 +1,139 @@
+"""Lexicon-driven text matching: term simplification and dictionary lookups.
+
+Phrases are indexed by their word tokens, and text is scanned once left to
+right, taking the longest phrase that starts at each word. Each word costs a
+few dictionary lookups no matter how many terms the lexicon holds, so
+thousands of entries cost about the same as a handful.
+"""
+import os
+import re
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Words, keeping internal apostrophes and hyphens ("x-ray", "crohn's")
+WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['\-][A-Za-z0-9]+)*")
+
+
+def load_tsv(path):
+    """Yield the tab-separated fields of each non-blank, non-comment line."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            yield [field.strip() for field in line.split("\t")]
+
+
+def load_lexicons(paths, min_fields=2):
+    """Merge (term, value) pairs from one or more TSV files; later files win."""
+    mapping = {}
+    for path in paths:
+        for fields in load_tsv(path):
+            if len(fields) >= min_fields and fields[0] and fields[1]:
+                mapping[fields[0]] = fields[1]
+    return mapping
+
+
+def lexicon_paths(env_var, default_name):
+    """Lexicon files from env_var (os.pathsep-separated), else the bundled default."""
+    configured = os.getenv(env_var)
+    if configured:
+        return [p for p in configured.split(os.pathsep) if p]
+    return [os.path.join(DATA_DIR, default_name)]
+
+
+class PhraseIndex:
+    """Longest-match lookup of (multi-word) phrases over word tokens."""
+
+    def __init__(self, mapping):
+        self._phrases = {}
+        self._prefixes = set()
+        self.max_words = 1
+        for phrase, value in mapping.items():
+            words = tuple(w.lower() for w in WORD_RE.findall(phrase))
+            if not words:
+                continue
+            self._phrases[words] = value
+            self.max_words = max(self.max_words, len(words))
+            for n in range(1, len(words)):
+                self._prefixes.add(words[:n])
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def items(self):
+        """(phrase, value) pairs, phrases as lower-case words joined by spaces."""
+        return ((" ".join(words), value) for words, value in self._phrases.items())
+
+    def finditer(self, text):
+        """Yield (start, end, value) for non-overlapping longest matches, left to right.
+
+        Words of a multi-word phrase must be separated by whitespace only.
+        """
+        tokens = [(m.start(), m.end(), m.group().lower()) for m in WORD_RE.finditer(text)]
+        i, count = 0, len(tokens)
+        while i < count:
+            best = None
+            key = ()
+            for j in range(i, min(i + self.max_words, count)):
+                if j > i and not text[tokens[j - 1][1]:tokens[j][0]].isspace():
+                    break
+                key += (tokens[j][2],)
+                if key in self._phrases:
+                    best = j
+                if key not in self._prefixes:
+                    break
+            if best is None:
+                i += 1
+                continue
+            yield tokens[i][0], tokens[best][1], self._phrases[key[:best - i + 1]]
+            i = best + 1
+
+
+class TermSimplifier:
+    """Replace technical terms with plain-language equivalents in one pass."""
+
+    def __init__(self, mapping):
+        self.index = PhraseIndex(mapping)
+
+    def __len__(self):
+        return len(self.index)
+
+    def unstable(self):
+        """Terms whose plain wording would itself be rewritten, e.g. "ldl" -> "bad cholesterol" -> "bad blood fat"."""
+        return sorted(term for term, plain in self.index.items() if self.simplify(plain) != plain)
+
+    def simplify(self, text):
+        out, pos = [], 0
+        for start, end, plain in self.index.finditer(text):
+            out.append(text[pos:start])
+            # Keep sentence-initial capitals ("Edema" -> "Swelling caused by fluid")
+            out.append(plain[:1].upper() + plain[1:] if text[start].isupper() else plain)
+            pos = end
+        out.append(text[pos:])
+        return "".join(out)
+
+
+class EntityMatcher:
+    """Dictionary entity recognizer: labelled spans for every lexicon term, in one pass."""
+
+    def __init__(self, mapping):
+        # Report the lexicon spelling, so "HBA1C" and "hba1c" in a report both come out as "HbA1c"
+        self.index = PhraseIndex({term: (label.upper(), term) for term, label in mapping.items()})
+
+    def __len__(self):
+        return len(self.index)
+
+    def spans(self, text):
+        """Return [{"start", "end", "text", "term", "label"}] in text order."""
+        return [
+            {"start": start, "end": end, "text": text[start:end], "term": term, "label": label}
+            for start, end, (label, term) in self.index.finditer(text)
+        ]
+
+    def group(self, text):
+        """Return {label: [term, ...]} with each term once, in order of first mention."""
+        grouped = {}
+        for _, _, (label, term) in self.index.finditer(text):
+            grouped.setdefault(label, {})[term[:1].upper() + term[1:]] = None
+        return {label: list(terms) for label, terms in grouped.items()}
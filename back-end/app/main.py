@@ -1,11 +1,22 @@
+import time
+_import_started = time.perf_counter()
+
+if __name__ == "__main__":
+    # As the entry module this would be re-imported by every spawned OCR worker
+    raise SystemExit("Start the server with `python -m app` from back-end/")
+
 import os
+import re
 import tempfile
 import shutil
 import uuid
+import socket
 import sys
+import base64
+import hashlib
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import cv2
-import numpy as np
+from urllib.parse import urlencode
 
 # Paths for reorganized structure
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,38 +54,89 @@ except Exception:
     pass
 
 import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
 import requests
-import time
+
+# load .env if present (before any configuration is read)
+load_dotenv()
 
 # Configuration
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff'}
 REQUEST_TIMEOUT = 30  # seconds for external API calls
+SUMMARIZER_MODEL = "sshleifer/distilbart-cnn-12-6"
+GEMINI_MODEL = "gemini-1.5-flash"
+# Bump to invalidate cached analyses after prompt/post-processing changes
+PIPELINE_VERSION = os.getenv("PIPELINE_VERSION", "2")
+# NER runs over chunks of this many characters, NER_BATCH_SIZE chunks per batch
+NER_CHUNK_CHARS = int(os.getenv("NER_CHUNK_CHARS", "5000"))
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "8"))
+NER_N_PROCESS = int(os.getenv("NER_N_PROCESS", "1"))
+NER_COMPONENTS = ("tok2vec", "transformer", "ner")
+# Concurrent summarization requests are batched: up to SUMMARY_BATCH_MAX inputs
+# collected for at most SUMMARY_BATCH_WAIT_MS (SUMMARY_BATCH_MAX=1 disables batching)
+SUMMARY_BATCH_MAX = int(os.getenv("SUMMARY_BATCH_MAX", "8"))
+SUMMARY_BATCH_WAIT_MS = int(os.getenv("SUMMARY_BATCH_WAIT_MS", "15"))
+# Long reports: "mapreduce" summarizes every chunk then the chunk summaries;
+# "truncate" keeps the old first-1000-words behaviour
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "mapreduce").lower()
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "900"))  # distilbart window is 1024
+SUMMARY_CHUNK_MAX_LEN = int(os.getenv("SUMMARY_CHUNK_MAX_LEN", "100"))
+SUMMARY_MAX_CHUNKS = int(os.getenv("SUMMARY_MAX_CHUNKS", "16"))  # chunks sent to the model per batch
+SUMMARY_TIME_BUDGET = float(os.getenv("SUMMARY_TIME_BUDGET", "60"))
+# Sentences per padded MarianMT generate() call
+TRANSLATION_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", "16"))
+# Sentences longer than this are translated in pieces (MarianMT sees at most 512 tokens)
+TRANSLATION_SEGMENT_CHARS = int(os.getenv("TRANSLATION_SEGMENT_CHARS", "1000"))
+# Languages one /process call may ask for via translate_to
+TRANSLATION_MAX_TARGETS = int(os.getenv("TRANSLATION_MAX_TARGETS", "5"))
+# "background" binds immediately and loads models in a thread; "sync" loads them at import
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "background").lower()
+# How long a request waits for warmup before getting a 503 with Retry-After
+MODEL_WAIT_SECONDS = float(os.getenv("MODEL_WAIT_SECONDS", "20"))
+# Threads shared by the concurrent analysis stages of all requests
+STAGE_WORKERS = int(os.getenv("STAGE_WORKERS", "8"))
+# Seconds Gemini gets alone before local NER/summarization start
+GEMINI_HEAD_START = float(os.getenv("GEMINI_HEAD_START", "0"))
+# Seconds after which a pending Gemini answer is ignored in favour of local results
+GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE", "20"))
 
 # Global AI Models
 nlp = None
 summarizer = None
-translation_models = {}
-translation_lock = threading.Lock()
-
-# load .env if present
-load_dotenv()
-
-import google.genai as genai
 client = None
-if os.getenv("GEMINI_API_KEY"):
-    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-    print("Gemini API configured.")
-else:
-    print("WARNING: GEMINI_API_KEY not found in environment.")
+
+models_ready = threading.Event()
+warmup_state = {"mode": MODEL_WARMUP, "status": "pending", "seconds": None, "error": None}
 
 from flask_cors import CORS
-from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, OperationalError, SQLAlchemyError
+from sqlalchemy import event
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import load_only, selectinload
+
+from .analysis_cache import cache_from_env, content_hash, make_key
+from .azure_translator import translator_from_env
+from .batching import MicroBatcher
+from .report_search import search_backend_for
+from .db_tuning import engine_options_from_env, ensure_columns, ensure_indexes, install_sqlite_pragmas, sqlite_settings
+from .gemini_client import GeminiUnavailable, gateway_from_env
+from .lexicon import EntityMatcher, TermSimplifier, lexicon_paths, load_lexicons
+from .ocr import image_to_text, pdf_to_text, ocr_pool_info, OCR_PREPROCESS, OCR_PROFILES
+from .ocr_engines import ocr_engine_info
+from .text_store import compress_text, decompress_text, text_digest
+from .translation_models import marian_model_name, preload_languages, registry_from_env
+
+# MarianMT models, loaded per target language within TRANSLATION_MODELS_MAX_MB
+translation_models = registry_from_env()
+# Pooled, batched Azure Translator client (None unless AZURE_TRANSLATOR_KEY/ENDPOINT are set)
+azure_translator = translator_from_env(timeout=REQUEST_TIMEOUT)
 
 app = Flask(__name__)
-CORS(app)
+# Let browser clients read the pagination and caching headers of /reports
+CORS(app, expose_headers=["ETag", "X-Next-Cursor", "Link"])
 
 
 def load_models():
@@ -122,15 +184,65 @@ def load_models():
             print("Install 'torch' or 'tensorflow' in the backend virtualenv to enable summarization.")
         else:
             # specify a stable summarization model explicitly to avoid default-model warnings
-            summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6", framework=("pt" if backend == "pt" else "tf"))
+            summarizer = pipeline("summarization", model=SUMMARIZER_MODEL, framework=("pt" if backend == "pt" else "tf"))
             print(f"Loaded Summarization pipeline with backend={backend}")
     except Exception as e:
         print(f"Failed to load summarization pipeline: {e}")
         summarizer = None
 
 
+def init_gemini_client():
+    """Create the Gemini client (google.genai is slow to import, so this runs during warmup).
+
+    client is a GeminiGateway: one pooled connection with deadlines, retries,
+    rate limiting and a circuit breaker (see gemini_client.py).
+    """
+    global client
+    if os.getenv("GEMINI_API_KEY"):
+        client = gateway_from_env(os.getenv("GEMINI_API_KEY"), GEMINI_MODEL)
+        print("Gemini API configured.")
+    else:
+        print("WARNING: GEMINI_API_KEY not found in environment.")
+
+
+def warm_up_models():
+    """Load the Gemini client and local models, then mark the app ready."""
+    warmup_state["status"] = "loading"
+    start = time.perf_counter()
+    try:
+        init_gemini_client()
+        load_models()
+        translation_models.preload([marian_model_name(lang) for lang in preload_languages()])
+        warmup_state["status"] = "ready"
+    except Exception as e:
+        # Requests still run on the keyword/extractive fallbacks
+        print(f"Model warmup failed: {e}")
+        warmup_state["status"] = "failed"
+        warmup_state["error"] = str(e)
+    finally:
+        warmup_state["seconds"] = round(time.perf_counter() - start, 2)
+        print(f"Model warmup finished in {warmup_state['seconds']}s ({warmup_state['status']})")
+        models_ready.set()
+
+
+def models_unavailable_response():
+    """Wait up to MODEL_WAIT_SECONDS for warmup; return a 503 response if it is still running."""
+    if models_ready.wait(MODEL_WAIT_SECONDS):
+        return None
+    retry_after = max(5, int(warmup_state.get("seconds") or MODEL_WAIT_SECONDS))
+    resp = jsonify({
+        "error": "The AI models are still loading. Please try again shortly.",
+        "retry_after": retry_after,
+    })
+    resp.headers["Retry-After"] = str(retry_after)
+    return resp, 503
+
+
 # Initialize models on startup
-load_models()
+if MODEL_WARMUP == "sync":
+    warm_up_models()
+else:
+    threading.Thread(target=warm_up_models, name="model-warmup", daemon=True).start()
 
 
 @app.route("/")
@@ -166,237 +278,95 @@ def validate_file(file):
     return True, None
 
 
-def image_to_text(image_path):
-    """OCR an image using local Tesseract (preferred) or Google Vision if configured.
-
-    Returns extracted text or raises RuntimeError with actionable instructions.
-    """
-    # Try local Tesseract first
-    try:
-        from PIL import Image
-        import pytesseract
-    except Exception:
-        pytesseract = None
-
-    if pytesseract:
-        try:
-            # ensure binary available
-            from shutil import which
-
-            if not which("tesseract"):
-                raise RuntimeError(
-                    "Tesseract binary not found. Install tesseract (conda-forge or brew) and ensure it's on PATH."
-                )
-
-            # Preprocess image for better OCR
-            img_cv = cv2.imread(image_path)
-            if img_cv is not None:
-                # Convert to grayscale
-                gray = cv2.cvtColor(img_cv, cv2.COLOR_BGR2GRAY)
-                # Denoise
-                denoised = cv2.fastNlMeansDenoising(gray, h=10)
-                # Adaptive thresholding
-                thresh = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-                
-                # Save preprocessed image back to tmp for tesseract
-                processed_path = image_path + ".processed.jpg"
-                cv2.imwrite(processed_path, thresh)
-                img = Image.open(processed_path)
-            else:
-                img = Image.open(image_path)
-
-            # Use configured TESSDATA_PREFIX if set, else rely on system defaults
-            # Optimized config: --oem 3 (Default) --psm 3 (Fully auto page segmentation)
-            config = "--oem 3 --psm 3"
-            tess_prefix = os.getenv("TESSDATA_PREFIX")
-            if tess_prefix:
-                config += f' --tessdata-dir "{tess_prefix}"'
-            
-            text = pytesseract.image_to_string(img, config=config)
-            if text and text.strip():
-                return text
-        except Exception as e:
-            # continue to optional fallback
-            print(f"pytesseract error: {e}")
-
-    # Optional: Google Vision if ADC is configured
-    try:
-        if os.getenv("GOOGLE_APPLICATION_CREDENTIALS") or os.getenv("GOOGLE_API_KEY"):
-            from google.cloud import vision
-            import io
-
-            client = vision.ImageAnnotatorClient()
-            with io.open(image_path, 'rb') as image_file:
-                content = image_file.read()
-            image = vision.Image(content=content)
-            response = client.text_detection(image=image)
-            if response.error.message:
-                raise RuntimeError(response.error.message)
-            texts = response.text_annotations
-            if texts:
-                return texts[0].description
-    except Exception as ge:
-        print(f"Google Vision error: {ge}")
-
-    # Optional fallback: EasyOCR (pure-python reader, requires torch). Try if installed.
-    try:
-        import easyocr
-        reader = easyocr.Reader(['en'], gpu=False)
-        results = reader.readtext(image_path)
-        if results:
-            # results are (bbox, text, confidence)
-            text = "\n".join([r[1] for r in results if r and len(r) > 1])
-            if text.strip():
-                return text
-    except Exception as ee:
-        # don't fail here; easyocr may not be installed or may fail without GPU/torch
-        print(f"EasyOCR fallback error: {ee}")
-
-    raise RuntimeError(
-        "OCR failed: no usable OCR method succeeded.\n"
-        "- Install tesseract and the language data (eng). Example: conda install -c conda-forge tesseract\n"
-        "- Or configure Google Vision by setting GOOGLE_APPLICATION_CREDENTIALS to a service-account JSON."
-    )
-
-
-def pdf_to_text(pdf_path):
-    """Convert PDF to images and OCR each page using pdf2image + Tesseract.
-
-    Falls back to PyPDF2 for text-based PDFs.
-    """
-    # Try selectable text extraction (PyPDF2) first as it's faster and cleaner if text exists
-    pypdf_text = ""
-    num_pages = None
-    try:
-        from PyPDF2 import PdfReader
-        reader = PdfReader(pdf_path)
-        pages_text = []
-        for page in reader.pages:
-            try:
-                pages_text.append(page.extract_text() or "")
-            except Exception:
-                pages_text.append("")
-        pypdf_text = "\n\n".join(pages_text).strip()
-        try:
-            num_pages = len(reader.pages)
-        except Exception:
-            num_pages = None
-    except Exception:
-        pass
+def chunk_text(text, max_chars):
+    """Split text into chunks of at most max_chars, preferring page, paragraph and line breaks."""
+    import re
+    if len(text) <= max_chars:
+        return [text] if text.strip() else []
+
+    pieces = []
+
+    def split(segment, separators):
+        if len(segment) <= max_chars:
+            pieces.append(segment)
+            return
+        if not separators:
+            # No natural boundary left: cut on whitespace
+            words, current = segment.split(), ""
+            for word in words:
+                if current and len(current) + 1 + len(word) > max_chars:
+                    pieces.append(current)
+                    current = word
+                else:
+                    current = f"{current} {word}" if current else word
+            if current:
+                pieces.append(current)
+            return
+        for part in re.split(separators[0], segment):
+            split(part, separators[1:])
+
+    # Pages, then lines, then sentence ends (keeping the punctuation)
+    split(text, [r"\n\n", r"\n", r"(?<=[.!?])\s+"])
+
+    # Re-pack small pieces so each chunk is close to max_chars
+    chunks, current = [], ""
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
 
-    # If PyPDF2 worked and got meaningful text, return it (lower threshold for short reports)
-    if pypdf_text and len(pypdf_text) > 30:
-        return pypdf_text
 
-    # Otherwise, try OCR (pdf2image + tesseract) with optimized settings
+def load_entity_matcher():
+    """Build the fallback entity matcher from the TSV entity lexicon(s)."""
+    paths = lexicon_paths("ENTITY_LEXICON_PATH", "entity_lexicon.tsv")
     try:
-        from pdf2image import convert_from_path, exceptions as pdf2image_exceptions
-
-        # Higher DPI for better accuracy (300 is standard for OCR)
-        dpi = int(os.getenv('PDF_DPI', '300'))
-        # Cap pages to process to avoid long-running requests (can be tuned via env)
-        max_pages = int(os.getenv('MAX_PDF_PAGES', '8'))
-        poppler_path = None
-        try:
-            from shutil import which
-            if which('pdftoppm'):
-                poppler_path = os.path.dirname(which('pdftoppm'))
-        except Exception:
-            poppler_path = None
-
-        # If we know page count and it's large, limit pages
-        pages_to_process = None
-        if num_pages and num_pages > max_pages:
-            pages_to_process = list(range(0, min(num_pages, max_pages)))
+        matcher = EntityMatcher(load_lexicons(paths))
+        print(f"Loaded {len(matcher)} entity lexicon terms")
+        return matcher
+    except Exception as e:
+        print(f"Failed to load entity lexicon {paths}: {e}")
+        return EntityMatcher({})
 
-        images = convert_from_path(pdf_path, dpi=dpi, thread_count=1, poppler_path=poppler_path)
 
-        pages_text = []
-        # Only process up to configured page cap
-        for idx, img in enumerate(images):
-            if pages_to_process is not None and idx not in pages_to_process:
-                break
-            tmp_path = None
-            try:
-                with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp_img:
-                    tmp_path = tmp_img.name
-                    img.save(tmp_path, 'JPEG')
-                text = image_to_text(tmp_path)
-                pages_text.append(text)
-            except Exception as page_e:
-                pages_text.append(f"[page error: {page_e}]")
-            finally:
-                if tmp_path and os.path.exists(tmp_path):
-                    try:
-                        os.unlink(tmp_path)
-                    except Exception:
-                        pass
-        ocr_text = "\n\n".join(pages_text).strip()
-        if ocr_text:
-            return ocr_text
-    except Exception as e:
-        print(f"OCR attempt failed: {e}")
-    
-    # Final fallback: return whatever PyPDF2 got, even if small
-    if pypdf_text:
-        return pypdf_text
-        
-    # If we got here, everything failed. Let's find out why.
-    error_details = []
-    if not pypdf_text:
-        error_details.append("Text extraction (PyPDF2) returned no text.")
-    
-    # Check for binaries specifically to give clear instructions
-    from shutil import which
-    if not which("pdftoppm"):
-        error_details.append("Missing 'poppler' (pdftoppm). Required for scanned PDFs.")
-    if not which("tesseract"):
-        error_details.append("Missing 'tesseract'. Required for OCR.")
-        
-    error_msg = " | ".join(error_details)
-    raise RuntimeError(f"PDF Analysis Failed: {error_msg}. Please ensure your PDF is not a scanned image, or install 'poppler' and 'tesseract' for OCR support.")
+entity_matcher = load_entity_matcher()
 
 
 def extract_entities(text):
-    """Extract medical entities using global SciSpaCy model."""
+    """Extract medical entities using global SciSpaCy model.
+
+    Without SciSpaCy, terms from the entity lexicon are matched instead.
+    Long documents are chunked on page/paragraph boundaries and streamed
+    through nlp.pipe with only the NER-related components enabled.
+    """
     from collections import defaultdict
-    
-    findings = defaultdict(set)
-    
+
     if nlp is None:
-        # FALLBACK: Keyword based extraction
-        import re
-        keywords = {
-            "DISEASE": ["diabetes", "hypertension", "anemia", "infection", "cancer", "tumor", "fever", "cough", "asthma"],
-            "CHEMICAL": ["glucose", "hemoglobin", "cholesterol", "insulin", "aspirin", "penicillin", "vitamin"],
-            "ANATOMY": ["heart", "lung", "liver", "kidney", "blood", "brain", "stomach"],
-        }
-        text_lower = text.lower()
-        for label, words in keywords.items():
-            for word in words:
-                if re.search(r'\b' + word + r'\b', text_lower):
-                    findings[label].add(word.capitalize())
-        
-        # Format as list for JSON response
-        return {k: list(v) for k, v in findings.items()}
+        # FALLBACK: dictionary lookup over the entity lexicon, one pass over the text
+        return entity_matcher.group(text)
 
     try:
-        # Limit text length to avoid processing issues
-        max_chars = 100000
-        if len(text) > max_chars:
-            text = text[:max_chars]
-        
-        # Run the pipeline and collect entities
-        doc = nlp(text)
+        chunks = chunk_text(text, NER_CHUNK_CHARS)
+        # Only run what NER needs (shared embeddings + ner); skip parser, tagger, etc.
+        disabled = [name for name in nlp.pipe_names if name not in NER_COMPONENTS]
+
+        # Run the pipeline over all chunks and collect entities
         grouped = defaultdict(list)
-        for ent in getattr(doc, "ents", []):
-            label = getattr(ent, "label_", "")
-            if label.upper() in ("DISEASE", "CONDITION", "SYMPTOM"):
-                grouped['Diseases & Symptoms'].append(ent.text)
-            elif label.upper() in ("CHEMICAL", "MEDICATION", "DRUG"):
-                grouped['Medications'].append(ent.text)
-            else:
-                grouped['Other'].append(f"{ent.text} ({label})")
+        for doc in nlp.pipe(chunks, batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS, disable=disabled):
+            for ent in getattr(doc, "ents", []):
+                label = getattr(ent, "label_", "")
+                if label.upper() in ("DISEASE", "CONDITION", "SYMPTOM"):
+                    grouped['Diseases & Symptoms'].append(ent.text)
+                elif label.upper() in ("CHEMICAL", "MEDICATION", "DRUG"):
+                    grouped['Medications'].append(ent.text)
+                else:
+                    grouped['Other'].append(f"{ent.text} ({label})")
 
         return {k: list(dict.fromkeys(v)) for k, v in grouped.items()}
     except Exception as e:
@@ -479,55 +449,150 @@ def prettify_entities(entities):
     return pretty
 
 
+def load_term_simplifier():
+    """Build the terminology simplifier from the TSV lexicon(s)."""
+    paths = lexicon_paths("SIMPLIFY_LEXICON_PATH", "simplification_lexicon.tsv")
+    try:
+        simplifier = TermSimplifier(load_lexicons(paths))
+        print(f"Loaded {len(simplifier)} simplification terms")
+        unstable = simplifier.unstable()
+        if unstable:
+            print(f"WARNING: plain wording of these simplification terms contains other terms: {', '.join(unstable)}")
+        return simplifier
+    except Exception as e:
+        print(f"Failed to load simplification lexicon {paths}: {e}")
+        return TermSimplifier({})
+
+
+term_simplifier = load_term_simplifier()
+
+
 def simplify_medical_text(text):
-    """Convert technical medical terms into simple, patient-friendly language."""
-    simplification_map = {
-        r'\bhypertension\b': 'high blood pressure',
-        r'\bdiabetes mellitus\b': 'diabetes (high blood sugar)',
-        r'\banemia\b': 'low iron or blood count',
-        r'\bmyocardial infarction\b': 'heart attack',
-        r'\bglucose\b': 'blood sugar',
-        r'\bred blood cells\b': 'blood units that carry oxygen',
-        r'\bwhite blood cells\b': 'blood units that fight infection',
-        r'\bhemoglobin\b': 'protein that carries oxygen in blood',
-        r'\bcholesterol\b': 'blood fat',
-        r'\bedema\b': 'swelling caused by fluid',
-        r'\bfatigue\b': 'extreme tiredness',
-        r'\bdyspnea\b': 'shortness of breath',
-        r'\belevated\b': 'higher than normal',
-        r'\bdecreased\b': 'lower than normal',
-        r'\bacute\b': 'sudden or short-term',
-        r'\bchronic\b': 'long-term',
-        r'\bbenign\b': 'non-cancerous',
-        r'\bmalignant\b': 'cancerous',
-        r'\bcardiac\b': 'heart-related',
-        r'\bpulmonary\b': 'lung-related',
-        r'\brenal\b': 'kidney-related',
-        r'\bhepatic\b': 'liver-related',
-        r'\bgastric\b': 'stomach-related',
-        r'\bbilateral\b': 'on both sides',
-        r'\bunilateral\b': 'on one side',
-        r'\bidiopathic\b': 'cause is unknown',
-        r'\bmetastasis\b': 'cancer that has spread',
-        r'\btachycardia\b': 'fast heart rate',
-        r'\bbradycardia\b': 'slow heart rate',
-        r'\bhypoglycemia\b': 'low blood sugar',
-        r'\bhyperglycemia\b': 'high blood sugar',
-        r'\binflammation\b': 'swelling or redness',
-        r'\bprognosis\b': 'expected outcome',
-        r'\basymptomatic\b': 'showing no symptoms',
-    }
-    
+    """Convert technical medical terms into simple, patient-friendly language.
+
+    All lexicon terms are replaced in a single pass; the rest of the text keeps its case.
+    """
+    simplified = term_simplifier.simplify(text)
+    return simplified[:1].upper() + simplified[1:]
+
+
+def _summarize_batch(texts, **options):
+    out = summarizer(texts, batch_size=len(texts), truncation=True, **options)
+    return [o["summary_text"] for o in out]
+
+
+summary_batcher = MicroBatcher(_summarize_batch, max_batch_size=SUMMARY_BATCH_MAX,
+                               max_wait_ms=SUMMARY_BATCH_WAIT_MS, name="summary-batcher")
+
+
+def run_summarizer(text, **options):
+    """Summarize one text, batched with concurrent requests when enabled."""
+    if SUMMARY_BATCH_MAX <= 1:
+        return _summarize_batch([text], **options)[0]
+    return summary_batcher.submit(text, **options)
+
+
+def run_summarizer_many(texts, timeout=None, **options):
+    """Summarize several texts in one batch; entries that miss the timeout come back as None."""
+    if SUMMARY_BATCH_MAX <= 1:
+        return _summarize_batch(texts, **options)
+    futures = [summary_batcher.submit_async(t, **options) for t in texts]
+    deadline = None if timeout is None else time.monotonic() + timeout
+    results = []
+    for fut in futures:
+        try:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            results.append(fut.result(remaining))
+        except FutureTimeoutError:
+            fut.cancel()
+            results.append(None)
+    return results
+
+
+def _summarize_once(text):
+    # Adjust max_length based on input length to avoid errors
+    input_len = len(text.split())
+    max_len = min(120, input_len)
+    min_len = min(30, max_len - 1)
+    return run_summarizer(text, max_length=max_len, min_length=min_len)
+
+
+def _token_counts(texts):
+    tokenizer = getattr(summarizer, "tokenizer", None)
+    if tokenizer is None:
+        # Rough BPE estimate when no tokenizer is at hand
+        return [len(t.split()) * 4 // 3 + 1 for t in texts]
+    return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+
+def chunk_for_summarizer(text, max_tokens):
+    """Pack whole sentences into chunks that fit the summarizer's token window."""
     import re
-    simplified = text.lower()
-    for tech, simple in simplification_map.items():
-        simplified = re.sub(tech, simple, simplified)
-    
-    return simplified.capitalize()
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+|\n+', text) if s.strip()]
+    if not sentences:
+        return []
+    chunks, current, current_tokens = [], [], 0
+    for sentence, count in zip(sentences, _token_counts(sentences)):
+        if current and current_tokens + count > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        # A single over-long sentence is truncated by the pipeline
+        current.append(sentence)
+        current_tokens += count
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _lead_sentences(text, count=2):
+    sentences = [s.strip() for s in text.split('.') if s.strip()]
+    return ". ".join(sentences[:count]) + "." if sentences else ""
+
+
+def summarize_hierarchical(text):
+    """Map-reduce summarization covering the whole document.
+
+    Every chunk is summarized, SUMMARY_MAX_CHUNKS per batch; the summaries
+    are joined and the process repeats until the text fits one window.
+    Chunks reached after SUMMARY_TIME_BUDGET seconds (or that miss it) are
+    reduced to their lead sentences instead, so latency stays bounded
+    without dropping any part of the document.
+    """
+    deadline = time.monotonic() + SUMMARY_TIME_BUDGET
+    batch_size = max(1, SUMMARY_MAX_CHUNKS)
+    while True:
+        chunks = chunk_for_summarizer(text, SUMMARY_CHUNK_TOKENS)
+        if len(chunks) <= 1:
+            return _summarize_once(text)
+
+        summaries = []
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                summaries.extend([None] * len(batch))
+                continue
+            summaries.extend(run_summarizer_many(
+                batch,
+                timeout=remaining,
+                max_length=SUMMARY_CHUNK_MAX_LEN,
+                min_length=min(20, SUMMARY_CHUNK_MAX_LEN - 1),
+            ))
+        reduced = " ".join(
+            summary if summary is not None else _lead_sentences(chunk) for summary, chunk in zip(summaries, chunks)
+        )
+        if len(reduced) >= len(text):
+            # No longer shrinking (e.g. chunks without sentence breaks): the pipeline truncates the rest
+            return _summarize_once(reduced)
+        text = reduced
 
 
 def summarize_text(text):
-    """Summarize text using global transformers summarization pipeline."""
+    """Summarize text using global transformers summarization pipeline.
+
+    The text is simplified once, before summarizing; the summary is not
+    simplified again, which would rewrite plain wording a second time.
+    """
     # First, simplify the text for the patient
     text = simplify_medical_text(text)
     
@@ -544,100 +609,194 @@ def summarize_text(text):
         if len(text.split()) < 40:
             return text
         
-        # Adjust max_length based on input length to avoid errors
-        input_len = len(text.split())
-        max_len = min(120, input_len)
-        min_len = min(30, max_len - 1)
-        
-        # Limit input length for summarization
-        max_input_words = 1000
-        if input_len > max_input_words:
-            text = " ".join(text.split()[:max_input_words])
-        
-        out = summarizer(text, max_length=max_len, min_length=min_len, truncation=True)
-        final_summary = out[0]["summary_text"]
-        return simplify_medical_text(final_summary)
+        if SUMMARY_MODE == "truncate":
+            # Legacy behaviour: only the first 1000 words are summarized
+            max_input_words = 1000
+            if len(text.split()) > max_input_words:
+                text = " ".join(text.split()[:max_input_words])
+            final_summary = _summarize_once(text)
+        else:
+            final_summary = summarize_hierarchical(text)
+        return final_summary[:1].upper() + final_summary[1:]
     except Exception as e:
         print(f"Summarization error: {e}")
-        return simplify_medical_text(text[:500]) # Fallback to simplified snippet
+        return text[:500]  # Fallback to simplified snippet
+
+
+# Sentence ends and line breaks; the captured separators are kept for reassembly
+SEGMENT_SPLIT_RE = re.compile(r'(\n+|(?<=[.!?])\s+)')
+
+
+def split_segments(text):
+    """Split text into (segments, separators) so translations can be stitched back in order."""
+    parts = SEGMENT_SPLIT_RE.split(text)
+    return parts[0::2], parts[1::2]
+
+
+def normalize_segment(text):
+    """Collapse whitespace so re-wrapped copies of a sentence share a cache entry."""
+    return " ".join(text.split())
+
+
+def _azure_translate(segments, target_lang):
+    return azure_translator.translate(segments, [target_lang])[target_lang]
+
+
+def _marian_translate(segments, target_lang):
+    import torch
+    tokenizer, model = translation_models.get(marian_model_name(target_lang))
+
+    # Over-long sentences go through in pieces and are rejoined afterwards
+    pieces, owners = [], []
+    for i, segment in enumerate(segments):
+        for piece in chunk_text(segment, TRANSLATION_SEGMENT_CHARS) or [segment]:
+            pieces.append(piece)
+            owners.append(i)
+
+    # Length-sorted batches keep padding (and wasted decoder steps) small
+    order = sorted(range(len(pieces)), key=lambda i: len(pieces[i]))
+    outputs = [None] * len(pieces)
+    batch_size = max(1, TRANSLATION_BATCH_SIZE)
+    with torch.no_grad():
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = tokenizer([pieces[i] for i in batch], return_tensors="pt", padding=True,
+                               truncation=True, max_length=512)
+            generated = model.generate(**inputs)
+            for i, text in zip(batch, tokenizer.batch_decode(generated, skip_special_tokens=True)):
+                outputs[i] = text
+
+    joined = [[] for _ in segments]
+    for owner, text in zip(owners, outputs):
+        joined[owner].append(text)
+    return [" ".join(parts) for parts in joined]
+
+
+def _google_translate(segments, target_lang):
+    from deep_translator import GoogleTranslator
+    translator = GoogleTranslator(source='auto', target=target_lang)
+    translated = [translator.translate(segment) for segment in segments]
+    if not all(translated):
+        raise RuntimeError("Deep Translator returned empty string")
+    return translated
+
+
+def translation_backends(target_lang):
+    """(cache id, fn) pairs in preference order: Azure if configured, MarianMT, deep-translator."""
+    backends = []
+    if azure_translator is not None:
+        backends.append(("azure", _azure_translate))
+    backends.append((f"marian:{marian_model_name(target_lang)}", _marian_translate))
+    backends.append(("google", _google_translate))
+    return backends
+
+
+def _translation_key(segment, target_lang, backend):
+    return make_key(content_hash(segment.encode("utf-8")), target_lang, backend)
 
 
 def translate_text(text, target_lang="ar"):
     """Translate English text to target_lang using MarianMT (free) by default."""
-    if target_lang == "en":
-        return text
-    
-    # Validate target language format
-    if not target_lang or not target_lang.isalpha() or len(target_lang) > 10:
-        return f"Invalid target language code: {target_lang}"
-    
-    # Limit text length
-    max_chars = 5000
-    if len(text) > max_chars:
-        text = text[:max_chars]
-    
-    # Check Azure first if configured
-    try:
-        key = os.getenv('AZURE_TRANSLATOR_KEY')
-        endpoint = os.getenv('AZURE_TRANSLATOR_ENDPOINT')
-        location = os.getenv('AZURE_TRANSLATOR_REGION')
-        if key and endpoint:
-            path = '/translate'
-            constructed_url = endpoint + path
-            params = {'api-version': '3.0', 'from': 'en', 'to': target_lang}
-            headers = {
-                'Ocp-Apim-Subscription-Key': key,
-                'Ocp-Apim-Subscription-Region': location,
-                'Content-type': 'application/json',
-                'X-ClientTraceId': str(uuid.uuid4())
-            }
-            body = [{'text': text}]
-            response = requests.post(
-                constructed_url, 
-                params=params, 
-                headers=headers, 
-                json=body,
-                timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            result = response.json()
-            return result[0]['translations'][0]['text']
-    except requests.exceptions.Timeout:
-        print("Azure Translator timeout")
-    except Exception as ae:
-        print(f"Azure Translator fallback error: {ae}")
-
-    # Fallback to local MarianMT with caching and thread safety
-    try:
-        from transformers import MarianMTModel, MarianTokenizer
-        
-        model_name = f"Helsinki-NLP/opus-mt-en-{target_lang}"
-        
-        with translation_lock:
-            if model_name not in translation_models:
-                print(f"Loading translation model: {model_name}")
-                tokenizer = MarianTokenizer.from_pretrained(model_name)
-                model = MarianMTModel.from_pretrained(model_name)
-                translation_models[model_name] = (tokenizer, model)
-            
-            tokenizer, model = translation_models[model_name]
-
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
-        translated = model.generate(**inputs)
-        return tokenizer.decode(translated[0], skip_special_tokens=True)
-    except Exception as e:
-        print(f"MarianMT failed, trying deep-translator: {e}")
+    return translate_many(text, [target_lang])[target_lang]
+
+
+def _run_backends(backends, segments, target_lang, skip=()):
+    """Translate segments with the first backend that succeeds; return (backend, results) or None."""
+    for backend, fn in backends:
+        if backend in skip:
+            continue
+        try:
+            results = fn(segments, target_lang)
+            if len(results) != len(segments):
+                raise RuntimeError(f"expected {len(segments)} translations, got {len(results)}")
+            return backend, results
+        except requests.exceptions.Timeout:
+            print(f"Translation backend {backend} timeout")
+        except Exception as e:
+            print(f"Translation backend {backend} failed: {e}")
+    return None
+
+
+def translate_many(text, target_langs):
+    """Translate English text into each of target_langs; returns {lang: translation}.
+
+    Text is translated sentence by sentence, with no length cut-off;
+    sentences already in the translation cache (for any available backend)
+    are reused. With Azure configured, the remaining sentences for every
+    language go out together in as few API calls as possible; otherwise
+    (or if Azure fails) each language falls back to MarianMT, then deep-translator.
+    """
+    results, langs = {}, []
+    for lang in target_langs:
+        if lang == "en":
+            results[lang] = text
+        # Validate target language format
+        elif not lang or not lang.isalpha() or len(lang) > 10:
+            results[lang] = f"Invalid target language code: {lang}"
+        elif lang not in langs:
+            langs.append(lang)
+    if not langs:
+        return results
+
+    segments, separators = split_segments(text)
+    normalized = [normalize_segment(seg) for seg in segments]
+    unique = [seg for seg in dict.fromkeys(normalized) if seg]
+    backends = {lang: translation_backends(lang) for lang in langs}
+
+    translated = {lang: {} for lang in langs}
+    if translation_cache is not None:
+        for lang in langs:
+            for seg in unique:
+                for backend, _ in backends[lang]:
+                    hit = translation_cache.get(_translation_key(seg, lang, backend))
+                    if hit is not None:
+                        translated[lang][seg] = hit
+                        break
+
+    # New translations go into the cache together, in one transaction
+    cache_writes = []
+
+    def store(lang, backend, segs, outputs):
+        for seg, out in zip(segs, outputs):
+            translated[lang][seg] = out
+            cache_writes.append((_translation_key(seg, lang, backend), out))
+
+    pending = [lang for lang in langs if any(seg not in translated[lang] for seg in unique)]
+    tried_azure = False
+    if len(pending) > 1 and azure_translator is not None:
+        # One request (per size limit) covers every language
+        tried_azure = True
+        needed = [seg for seg in unique if any(seg not in translated[lang] for lang in pending)]
         try:
-            from deep_translator import GoogleTranslator
-            # Force Arabic if translation specifically requested for Arabic or if it's the target
-            translated = GoogleTranslator(source='auto', target=target_lang).translate(text)
-            if translated:
-                return translated
-            raise RuntimeError("Deep Translator returned empty string")
-        except Exception as de:
-            print(f"Deep Translator failed: {de}")
+            outputs = azure_translator.translate(needed, pending)
+            for lang in pending:
+                store(lang, "azure", needed, outputs[lang])
+            pending = []
+        except Exception as e:
+            print(f"Translation backend azure failed: {e}")
+
+    for lang in pending:
+        missing = [seg for seg in unique if seg not in translated[lang]]
+        done = _run_backends(backends[lang], missing, lang, skip=("azure",) if tried_azure else ())
+        if done is None:
             # Final fallback: return original text with a note
-            return f"(English) {text}"
+            results[lang] = f"(English) {text}"
+            continue
+        store(lang, done[0], missing, done[1])
+
+    if translation_cache is not None and cache_writes:
+        translation_cache.put_many(cache_writes)
+
+    for lang in langs:
+        if lang in results:
+            continue
+        out = []
+        for i, seg in enumerate(normalized):
+            out.append(translated[lang].get(seg, ""))
+            if i < len(separators):
+                out.append(separators[i])
+        results[lang] = "".join(out).strip()
+    return results
 
 
 def analyze_with_gemini(text):
@@ -662,22 +821,317 @@ def analyze_with_gemini(text):
         Medical Text:
         {text}
         """
-        response = client.models.generate_content(
-            model='gemini-1.5-flash',
-            contents=prompt
-        )
+        # Retries stop once the answer would arrive too late to be used
+        content = client.generate(prompt, deadline=GEMINI_DEADLINE)
         # Attempt to parse JSON from response
         import json
-        import re
-        content = response.text
         # Remove markdown code blocks if present
         json_match = re.search(r'\{.*\}', content, re.DOTALL)
         if json_match:
             return json.loads(json_match.group())
         return None
+    except GeminiUnavailable as e:
+        print(f"Gemini skipped: {e}")
+        return None
+    except Exception as e:
+        print(f"Gemini analysis failed: {e}")
+        return None
+
+
+def pipeline_version():
+    """Identify the models behind an analysis so cached results expire when they change."""
+    ner_model = "keywords"
+    if nlp is not None:
+        try:
+            ner_model = f"{nlp.meta.get('name', 'spacy')}-{nlp.meta.get('version', '')}"
+        except Exception:
+            ner_model = "spacy"
+    return "|".join([
+        PIPELINE_VERSION,
+        f"ner={ner_model}",
+        f"sum={SUMMARIZER_MODEL if summarizer is not None else 'extractive'}",
+        f"gemini={GEMINI_MODEL if client else 'off'}",
+    ])
+
+
+def parse_targets(values):
+    """Turn translate_to values ("ar", "ar,fr" or repeated fields) into a de-duplicated list.
+
+    Raises ValueError for invalid language codes or too many languages.
+    """
+    targets = []
+    for value in values:
+        for lang in (value or "").split(","):
+            lang = lang.strip().lower()
+            if not lang:
+                continue
+            if not lang.isalpha() or len(lang) > 10:
+                raise ValueError(f"Invalid target language code: {lang}")
+            if lang not in targets:
+                targets.append(lang)
+    if len(targets) > TRANSLATION_MAX_TARGETS:
+        raise ValueError(f"At most {TRANSLATION_MAX_TARGETS} translate_to languages are allowed")
+    return targets or ["ar"]
+
+
+# Local NLP stages, Gemini and per-language translations of concurrent requests
+stage_executor = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage")
+
+
+def _timed(timings, name, fn, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings[name] = round(time.perf_counter() - start, 3)
+
+
+def _gemini_result(future, timeout):
+    """Wait up to timeout for the Gemini future; return its analysis only if it is usable."""
+    try:
+        result = future.result(timeout=max(0.0, timeout))
+    except FutureTimeoutError:
+        return None
+    except GeminiUnavailable as e:
+        print(f"Gemini skipped: {e}")
+        return None
     except Exception as e:
         print(f"Gemini analysis failed: {e}")
         return None
+    if isinstance(result, dict) and isinstance(result.get("summary"), str) and result["summary"].strip():
+        return result
+    return None
+
+
+def analyze_document(upload_path, target, progress=None, ocr_profile=None):
+    """Run OCR, NER, summarization, Gemini and translation on a saved upload.
+
+    After OCR, Gemini is started first and given GEMINI_HEAD_START seconds
+    (none by default); if it answers in that window the local NER and
+    summarizer never run. Otherwise they run concurrently with it, and Gemini still wins if it
+    answers before GEMINI_DEADLINE. Translations run in parallel per language.
+
+    target is a language code, a comma-separated list of codes or a list; the
+    summary is translated into each, and "translation" holds the first.
+    ocr_profile overrides the OCR preprocessing profile. progress, if given, is called with the name of each stage as it starts.
+    Returns the response payload (without DB fields), or None if no text was found.
+    """
+    def stage(name):
+        if progress:
+            progress(name)
+
+    started = time.perf_counter()
+    timings = {}
+    stage("ocr")
+    name, ext = os.path.splitext(upload_path.lower())
+    if ext in [".pdf"]:
+        text = _timed(timings, "ocr", pdf_to_text, upload_path, ocr_profile)
+    else:
+        text = _timed(timings, "ocr", image_to_text, upload_path, ocr_profile)
+
+    if not text or not text.strip():
+        return None
+
+    # Clean and normalize the extracted text for readability
+    cleaned = clean_extracted_text(text)
+
+    stage("analysis")
+    analysis_started = time.perf_counter()
+    gemini_future = None
+    # An open circuit breaker means Gemini is failing: don't give it a head start
+    if client and client.available():
+        gemini_future = stage_executor.submit(_timed, timings, "gemini", analyze_with_gemini, cleaned)
+    vitals = extract_vitals(cleaned)
+
+    # A quick Gemini answer makes the local models unnecessary
+    gemini_result = None
+    if gemini_future is not None:
+        gemini_result = _gemini_result(gemini_future, GEMINI_HEAD_START)
+
+    local = {}
+    if gemini_result is None:
+        local["entities"] = stage_executor.submit(_timed, timings, "entities", extract_entities, cleaned)
+        local["summary"] = stage_executor.submit(_timed, timings, "summary", summarize_text, cleaned)
+        if gemini_future is not None:
+            remaining = GEMINI_DEADLINE - (time.perf_counter() - analysis_started)
+            gemini_result = _gemini_result(gemini_future, remaining)
+
+    if gemini_result is not None:
+        winner = "gemini"
+        # Local work that has not started is dropped; running work finishes unobserved
+        if "summary" in local:
+            local["summary"].cancel()
+        summary = gemini_result["summary"]
+        vitals = gemini_result.get("vitals", vitals)
+        entities_pretty = gemini_result.get("entities")
+        ner = local.get("entities")
+        if not isinstance(entities_pretty, dict):
+            if ner is None:
+                ner = stage_executor.submit(_timed, timings, "entities", extract_entities, cleaned)
+            entities = ner.result()
+            entities_pretty = None
+        elif ner is not None and ner.done() and not ner.cancelled():
+            entities = ner.result()
+        else:
+            if ner is not None:
+                ner.cancel()
+            entities = entities_pretty
+    else:
+        winner = "local"
+        if gemini_future is not None and not gemini_future.done():
+            print(f"Gemini missed the {GEMINI_DEADLINE}s deadline; using local analysis")
+        entities = local["entities"].result()
+        summary = local["summary"].result()
+        entities_pretty = None
+
+    # Check if entity extraction failed
+    if isinstance(entities, dict) and "error" in entities:
+        entities = {"warning": entities["error"]}
+    if entities_pretty is None:
+        entities_pretty = prettify_entities(entities)
+
+    stage("translation")
+    targets = target.split(",") if isinstance(target, str) else list(target)
+    source = summary if isinstance(summary, str) else cleaned
+    translation_started = time.perf_counter()
+    if azure_translator is not None:
+        # Azure translates into every language in the same request
+        translations = translate_many(source, targets)
+    else:
+        futures = {lang: stage_executor.submit(translate_text, source, lang) for lang in targets}
+        translations = {lang: future.result() for lang, future in futures.items()}
+    timings["translation"] = round(time.perf_counter() - translation_started, 3)
+
+    # Snapshot: a Gemini call that lost the race may still write its own timing later
+    timings = dict(timings)
+    if gemini_future is not None and "gemini" not in timings:
+        timings["gemini"] = None  # still running past the deadline
+    timings["total"] = round(time.perf_counter() - started, 3)
+    # What the old one-after-another pipeline would have spent on the same stages
+    timings["sequential"] = round(sum(timings.get(k) or 0 for k in ("ocr", "entities", "summary", "gemini", "translation")), 3)
+    timings["winner"] = winner
+    print(f"Analysis timings: {timings}")
+
+    return add_text_views({
+        "text_length": len(cleaned),
+        "raw_text": cleaned,
+        "entities": entities,  # raw entity output
+        "entities_pretty": entities_pretty,  # normalized labels for UI
+        "vitals": vitals,
+        "summary": summary,
+        "translation": translations[targets[0]],
+        "translations": translations,
+        "timings": timings,
+    })
+
+
+def add_text_views(resp):
+    """Add the legacy text (10k chars) and text_excerpt (1k chars) slices of raw_text.
+
+    They are cut from raw_text per response rather than stored, so cached
+    analyses keep a single copy of the text.
+    """
+    raw = resp.get("raw_text") or ""
+    resp["text"] = raw[:10000]  # limited snippet for compatibility
+    resp["text_excerpt"] = raw[:1000]
+    return resp
+
+
+def cache_payload(resp):
+    """resp without per-request fields and the text views add_text_views rebuilds.
+
+    id and created_at are kept: they name the report this analysis was saved as.
+    """
+    return {k: v for k, v in resp.items() if k not in ("timings", "text", "text_excerpt", "cached", "warning")}
+
+
+def save_report(resp):
+    """Persist an analysis as a Report and add id/created_at to resp.
+
+    Returns an error message if the write failed, otherwise None.
+    """
+    if not DB_AVAILABLE:
+        # DB not available: return a user-friendly message but still provide analysis result
+        resp["warning"] = "Analysis completed but server storage is currently unavailable. Please try again later."
+        return None
+
+    try:
+        new_report = Report(
+            summary=resp["summary"],
+            vitals=resp["vitals"],
+            entities=resp["entities_pretty"],
+            translation=resp["translation"]
+        )
+        new_report.set_text(resp["raw_text"])
+        db.session.add(new_report)
+        db.session.commit()
+        resp["id"] = new_report.id
+        try:
+            resp["created_at"] = new_report.created_at.isoformat()
+        except Exception:
+            resp["created_at"] = None
+        return None
+    except OperationalError as oe:
+        # Log details server-side, but show a friendly message to the patient
+        print(f"DB write OperationalError: {oe}")
+    except SQLAlchemyError as sqe:
+        print(f"DB write error: {sqe}")
+    except Exception as e:
+        print(f"Unexpected DB error while saving report: {e}")
+    db.session.rollback()
+    return "Server error: unable to save report right now. Please try again later."
+
+
+def degraded_stages(resp):
+    """Stages of a fresh analysis that fell back because of a (possibly transient) failure.
+
+    Gemini configured but not the winner (timeout, error, open breaker),
+    NER returning a warning, or a translation falling back to "(English) ...".
+    Such results are not cached, so the next upload of the document retries.
+    """
+    degraded = []
+    if client is not None and (resp.get("timings") or {}).get("winner") != "gemini":
+        degraded.append("gemini")
+    if isinstance(resp.get("entities"), dict) and "warning" in resp["entities"]:
+        degraded.append("entities")
+    translations = resp.get("translations") or {}
+    if any(isinstance(t, str) and t.startswith("(English) ") for t in translations.values()):
+        degraded.append("translation")
+    return degraded
+
+
+def store_analysis(resp, cache_key=None):
+    """Save resp as a Report, or reuse the report a cached analysis was saved as.
+
+    A cache hit whose report still exists gets that report's id and
+    created_at and writes nothing, so re-uploads do not pile up duplicate
+    reports. Otherwise a new Report is saved and, given a cache_key, the
+    cache entry is (re)written to point at it, unless a fresh analysis is
+    degraded (see degraded_stages).
+    Returns an error message if the write failed, otherwise None.
+    """
+    report_id = resp.pop("id", None) if resp.get("cached") else None
+    resp.pop("created_at", None)
+    if report_id and DB_AVAILABLE:
+        try:
+            existing = db.session.get(Report, report_id)
+        except SQLAlchemyError as e:
+            print(f"DB read error while reusing report {report_id}: {e}")
+            db.session.rollback()
+            existing = None
+        if existing is not None:
+            resp["id"] = existing.id
+            resp["created_at"] = existing.created_at.isoformat() if existing.created_at else None
+            return None
+
+    db_error = save_report(resp)
+    if cache_key is not None:
+        degraded = [] if resp.get("cached") else degraded_stages(resp)
+        if degraded:
+            print(f"Not caching analysis: degraded {', '.join(degraded)}")
+        else:
+            analysis_cache.put(cache_key, cache_payload(resp))
+    return db_error
 
 
 @app.route("/process", methods=["POST"])
@@ -692,6 +1146,37 @@ def process_file():
     if not is_valid:
         return jsonify({"error": error_msg}), 400
 
+    try:
+        target = ",".join(parse_targets(request.form.getlist("translate_to")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    run_async = (request.form.get("async") or request.args.get("async") or "").lower() in ("1", "true", "yes")
+    ocr_profile = (request.form.get("ocr_profile") or OCR_PREPROCESS).lower()
+    if ocr_profile not in OCR_PROFILES + ("auto",):
+        return jsonify({"error": f"Invalid ocr_profile: {ocr_profile}. Allowed: auto, {', '.join(OCR_PROFILES)}"}), 400
+
+    if run_async:
+        # Workers wait for model warmup themselves
+        return submit_job(f, target, ocr_profile)
+
+    not_ready = models_unavailable_response()
+    if not_ready:
+        return not_ready
+
+    # Re-uploads of the same document reuse the stored analysis
+    cache_key = None
+    if analysis_cache is not None:
+        cache_key = make_key(content_hash(f.read()), target, ocr_profile, pipeline_version())
+        f.seek(0)
+        cached = analysis_cache.get(cache_key)
+        if cached:
+            add_text_views(cached)
+            cached["cached"] = True
+            db_error = store_analysis(cached, cache_key)
+            if db_error:
+                return jsonify({"error": db_error}), 500
+            return jsonify(cached)
+
     tmpdir = tempfile.mkdtemp(prefix="ai_med_")
     try:
         # Sanitize filename to prevent path traversal
@@ -699,87 +1184,14 @@ def process_file():
         upload_path = os.path.join(tmpdir, safe_filename)
         f.save(upload_path)
 
-        name, ext = os.path.splitext(safe_filename.lower())
-        if ext in [".pdf"]:
-            text = pdf_to_text(upload_path)
-        else:
-            text = image_to_text(upload_path)
-
-        if not text or not text.strip():
+        resp = analyze_document(upload_path, target, ocr_profile=ocr_profile)
+        if resp is None:
             return jsonify({"error": "No text could be extracted from the file"}), 400
 
-        # Clean and normalize the extracted text for readability
-        cleaned = clean_extracted_text(text)
-
-        entities = extract_entities(cleaned)
-        # Check if entity extraction failed
-        if isinstance(entities, dict) and "error" in entities:
-            entities = {"warning": entities["error"]}
-
-        entities_pretty = prettify_entities(entities)
-
-        vitals = extract_vitals(cleaned)
-        summary = summarize_text(cleaned)
-
-        # Gemini Analysis if available
-        gemini_result = analyze_with_gemini(cleaned)
-        if gemini_result:
-            summary = gemini_result.get("summary", summary)
-            vitals = gemini_result.get("vitals", vitals)
-            entities_pretty = gemini_result.get("entities", entities_pretty)
-
-        target = request.form.get("translate_to", "ar")
-        translation = translate_text(summary if isinstance(summary, str) else cleaned, target_lang=target)
-
-        # Save to Database (guarded)
-        saved = False
-        resp = {
-            # Legacy (original behaviour)
-            "text": cleaned[:10000],  # limited snippet for compatibility
-            "text_length": len(cleaned),
-            # New clearer fields
-            "raw_text": cleaned,
-            "text_excerpt": cleaned[:1000],
-            "entities": entities,  # raw entity output
-            "entities_pretty": entities_pretty,  # normalized labels for UI
-            "vitals": vitals,
-            "summary": summary,
-            "translation": translation,
-        }
-
-        if DB_AVAILABLE:
-            try:
-                new_report = Report(
-                    original_text=cleaned,
-                    summary=summary,
-                    vitals=vitals,
-                    entities=entities_pretty,
-                    translation=translation
-                )
-                db.session.add(new_report)
-                db.session.commit()
-                saved = True
-                resp["id"] = new_report.id
-                try:
-                    resp["created_at"] = new_report.created_at.isoformat()
-                except Exception:
-                    resp["created_at"] = None
-            except OperationalError as oe:
-                # Log details server-side, but show a friendly message to the patient
-                print(f"DB write OperationalError: {oe}")
-                db.session.rollback()
-                return jsonify({"error": "Server error: unable to save report right now. Please try again later."}), 500
-            except SQLAlchemyError as sqe:
-                print(f"DB write error: {sqe}")
-                db.session.rollback()
-                return jsonify({"error": "Server error: unable to save report right now. Please try again later."}), 500
-            except Exception as e:
-                print(f"Unexpected DB error while saving report: {e}")
-                db.session.rollback()
-                return jsonify({"error": "Server error: unable to save report right now. Please try again later."}), 500
-        else:
-            # DB not available: return a user-friendly message but still provide analysis result
-            resp["warning"] = "Analysis completed but server storage is currently unavailable. Please try again later."
+        resp["cached"] = False
+        db_error = store_analysis(resp, cache_key)
+        if db_error:
+            return jsonify({"error": db_error}), 500
 
         return jsonify(resp)
     except Exception as e:
@@ -832,8 +1244,14 @@ except Exception:
     # best-effort only; continue and let SQLAlchemy surface errors if any
     pass
 
+# Content-addressed analysis cache (memory LRU + SQLite tier)
+analysis_cache = cache_from_env(INSTANCE_DIR / "analysis_cache.db")
+translation_cache = cache_from_env(INSTANCE_DIR / "translation_cache.db", prefix="TRANSLATION_CACHE",
+                                   table="translation_cache", memory_items=2048, max_mb=64)
+
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', f'sqlite:///{db_path}')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_from_env(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'super-secret-key-change-this-in-prod')
 
 db = SQLAlchemy(app)
@@ -852,22 +1270,210 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+class ReportText(db.Model):
+    """A report body, zlib-compressed and keyed by the SHA-256 of its text; shared by identical reports."""
+    __tablename__ = 'report_text'
+    hash = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    size = db.Column(db.Integer)  # UTF-8 bytes before compression
+    stored_size = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    def text(self):
+        return decompress_text(self.data)
+
+# How SQLite's CURRENT_TIMESTAMP stores times. Bound values (e.g. /reports cursors) must use the
+# same text form, since SQLite compares them as strings; the default format adds ".000000".
+SQLITE_TIMESTAMP = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
+def utc_now():
+    """Naive UTC now, the form job lease times are stored in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 class Report(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True) # Optional for now
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, index=True) # Optional for now
     patient_name = db.Column(db.String(120))
-    original_text = db.Column(db.Text)
+    # Uncompressed text of reports saved before report_text existed; moved there at startup
+    legacy_text = db.Column('original_text', db.Text)
+    text_hash = db.Column(db.String(64), db.ForeignKey('report_text.hash'), index=True)
     summary = db.Column(db.Text)
     vitals = db.Column(db.JSON)
     entities = db.Column(db.JSON)
     translation = db.Column(db.Text)
+    created_at = db.Column(db.DateTime().with_variant(SQLITE_TIMESTAMP, "sqlite"), default=db.func.current_timestamp())
+
+    # Only loaded (and decompressed) when original_text is read
+    body = db.relationship('ReportText', lazy='select')
+
+    # Serves /reports' newest-first keyset pagination
+    __table_args__ = (db.Index('ix_report_created_at_id', 'created_at', 'id'),)
+
+    @property
+    def original_text(self):
+        text = getattr(self, '_plain_text', None)
+        if text is None:
+            if self.text_hash:
+                text = self.body.text() if self.body is not None else None
+            else:
+                text = self.legacy_text
+            self._plain_text = text
+        return text
+
+    def set_text(self, text):
+        self.text_hash = store_report_text(text) if text is not None else None
+        self.legacy_text = None
+        self._plain_text = text
+
+class Job(db.Model):
+    """Async /process job; state lives in the DB so it survives worker restarts."""
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, done, failed
+    stage = db.Column(db.String(40))
+    filename = db.Column(db.String(255))
+    upload_path = db.Column(db.Text)
+    translate_to = db.Column(db.String(64))  # comma-separated language codes
+    ocr_profile = db.Column(db.String(20))
+    content_hash = db.Column(db.String(64))
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, default=0)
+    worker_id = db.Column(db.String(120))  # process running the job (see WORKER_ID)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    # Doubles as the lease heartbeat of running jobs. Written and compared in UTC from Python: the
+    # database's CURRENT_TIMESTAMP is local time on Postgres (timestamp without time zone)
+    updated_at = db.Column(db.DateTime().with_variant(SQLITE_TIMESTAMP, "sqlite"), default=utc_now, onupdate=utc_now)
+
+def store_report_text(text):
+    """Store text in report_text unless an identical body is already there; returns its hash."""
+    digest = text_digest(text)
+    if db.session.get(ReportText, digest) is None:
+        raw = text.encode("utf-8")
+        data = compress_text(text)
+        try:
+            # Savepoint: a concurrent upload of the same text may insert it first
+            with db.session.begin_nested():
+                db.session.add(ReportText(hash=digest, data=data, size=len(raw), stored_size=len(data)))
+        except IntegrityError:
+            pass
+    return digest
+
+
+REPORT_TEXT_MIGRATE = os.getenv("REPORT_TEXT_MIGRATE", "true").lower() == "true"
+
+
+def migrate_report_texts(batch_size=200):
+    """Move original_text of up to batch_size older reports into report_text and commit; returns the count."""
+    reports = (Report.query
+               .options(load_only(Report.id, Report.legacy_text, Report.text_hash))
+               .filter(Report.text_hash.is_(None), Report.legacy_text.isnot(None))
+               .limit(batch_size).all())
+    for report in reports:
+        report.set_text(report.legacy_text)
+    db.session.commit()
+    return len(reports)
+
+
+# Full-text search over reports (FTS5 on SQLite, tsvector on Postgres); None if unsupported
+report_search = None
+
+
+def init_report_search():
+    """Create the search index for this database; existing reports are indexed by maintain_reports."""
+    global report_search
+    backend = search_backend_for(db.engine)
+    if backend is None:
+        print(f"Report search unavailable for {db.engine.dialect.name}")
+        return
+    for attempt in range(3):
+        try:
+            with db.engine.begin() as conn:
+                backend.setup(conn)
+            report_search = backend
+            return
+        except OperationalError as e:
+            # Another worker starting at the same moment may hold the write lock
+            if attempt == 2:
+                print(f"Report search disabled ({backend.name}): {e}")
+            else:
+                time.sleep(1)
+        except Exception as e:
+            print(f"Report search disabled ({backend.name}): {e}")
+            return
+
+
+def _backfill_report_search(batch_size):
+    with db.engine.begin() as conn:
+        return report_search.backfill_batch(conn, batch_size)
+
+
+def maintain_reports(batch_size=200, retries=5):
+    """Move older report bodies into report_text, then index reports missing from search.
+
+    Runs in a background thread after startup so workers start serving at once.
+    Every batch is its own transaction, so requests and other workers only ever
+    wait for one batch; a batch that loses a lock race (another worker doing the
+    same work) is retried.
+    """
+    steps = []
+    if REPORT_TEXT_MIGRATE:
+        steps.append((migrate_report_texts, "Moved the text of {} reports into report_text"
+                      " (on SQLite, VACUUM the database to reclaim the space)"))
+    if report_search is not None:
+        steps.append((_backfill_report_search, "Report search: indexed {} existing reports"))
+    with app.app_context():
+        for step, message in steps:
+            total, failures = 0, 0
+            while True:
+                try:
+                    done = step(batch_size)
+                except OperationalError as e:
+                    db.session.rollback()
+                    failures += 1
+                    if failures > retries:
+                        print(f"{step.__name__} stopped: {e}")
+                        break
+                    time.sleep(failures)
+                    continue
+                except SQLAlchemyError as e:
+                    # Unfinished reports stay readable (and unindexed); retried next start
+                    db.session.rollback()
+                    print(f"{step.__name__} stopped: {e}")
+                    break
+                if not done:
+                    break
+                failures = 0
+                total += done
+            if total:
+                print(message.format(total))
+
+
+@event.listens_for(Report, "after_insert")
+def _index_new_report(mapper, connection, target):
+    # Same transaction as the report row, so the index never lags behind
+    if report_search is None:
+        return
+    try:
+        report_search.index_report(connection, target.id, target.original_text, target.summary, target.entities)
+    except Exception as e:
+        print(f"Report search: failed to index {target.id}: {e}")
+
 
 # Create DB and seed default users
 DB_AVAILABLE = True
 with app.app_context():
     try:
+        install_sqlite_pragmas(db.engine)
         db.create_all()
+        columns = ensure_columns(db.engine, db.metadata)
+        if columns:
+            print(f"Added missing columns: {', '.join(columns)}")
+        added = ensure_indexes(db.engine, db.metadata)
+        if added:
+            print(f"Created missing indexes: {', '.join(added)}")
+        init_report_search()
     except OperationalError as oe:
         DB_AVAILABLE = False
         print(f"Database initialization error: {oe}")
@@ -899,6 +1505,221 @@ with app.app_context():
             DB_AVAILABLE = False
             print(f"Unexpected DB seeding error: {e}")
 
+if DB_AVAILABLE:
+    threading.Thread(target=maintain_reports, name="report-maintenance", daemon=True).start()
+
+# -------------------------------------------------------------------
+# Async Jobs
+# -------------------------------------------------------------------
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+MAX_PENDING_JOBS = int(os.getenv('MAX_PENDING_JOBS', '50'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+# A running job whose worker has not touched it for this long is considered abandoned
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '120'))
+JOBS_DIR = INSTANCE_DIR / "jobs"
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="ai-med-job")
+# Identifies this process as the owner of the jobs it runs
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def job_result(resp):
+    """resp as stored in Job.result: the report text is referenced by its report_text hash, not copied."""
+    result = {k: v for k, v in resp.items() if k not in ("raw_text", "text", "text_excerpt")}
+    if resp.get("raw_text") is not None:
+        result["text_hash"] = text_digest(resp["raw_text"])
+    return result
+
+
+def job_response(result):
+    """Rebuild the /process response from a stored Job.result, reading the text back from report_text."""
+    result = dict(result or {})
+    text_hash = result.pop("text_hash", None)
+    if text_hash and "raw_text" not in result:
+        body = db.session.get(ReportText, text_hash)
+        result["raw_text"] = body.text() if body is not None else ""
+        add_text_views(result)
+    return result
+
+
+def _update_job(job_id, **fields):
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return
+    for key, value in fields.items():
+        setattr(job, key, value)
+    db.session.commit()
+
+
+def submit_job(f, target, ocr_profile=None):
+    """Store the upload and queue it for the worker pool. Returns a 202 response."""
+    if not DB_AVAILABLE:
+        return jsonify({"error": "Async processing is unavailable because server storage is down. Please try again later."}), 503
+
+    try:
+        pending = Job.query.filter(Job.status.in_(('queued', 'running'))).count()
+        if pending >= MAX_PENDING_JOBS:
+            resp = jsonify({"error": "Server is busy processing other reports. Please try again shortly."})
+            resp.headers['Retry-After'] = '30'
+            return resp, 503
+
+        job = Job(filename=os.path.basename(f.filename), translate_to=target, ocr_profile=ocr_profile,
+                  content_hash=content_hash(f.read()))
+        f.seek(0)
+        db.session.add(job)
+        db.session.flush()  # assigns job.id
+        job_dir = JOBS_DIR / job.id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        job.upload_path = str(job_dir / job.filename)
+        f.save(job.upload_path)
+        db.session.commit()
+        job_id = job.id
+    except Exception as e:
+        print(f"Failed to queue job: {e}")
+        db.session.rollback()
+        return jsonify({"error": "Server error: unable to queue report right now. Please try again later."}), 500
+
+    job_executor.submit(run_job, job_id)
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+
+
+def run_job(job_id):
+    """Worker entry point: run the pipeline for a queued job and record the outcome."""
+    with app.app_context():
+        finished = False
+        try:
+            # Claim atomically so a job resumed by several processes runs only once
+            claimed = Job.query.filter(Job.id == job_id, Job.status == 'queued').update(
+                {"status": "running", "stage": "starting", "attempts": Job.attempts + 1, "worker_id": WORKER_ID},
+                synchronize_session=False,
+            )
+            db.session.commit()
+            if not claimed:
+                return
+
+            job = db.session.get(Job, job_id)
+            finished = True
+            if (job.attempts or 0) > JOB_MAX_ATTEMPTS:
+                _update_job(job_id, status='failed', error="Job exceeded the maximum number of attempts.")
+                return
+
+            models_ready.wait()
+            resp = None
+            cache_key = None
+            if analysis_cache is not None and job.content_hash:
+                cache_key = make_key(job.content_hash, job.translate_to, job.ocr_profile, pipeline_version())
+                resp = analysis_cache.get(cache_key)
+                if resp:
+                    add_text_views(resp)
+                    resp["cached"] = True
+            if resp is None:
+                resp = analyze_document(job.upload_path, job.translate_to,
+                                        progress=lambda stage: _update_job(job_id, stage=stage),
+                                        ocr_profile=job.ocr_profile)
+                if resp is None:
+                    _update_job(job_id, status='failed', error="No text could be extracted from the file")
+                    return
+                resp["cached"] = False
+
+            _update_job(job_id, stage="saving")
+            db_error = store_analysis(resp, cache_key)
+            if db_error:
+                _update_job(job_id, status='failed', error=db_error)
+                return
+            _update_job(job_id, status='done', stage='done', result=job_result(resp))
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            db.session.rollback()
+            try:
+                _update_job(job_id, status='failed', error=str(e))
+            except Exception as ue:
+                print(f"Unable to record failure for job {job_id}: {ue}")
+        finally:
+            # Unless the lease expired and another worker took the job over (and needs the upload)
+            if finished and _owns_job(job_id):
+                shutil.rmtree(JOBS_DIR / job_id, ignore_errors=True)
+            db.session.remove()
+
+
+def _owns_job(job_id):
+    try:
+        return db.session.query(Job.worker_id).filter(Job.id == job_id).scalar() == WORKER_ID
+    except Exception:
+        db.session.rollback()
+        return False
+
+
+def _lease_cutoff():
+    return utc_now() - timedelta(seconds=JOB_LEASE_SECONDS)
+
+
+def heartbeat_jobs():
+    """Renew the lease of the jobs this process is running, so other processes leave them alone."""
+    interval = max(1, JOB_LEASE_SECONDS // 4)
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                Job.query.filter(Job.worker_id == WORKER_ID, Job.status == 'running').update(
+                    {"updated_at": utc_now()}, synchronize_session=False)
+                db.session.commit()
+            except Exception as e:
+                print(f"Job heartbeat failed: {e}")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+
+def resume_jobs():
+    """Pick up queued jobs and requeue running jobs whose worker stopped renewing their lease.
+
+    Jobs other live processes are running are left alone; queued jobs may
+    also sit in another process's queue, but only one run can claim them.
+    """
+    with app.app_context():
+        try:
+            cutoff = _lease_cutoff()
+            abandoned = [job_id for (job_id,) in db.session.query(Job.id).filter(
+                Job.status == 'running', Job.updated_at < cutoff)]
+            for job_id in abandoned:
+                # Conditional, so a job renewed or requeued by someone else meanwhile is skipped
+                Job.query.filter(Job.id == job_id, Job.status == 'running', Job.updated_at < cutoff).update(
+                    {"status": "queued", "worker_id": None}, synchronize_session=False)
+            db.session.commit()
+            job_ids = [job_id for (job_id,) in db.session.query(Job.id).filter(Job.status == 'queued')]
+        except Exception as e:
+            print(f"Unable to resume jobs: {e}")
+            db.session.rollback()
+            return
+    for job_id in job_ids:
+        job_executor.submit(run_job, job_id)
+    if job_ids:
+        print(f"Resumed {len(job_ids)} pending job(s)")
+
+
+# Skip the reloader's parent process in debug mode so jobs are not run twice
+if DB_AVAILABLE and not (os.getenv("FLASK_DEBUG", "false").lower() == "true" and os.getenv("WERKZEUG_RUN_MAIN") != "true"):
+    threading.Thread(target=heartbeat_jobs, name="job-heartbeat", daemon=True).start()
+    resume_jobs()
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    out = {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+    if job.status == 'done':
+        out["result"] = job_response(job.result)
+    return jsonify(out)
+
 # -------------------------------------------------------------------
 # Auth Routes
 # -------------------------------------------------------------------
@@ -939,26 +1760,173 @@ def login():
         "username": user.username
     }), 200
 
+# Fields /reports can return; original_text is only loaded when asked for
+REPORT_FIELDS = ("id", "patient_name", "summary", "vitals", "entities", "translation", "created_at", "original_text")
+REPORT_DEFAULT_FIELDS = ("id", "patient_name", "summary", "vitals", "entities", "translation", "created_at")
+REPORTS_PAGE_SIZE = int(os.getenv("REPORTS_PAGE_SIZE", "50"))
+REPORTS_MAX_PAGE_SIZE = int(os.getenv("REPORTS_MAX_PAGE_SIZE", "200"))
+
+
+def parse_report_fields(value):
+    """Comma-separated field names -> tuple; raises ValueError for unknown fields."""
+    if not value:
+        return REPORT_DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in value.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in REPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(REPORT_FIELDS)}")
+    return fields
+
+
+def encode_cursor(report):
+    raw = f"{report.created_at.isoformat()}|{report.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Opaque cursor -> (created_at, id); raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, report_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), report_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def serialize_report(report, fields):
+    out = {}
+    for field in fields:
+        value = getattr(report, field)
+        if field == "created_at":
+            value = value.isoformat() if value else None
+        out[field] = value
+    return out
+
+
+def report_columns(fields):
+    """Loader options so unrequested columns are never read, and report bodies only when original_text is asked for."""
+    fields = set(fields) | {"id", "created_at"}
+    columns = [getattr(Report, f) for f in fields if f != "original_text"]
+    if "original_text" not in fields:
+        return [load_only(*columns)]
+    return [load_only(*columns, Report.text_hash, Report.legacy_text), selectinload(Report.body)]
+
+
 @app.route('/reports', methods=['GET'])
 # @jwt_required()  # Keep optional for initial testing
 def get_reports():
-    reports = Report.query.order_by(Report.created_at.desc()).all()
-    output = []
-    for report in reports:
-        output.append({
-            "id": report.id,
-            "patient_name": report.patient_name,
-            "summary": report.summary,
-            "vitals": report.vitals,
-            "entities": report.entities,
-            "translation": report.translation,
-            "created_at": report.created_at.isoformat()
-        })
-    return jsonify(output)
+    """Newest-first page of reports.
+
+    Query parameters: limit, cursor (from the previous page's X-Next-Cursor
+    header) and fields (comma-separated). The body stays a JSON array; the
+    next page is advertised in X-Next-Cursor and a Link header. Responses
+    carry an ETag; If-None-Match answers 304 without reading any report.
+    """
+    try:
+        limit = int(request.args.get("limit", REPORTS_PAGE_SIZE))
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    limit = min(limit, REPORTS_MAX_PAGE_SIZE)
+    cursor = request.args.get("cursor")
+    try:
+        fields = parse_report_fields(request.args.get("fields"))
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Reports are insert-only, so the row count and newest timestamp identify the table state
+    count, newest = db.session.query(db.func.count(Report.id), db.func.max(Report.created_at)).one()
+    etag = hashlib.sha1(f"{count}|{newest}|{limit}|{cursor}|{','.join(fields)}".encode("utf-8")).hexdigest()
+    if etag in request.if_none_match:
+        resp = app.response_class(status=304)
+        resp.set_etag(etag)
+        return resp
+
+    query = Report.query.options(*report_columns(fields))
+    if after:
+        created_at, report_id = after
+        query = query.filter(db.or_(
+            Report.created_at < created_at,
+            db.and_(Report.created_at == created_at, Report.id < report_id),
+        ))
+    rows = query.order_by(Report.created_at.desc(), Report.id.desc()).limit(limit + 1).all()
+
+    resp = jsonify([serialize_report(report, fields) for report in rows[:limit]])
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    if len(rows) > limit:
+        next_cursor = encode_cursor(rows[limit - 1])
+        resp.headers["X-Next-Cursor"] = next_cursor
+        params = {"limit": limit, "cursor": next_cursor}
+        if request.args.get("fields"):
+            params["fields"] = ",".join(fields)
+        resp.headers["Link"] = f'<{request.path}?{urlencode(params)}>; rel="next"'
+    return resp
+
+
+@app.route('/reports/search', methods=['GET'])
+def search_reports():
+    """Full-text search over report text, summaries and entities, best matches first.
+
+    Query parameters: q (terms must all match; "quoted phrases" allowed),
+    limit and offset. Snippets highlight matches with <mark>.
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+    if report_search is None:
+        return jsonify({"error": "Search is not available for this database"}), 501
+    try:
+        limit = int(request.args.get("limit", 20))
+        offset = int(request.args.get("offset", 0))
+        if limit < 1 or offset < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "limit and offset must be non-negative integers (limit >= 1)"}), 400
+    limit = min(limit, REPORTS_MAX_PAGE_SIZE)
+
+    try:
+        hits = report_search.search(db.session.connection(), q, limit=limit, offset=offset)
+    except SQLAlchemyError as e:
+        print(f"Report search error: {e}")
+        db.session.rollback()
+        return jsonify({"error": "Invalid search query"}), 400
+    for hit in hits:
+        if hit["created_at"] is not None and not isinstance(hit["created_at"], str):
+            hit["created_at"] = hit["created_at"].isoformat()
+    return jsonify({
+        "query": q,
+        "results": hits[:limit],
+        "next_offset": offset + limit if len(hits) > limit else None,
+    })
+
+
+@app.route('/reports/<report_id>', methods=['GET'])
+def get_report(report_id):
+    """A single report; accepts the same fields parameter as /reports."""
+    try:
+        fields = parse_report_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    report = Report.query.options(*report_columns(fields)).filter_by(id=report_id).first()
+    if report is None:
+        return jsonify({"error": "Report not found"}), 404
+    return jsonify(serialize_report(report, fields))
 
 @app.route("/healthz")
 def health():
-    checks = {"status": "ok"}
+    # Liveness is implied by answering at all; readiness waits for model warmup
+    ready = models_ready.is_set()
+    checks = {
+        "status": "ok",
+        "live": True,
+        "ready": ready,
+        "startup": {"import_seconds": IMPORT_SECONDS, "warmup": dict(warmup_state)},
+    }
+    if request.args.get("ready") and not ready:
+        return jsonify(checks), 503
     try:
         from shutil import which
         checks["pdfinfo"] = bool(which("pdfinfo"))
@@ -1008,6 +1976,15 @@ def health():
 
     checks["spacy_loaded"] = nlp is not None
     checks["summarizer_loaded"] = summarizer is not None
+    checks["summary_batching"] = summary_batcher.info() if SUMMARY_BATCH_MAX > 1 else None
+    checks["analysis_cache"] = analysis_cache.info() if analysis_cache is not None else None
+    checks["translation_cache"] = translation_cache.info() if translation_cache is not None else None
+    checks["translation_models"] = translation_models.info()
+    checks["gemini"] = client.info() if client else None
+    checks["azure_translator"] = azure_translator.info() if azure_translator is not None else None
+    checks["job_workers"] = JOB_WORKERS
+    checks["ocr_pool"] = ocr_pool_info()
+    checks["ocr_engine"] = ocr_engine_info()
     checks["max_file_size_mb"] = MAX_FILE_SIZE // (1024 * 1024)
     checks["allowed_extensions"] = list(ALLOWED_EXTENSIONS)
     try:
@@ -1018,6 +1995,17 @@ def health():
             checks["db_writable"] = os.access(str(db_path), os.W_OK)
         except Exception:
             checks["db_writable"] = False
+        checks["db_dialect"] = db.engine.dialect.name
+        checks["sqlite"] = sqlite_settings(db.engine)
+        texts, size, stored = db.session.query(
+            db.func.count(ReportText.hash), db.func.sum(ReportText.size), db.func.sum(ReportText.stored_size)
+        ).one()
+        checks["report_text"] = {
+            "texts": texts,
+            "size_bytes": size or 0,
+            "stored_bytes": stored or 0,
+            "ratio": round(size / stored, 2) if stored else None,
+        }
     except Exception:
         checks["db_available"] = False
         checks["db_writable"] = False
@@ -1025,7 +2013,12 @@ def health():
     return jsonify(checks)
 
 
-if __name__ == "__main__":
+IMPORT_SECONDS = round(time.perf_counter() - _import_started, 3)
+print(f"App imported in {IMPORT_SECONDS}s (model warmup: {MODEL_WARMUP})")
+
+
+def run():
+    """Serve the app (see app/__main__.py)."""
     port = int(os.getenv("PORT", 8000))
     debug = os.getenv("FLASK_DEBUG", "false").lower() == "true"
     
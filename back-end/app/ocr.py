@@ -0,0 +1,453 @@
+"""OCR helpers: image and PDF text extraction.
+
+Kept free of Flask and model imports so OCR pool worker processes stay light.
+cv2 and numpy are imported by the functions that use them, so importing this
+module (e.g. from app.main) does not load them.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import ocr_engines
+from .ocr_engines import drain_collected, get_tesseract_engine, merge_calls, warm_ocr_worker
+
+# Worker processes for per-page PDF rendering + OCR (1 disables the pool)
+OCR_WORKERS = int(os.getenv('OCR_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Pages rasterized per pdftoppm call when rendering in-process
+PDF_RENDER_BATCH = int(os.getenv('PDF_RENDER_BATCH', '2'))
+
+# Preprocessing profile: auto (probe each image), none, threshold or denoise
+OCR_PREPROCESS = os.getenv('OCR_PREPROCESS', 'auto').strip().lower()
+OCR_PROFILES = ("none", "threshold", "denoise")
+if OCR_PREPROCESS not in OCR_PROFILES + ("auto",):
+    # A typo here would otherwise make every upload without ocr_profile a 400
+    print(f"WARNING: unknown OCR_PREPROCESS '{OCR_PREPROCESS}' (allowed: auto, {', '.join(OCR_PROFILES)}); using auto")
+    OCR_PREPROCESS = "auto"
+# Probe cut-offs (estimated noise sigma and ink/paper contrast, in grey levels)
+CLEAN_NOISE_MAX = float(os.getenv('OCR_CLEAN_NOISE_MAX', '2.0'))
+CLEAN_CONTRAST_MIN = float(os.getenv('OCR_CLEAN_CONTRAST_MIN', '128'))
+NOISY_NOISE_MIN = float(os.getenv('OCR_NOISY_NOISE_MIN', '5.0'))
+PROBE_MAX_SIDE = 512
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+def load_gray_image(source):
+    """Decode an OCR input into a grayscale uint8 array without touching disk.
+
+    Accepts a file path, raw encoded bytes, a PIL image or a numpy array
+    (BGR/BGRA/grayscale). Returns None if the input cannot be decoded.
+    """
+    import cv2
+    import numpy as np
+    if isinstance(source, np.ndarray):
+        if source.ndim == 2:
+            return source
+        if source.shape[2] == 4:
+            return cv2.cvtColor(source, cv2.COLOR_BGRA2GRAY)
+        return cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return cv2.imdecode(np.frombuffer(source, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if isinstance(source, (str, os.PathLike)):
+        return cv2.imread(os.fspath(source), cv2.IMREAD_GRAYSCALE)
+    if hasattr(source, "convert"):  # PIL image, e.g. pdf2image output
+        return np.asarray(source.convert("L"))
+    return None
+
+
+def encode_image(source, gray=None):
+    """Return encoded image bytes for remote OCR APIs (original bytes when available)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as image_file:
+            return image_file.read()
+    import cv2
+    if gray is None:
+        gray = load_gray_image(source)
+    ok, buf = cv2.imencode(".png", gray)
+    if not ok:
+        raise RuntimeError("Unable to encode image for OCR")
+    return buf.tobytes()
+
+
+def probe_image_quality(gray):
+    """Estimate noise and contrast of a grayscale page from a decimated copy.
+
+    Plain pixel striding (not area averaging) keeps the per-pixel noise intact.
+    Noise uses Immerkaer's Laplacian-difference estimator.
+    """
+    import cv2
+    import numpy as np
+    step = max(1, -(-max(gray.shape[:2]) // PROBE_MAX_SIDE))
+    small = gray[::step, ::step]
+    h, w = small.shape[:2]
+    if h < 3 or w < 3:
+        return {"noise": 0.0, "contrast": 0.0}
+    kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+    residual = cv2.filter2D(small.astype(np.float32), -1, kernel)[1:-1, 1:-1]
+    noise = float(np.abs(residual).sum() * np.sqrt(0.5 * np.pi) / (6.0 * (w - 2) * (h - 2)))
+    # Contrast: gap between the mean ink and mean paper levels of an Otsu split
+    t, _ = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    ink, paper = small[small <= t], small[small > t]
+    contrast = float(paper.mean() - ink.mean()) if ink.size and paper.size else 0.0
+    return {"noise": round(noise, 2), "contrast": round(contrast, 1)}
+
+
+def choose_ocr_profile(gray):
+    """Pick the cheapest preprocessing profile that suits the image."""
+    quality = probe_image_quality(gray)
+    if quality["noise"] <= CLEAN_NOISE_MAX and quality["contrast"] >= CLEAN_CONTRAST_MIN:
+        return "none"
+    if quality["noise"] < NOISY_NOISE_MIN:
+        return "threshold"
+    return "denoise"
+
+
+def preprocess_for_ocr(gray, profile=None):
+    """Apply a preprocessing profile to a grayscale image.
+
+    profile defaults to OCR_PREPROCESS; "auto" probes the image first.
+    """
+    import cv2
+    profile = (profile or OCR_PREPROCESS).lower()
+    if profile not in OCR_PROFILES:
+        profile = choose_ocr_profile(gray)
+    if profile == "none":
+        return gray
+    if profile == "denoise":
+        # Non-local means is by far the most expensive step; only used for noisy scans
+        gray = cv2.fastNlMeansDenoising(gray, h=10)
+    # Adaptive thresholding
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+
+
+def image_to_text(image, profile=None):
+    """OCR an image using local Tesseract (preferred) or Google Vision if configured.
+
+    image may be a file path, encoded bytes, a PIL image or a numpy array; it is
+    decoded and preprocessed in memory using the given preprocessing profile
+    (none/threshold/denoise/auto, default OCR_PREPROCESS).
+    Returns extracted text or raises RuntimeError with actionable instructions.
+    """
+    gray = load_gray_image(image)
+
+    # Try local Tesseract first (persistent engine when available)
+    engine = get_tesseract_engine()
+    if engine is not None:
+        try:
+            # Preprocess image for better OCR
+            if gray is not None:
+                img = preprocess_for_ocr(gray, profile)
+            elif hasattr(image, "convert"):
+                img = image
+            else:
+                from PIL import Image
+                img = Image.open(image if isinstance(image, (str, os.PathLike)) else io.BytesIO(bytes(image)))
+
+            text = engine.recognize(img)
+            if text and text.strip():
+                return text
+        except Exception as e:
+            # continue to optional fallback
+            print(f"{engine.name} error: {e}")
+
+    # Optional: Google Vision if ADC is configured
+    try:
+        if os.getenv("GOOGLE_APPLICATION_CREDENTIALS") or os.getenv("GOOGLE_API_KEY"):
+            vision_engine = ocr_engines.registry.get("google_vision")
+            if vision_engine is not None:
+                text = vision_engine.recognize(encode_image(image, gray))
+                if text:
+                    return text
+    except Exception as ge:
+        print(f"Google Vision error: {ge}")
+
+    # Optional fallback: EasyOCR (pure-python reader, requires torch). Try if installed.
+    try:
+        easyocr_engine = ocr_engines.registry.get("easyocr")
+        if easyocr_engine is not None:
+            text = easyocr_engine.recognize(gray if gray is not None else image)
+            if text.strip():
+                return text
+    except Exception as ee:
+        # don't fail here; easyocr may fail without GPU/torch
+        print(f"EasyOCR fallback error: {ee}")
+
+    raise RuntimeError(
+        "OCR failed: no usable OCR method succeeded.\n"
+        "- Install tesseract and the language data (eng). Example: conda install -c conda-forge tesseract\n"
+        "- Or configure Google Vision by setting GOOGLE_APPLICATION_CREDENTIALS to a service-account JSON."
+    )
+
+
+def _pool_context():
+    """Start workers from a fork server (or spawn where there is none), never by forking the app.
+
+    The app runs threads (warmup, batcher, executors, torch) whose locks a
+    plain fork would copy in whatever state they happen to be in.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        # Import the OCR stack once in the server; workers fork from it with it loaded
+        ctx.set_forkserver_preload(["app.ocr", "cv2", "numpy"])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def get_ocr_pool():
+    """Return the shared OCR process pool, creating it on first use."""
+    global _ocr_pool
+    if OCR_WORKERS <= 1:
+        return None
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=_pool_context(),
+                                            initializer=warm_ocr_worker)
+        return _ocr_pool
+
+
+def _reset_ocr_pool():
+    """Drop a broken pool so the next request starts a fresh one."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        pool, _ocr_pool = _ocr_pool, None
+    if pool is not None:
+        try:
+            pool.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            pass
+
+
+def ocr_pool_info():
+    """Describe the OCR pool for /healthz."""
+    return {"workers": OCR_WORKERS, "started": _ocr_pool is not None}
+
+
+def iter_pdf_pages(pdf_path, page_numbers, dpi, poppler_path=None, batch_size=None):
+    """Lazily render PDF pages, yielding (page_number, image, error) in order.
+
+    Contiguous pages are rendered a few at a time via first_page/last_page, so
+    at most batch_size page images are alive at once regardless of PDF length.
+    A failed batch is retried page by page so one bad page only costs itself.
+    """
+    from pdf2image import convert_from_path
+
+    batch_size = max(1, batch_size or PDF_RENDER_BATCH)
+    batches = []
+    for n in page_numbers:
+        if batches and n == batches[-1][-1] + 1 and len(batches[-1]) < batch_size:
+            batches[-1].append(n)
+        else:
+            batches.append([n])
+
+    for batch in batches:
+        try:
+            images = convert_from_path(
+                pdf_path, dpi=dpi, first_page=batch[0], last_page=batch[-1],
+                thread_count=1, poppler_path=poppler_path,
+            )
+        except Exception as e:
+            if len(batch) == 1:
+                yield batch[0], None, e
+                continue
+            for n in batch:
+                yield from iter_pdf_pages(pdf_path, [n], dpi, poppler_path, batch_size=1)
+            continue
+        for n, img in zip(batch, images):
+            yield n, img, None
+        del images
+
+
+def ocr_page_image(img, profile=None):
+    """OCR one rendered page image, entirely in memory."""
+    return image_to_text(img, profile)
+
+
+def ocr_pdf_page(pdf_path, page_number, dpi, poppler_path=None, profile=None):
+    """Render a single PDF page (1-based) and OCR it."""
+    for _, img, error in iter_pdf_pages(pdf_path, [page_number], dpi, poppler_path, batch_size=1):
+        if error is not None:
+            raise error
+        return ocr_page_image(img, profile)
+    return ""
+
+
+def _ocr_pdf_page_task(pdf_path, page_number, dpi, poppler_path=None, profile=None):
+    """Pool task: OCR one page and hand back the worker's engine timings."""
+    try:
+        return ocr_pdf_page(pdf_path, page_number, dpi, poppler_path, profile), drain_collected()
+    except Exception:
+        drain_collected()
+        raise
+
+
+def _ocr_pages_in_process(pdf_path, page_numbers, dpi, poppler_path, profile):
+    results = []
+    for page_number, img, error in iter_pdf_pages(pdf_path, page_numbers, dpi, poppler_path):
+        if error is not None:
+            results.append((None, error))
+            continue
+        try:
+            results.append((ocr_page_image(img, profile), None))
+        except Exception as page_e:
+            results.append((None, page_e))
+        finally:
+            del img
+    return results
+
+
+def _ocr_page_or_error(pdf_path, page_number, dpi, poppler_path, profile):
+    try:
+        return ocr_pdf_page(pdf_path, page_number, dpi, poppler_path, profile), None
+    except Exception as page_e:
+        return None, page_e
+
+
+def ocr_pdf_pages(pdf_path, page_numbers, dpi, poppler_path=None, profile=None):
+    """OCR the given pages, in parallel when the pool is enabled.
+
+    Returns a (text, error) pair per page, in page order, so one bad page does
+    not abort the document. If every page fails (e.g. poppler or tesseract is
+    missing) the first page's error is raised instead. Workers render their
+    own page, and only a small window of pages is in flight, so memory tracks
+    OCR_WORKERS rather than the page count.
+    """
+    pool = get_ocr_pool() if len(page_numbers) > 1 else None
+    if pool is None:
+        results = _ocr_pages_in_process(pdf_path, page_numbers, dpi, poppler_path, profile)
+    else:
+        results = _ocr_pages_in_pool(pool, pdf_path, page_numbers, dpi, poppler_path, profile)
+    errors = [error for _, error in results if error is not None]
+    for page_number, (_, error) in zip(page_numbers, results):
+        if error is not None:
+            print(f"OCR failed on page {page_number}: {error}")
+    if results and len(errors) == len(results):
+        raise errors[0]
+    return results
+
+
+def _ocr_pages_in_pool(pool, pdf_path, page_numbers, dpi, poppler_path, profile):
+    window = 2 * OCR_WORKERS
+    pending = deque()
+    results = []
+    remaining = iter(page_numbers)
+
+    def submit_next():
+        for n in remaining:
+            try:
+                pending.append((n, pool.submit(_ocr_pdf_page_task, pdf_path, n, dpi, poppler_path, profile)))
+            except (BrokenProcessPool, RuntimeError) as e:
+                print(f"OCR pool unavailable, running page {n} in-process: {e}")
+                _reset_ocr_pool()
+                pending.append((n, None))
+            return
+
+    for _ in range(window):
+        submit_next()
+
+    while pending:
+        page_number, fut = pending.popleft()
+        if fut is None:
+            results.append(_ocr_page_or_error(pdf_path, page_number, dpi, poppler_path, profile))
+        else:
+            try:
+                text, calls = fut.result()
+                merge_calls(calls)
+                results.append((text, None))
+            except BrokenProcessPool as e:
+                # A worker died (e.g. OOM); retry this page in-process
+                print(f"OCR worker crashed on page {page_number}: {e}")
+                _reset_ocr_pool()
+                results.append(_ocr_page_or_error(pdf_path, page_number, dpi, poppler_path, profile))
+            except Exception as page_e:
+                results.append((None, page_e))
+        submit_next()
+    return results
+
+
+def pdf_to_text(pdf_path, profile=None):
+    """Extract PDF text page by page.
+
+    Pages with a dense enough PyPDF2 text layer use it directly; only the
+    remaining (scanned) pages are OCR'd with pdf2image + Tesseract, using the
+    given preprocessing profile. OCR output replaces a page's sparse text
+    layer only if it succeeded and found at least as much text.
+    """
+    # Selectable text extraction (PyPDF2) is faster and cleaner than OCR where it exists
+    layer_text = []
+    try:
+        from PyPDF2 import PdfReader
+        reader = PdfReader(pdf_path)
+        for page in reader.pages:
+            try:
+                layer_text.append((page.extract_text() or "").strip())
+            except Exception:
+                layer_text.append("")
+    except Exception:
+        pass
+    pypdf_text = "\n\n".join(t for t in layer_text if t).strip()
+
+    # Minimum characters for a page's text layer to be trusted over OCR
+    min_chars = int(os.getenv('PDF_TEXT_MIN_CHARS', '50'))
+    pages_text = {n: t for n, t in enumerate(layer_text, start=1) if len(t) >= min_chars}
+    num_pages = len(layer_text) or None
+
+    if not num_pages or len(pages_text) < num_pages:
+        # Some pages need OCR (pdf2image + tesseract) with optimized settings
+        try:
+            from pdf2image import pdfinfo_from_path
+
+            # Higher DPI for better accuracy (300 is standard for OCR)
+            dpi = int(os.getenv('PDF_DPI', '300'))
+            # Cap pages to OCR to avoid long-running requests (can be tuned via env)
+            max_pages = int(os.getenv('MAX_PDF_PAGES', '8'))
+            poppler_path = None
+            try:
+                from shutil import which
+                if which('pdftoppm'):
+                    poppler_path = os.path.dirname(which('pdftoppm'))
+            except Exception:
+                poppler_path = None
+
+            if not num_pages:
+                num_pages = int(pdfinfo_from_path(pdf_path, poppler_path=poppler_path)["Pages"])
+
+            # Each page is rendered and OCR'd on its own, so only the capped pages are touched
+            ocr_pages = [n for n in range(1, num_pages + 1) if n not in pages_text][:max_pages]
+            for n, (text, error) in zip(ocr_pages, ocr_pdf_pages(pdf_path, ocr_pages, dpi, poppler_path, profile)):
+                text = (text or "").strip() if error is None else ""
+                layer = layer_text[n - 1] if n <= len(layer_text) else ""
+                if text and len(text) >= len(layer):
+                    pages_text[n] = text
+        except Exception as e:
+            print(f"OCR attempt failed: {e}")
+
+        # Pages that were not OCR'd, failed or gave less keep their sparse text layer
+        for n, t in enumerate(layer_text, start=1):
+            if t and n not in pages_text:
+                pages_text[n] = t
+
+    text = "\n\n".join(pages_text[n] for n in sorted(pages_text)).strip()
+    if text:
+        return text
+
+    # If we got here, everything failed. Let's find out why.
+    error_details = []
+    if not pypdf_text:
+        error_details.append("Text extraction (PyPDF2) returned no text.")
+    
+    # Check for binaries specifically to give clear instructions
+    from shutil import which
+    if not which("pdftoppm"):
+        error_details.append("Missing 'poppler' (pdftoppm). Required for scanned PDFs.")
+    if not which("tesseract"):
+        error_details.append("Missing 'tesseract'. Required for OCR.")
+        
+    error_msg = " | ".join(error_details)
+    raise RuntimeError(f"PDF Analysis Failed: {error_msg}. Please ensure your PDF is not a scanned image, or install 'poppler' and 'tesseract' for OCR support.")
@@ -0,0 +1,348 @@
+"""OCR engine abstraction used by image_to_text.
+
+The persistent engine keeps Tesseract loaded in-process through tesserocr's
+C API binding, in a bounded pool of instances that recognitions check out
+and back in, so eng.traineddata is read once per instance instead of once
+per page (and not once per request thread). Without tesserocr the pytesseract CLI path
+is used. Every recognition is timed so /healthz can report latency.
+"""
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from shutil import which
+
+# auto (tesserocr if installed, else pytesseract), tesserocr or pytesseract
+OCR_ENGINE = os.getenv('OCR_ENGINE', 'auto').lower()
+OCR_LANG = os.getenv('OCR_LANG', 'eng')
+# Most Tesseract instances kept loaded per process; extra callers wait for one
+TESSERACT_INSTANCES = max(1, int(os.getenv('OCR_TESSERACT_INSTANCES', str(min(4, os.cpu_count() or 1)))))
+
+_stats = {}
+_stats_lock = threading.Lock()
+# One EasyOCR reader per process, and it is not thread-safe
+_easyocr_lock = threading.Lock()
+# Set in OCR pool workers so the parent can merge their timings
+_collected = None
+
+
+def record_call(engine, seconds):
+    """Record one recognition call's latency for engine."""
+    with _stats_lock:
+        entry = _stats.setdefault(engine, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+        ms = seconds * 1000
+        entry["calls"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+        entry["last_ms"] = ms
+        if _collected is not None:
+            _collected.append((engine, seconds))
+
+
+def start_collecting():
+    """Buffer call timings in this process (used by OCR pool workers)."""
+    global _collected
+    _collected = []
+
+
+def drain_collected():
+    """Return and clear timings buffered since the last drain."""
+    global _collected
+    if _collected is None:
+        return []
+    calls, _collected = _collected, []
+    return calls
+
+
+def merge_calls(calls):
+    """Fold timings reported by a pool worker into this process's stats."""
+    for engine, seconds in calls:
+        record_call(engine, seconds)
+
+
+def engine_stats():
+    """Return per-engine call counts and latency (ms)."""
+    with _stats_lock:
+        out = {}
+        for engine, entry in _stats.items():
+            out[engine] = {
+                "calls": entry["calls"],
+                "avg_ms": round(entry["total_ms"] / entry["calls"], 1) if entry["calls"] else None,
+                "max_ms": round(entry["max_ms"], 1),
+                "last_ms": round(entry["last_ms"], 1),
+            }
+        return out
+
+
+def _tessdata_dir():
+    return os.getenv("TESSDATA_PREFIX") or None
+
+
+class PytesseractEngine:
+    """Runs the tesseract CLI per call through pytesseract (reloads language data each time)."""
+
+    name = "pytesseract"
+
+    def __init__(self):
+        import pytesseract
+        if not which("tesseract"):
+            raise RuntimeError(
+                "Tesseract binary not found. Install tesseract (conda-forge or brew) and ensure it's on PATH."
+            )
+        self._pytesseract = pytesseract
+        # Optimized config: --oem 3 (Default) --psm 3 (Fully auto page segmentation)
+        self.config = "--oem 3 --psm 3"
+        tess_prefix = _tessdata_dir()
+        if tess_prefix:
+            self.config += f' --tessdata-dir "{tess_prefix}"'
+
+    def warm(self):
+        pass
+
+    def recognize(self, img):
+        start = time.perf_counter()
+        try:
+            return self._pytesseract.image_to_string(img, lang=OCR_LANG, config=self.config)
+        finally:
+            record_call(self.name, time.perf_counter() - start)
+
+
+class TesserocrEngine:
+    """Long-lived Tesseract instances via the C API, checked out of a bounded pool.
+
+    Instances are created on demand up to TESSERACT_INSTANCES; after that a
+    caller waits for one to be checked back in. Request threads come and go,
+    so instances belong to the engine, not to a thread.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, size=None):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.size = size or TESSERACT_INSTANCES
+        self._idle = queue.Queue(maxsize=self.size)
+        self._created = 0
+        self._create_lock = threading.Lock()
+        self.warm()  # fail fast if the language data cannot be loaded
+
+    def _new_api(self):
+        kwargs = {"lang": OCR_LANG, "psm": self._tesserocr.PSM.AUTO, "oem": self._tesserocr.OEM.DEFAULT}
+        tessdata = _tessdata_dir()
+        if tessdata:
+            kwargs["path"] = tessdata.rstrip("/") + "/"
+        return self._tesserocr.PyTessBaseAPI(**kwargs)
+
+    @contextmanager
+    def _checkout(self):
+        try:
+            api = self._idle.get_nowait()
+        except queue.Empty:
+            api = None
+            with self._create_lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    api = self._new_api()
+                except Exception:
+                    with self._create_lock:
+                        self._created -= 1
+                    raise
+            else:
+                api = self._idle.get()
+        try:
+            yield api
+        finally:
+            self._idle.put(api)
+
+    def warm(self):
+        with self._checkout():
+            pass
+
+    def recognize(self, img):
+        from PIL import Image
+        if not hasattr(img, "convert"):
+            img = Image.fromarray(img)
+        start = time.perf_counter()
+        try:
+            with self._checkout() as api:
+                api.SetImage(img)
+                return api.GetUTF8Text()
+        finally:
+            record_call(self.name, time.perf_counter() - start)
+
+
+class GoogleVisionEngine:
+    """Google Cloud Vision text detection with one shared (thread-safe) client."""
+
+    name = "google_vision"
+
+    def __init__(self):
+        from google.cloud import vision
+        self._vision = vision
+        self.client = vision.ImageAnnotatorClient()
+
+    def recognize(self, content):
+        start = time.perf_counter()
+        try:
+            response = self.client.text_detection(image=self._vision.Image(content=content))
+            if response.error.message:
+                raise RuntimeError(response.error.message)
+            texts = response.text_annotations
+            return texts[0].description if texts else ""
+        finally:
+            record_call(self.name, time.perf_counter() - start)
+
+
+class EasyOcrEngine:
+    """EasyOCR reader built once; calls are serialized since the reader is not thread-safe."""
+
+    name = "easyocr"
+
+    def __init__(self):
+        import easyocr
+        self.reader = easyocr.Reader([OCR_LANG[:2]], gpu=False)
+
+    def recognize(self, img):
+        start = time.perf_counter()
+        try:
+            with _easyocr_lock:
+                results = self.reader.readtext(img)
+            # results are (bbox, text, confidence)
+            return "\n".join([r[1] for r in results if r and len(r) > 1])
+        finally:
+            record_call(self.name, time.perf_counter() - start)
+
+
+def _build_tesseract_engine():
+    candidates = {
+        "auto": (TesserocrEngine, PytesseractEngine),
+        "tesserocr": (TesserocrEngine, PytesseractEngine),
+        "pytesseract": (PytesseractEngine,),
+    }.get(OCR_ENGINE, (TesserocrEngine, PytesseractEngine))
+    errors = []
+    for cls in candidates:
+        try:
+            return cls()
+        except Exception as e:
+            errors.append(f"{cls.name}: {e}")
+    raise RuntimeError("; ".join(errors))
+
+
+class OcrEngineRegistry:
+    """Builds each OCR engine lazily, once, and shares it across threads.
+
+    A failed build is remembered for ENGINE_RETRY_SECONDS so a missing
+    optional engine is not re-imported on every page.
+    """
+
+    def __init__(self, retry_seconds=300):
+        self.retry_seconds = retry_seconds
+        self._factories = {}
+        self._engines = {}
+        self._errors = {}
+        self._locks = {}
+
+    def register(self, name, factory):
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        """Return the engine called name, building it on first use; None if unavailable."""
+        engine = self._engines.get(name)
+        if engine is not None:
+            return engine
+        with self._locks[name]:
+            engine = self._engines.get(name)
+            if engine is not None:
+                return engine
+            failed = self._errors.get(name)
+            if failed and time.monotonic() - failed[1] < self.retry_seconds:
+                return None
+            start = time.perf_counter()
+            try:
+                engine = self._factories[name]()
+            except Exception as e:
+                self._errors[name] = (str(e), time.monotonic())
+                print(f"OCR engine '{name}' unavailable: {e}")
+                return None
+            self._engines[name] = engine
+            self._errors.pop(name, None)
+            print(f"OCR engine '{name}' ready ({getattr(engine, 'name', name)}, {time.perf_counter() - start:.1f}s)")
+            return engine
+
+    def reset(self, name=None):
+        """Forget built engines (all, or just name), e.g. after a fork.
+
+        Their build locks are replaced too: one held by another thread when
+        the process forked would never be released in the child.
+        """
+        names = [name] if name else list(self._factories)
+        for n in names:
+            self._engines.pop(n, None)
+            self._errors.pop(n, None)
+            self._locks[n] = threading.Lock()
+
+    def status(self):
+        """Report which engines are warm and why others are unavailable."""
+        out = {}
+        for name in self._factories:
+            engine = self._engines.get(name)
+            failed = self._errors.get(name)
+            out[name] = {
+                "warm": engine is not None,
+                "impl": getattr(engine, "name", None) if engine is not None else None,
+                "error": failed[0] if failed else None,
+            }
+        return out
+
+
+ENGINE_RETRY_SECONDS = int(os.getenv('OCR_ENGINE_RETRY_SECONDS', '300'))
+
+registry = OcrEngineRegistry(retry_seconds=ENGINE_RETRY_SECONDS)
+registry.register("tesseract", _build_tesseract_engine)
+registry.register("google_vision", GoogleVisionEngine)
+registry.register("easyocr", EasyOcrEngine)
+
+
+def get_tesseract_engine():
+    """Return the process-wide Tesseract engine, preferring the persistent one.
+
+    Returns None if neither tesserocr nor pytesseract + the tesseract binary work.
+    """
+    return registry.get("tesseract")
+
+
+def reset_locks():
+    """Replace module locks that may have been inherited, held, through fork."""
+    global _stats_lock, _easyocr_lock
+    _stats_lock = threading.Lock()
+    _easyocr_lock = threading.Lock()
+
+
+def warm_ocr_worker():
+    """OCR pool initializer: load Tesseract once and collect timings for the parent."""
+    reset_locks()
+    start_collecting()
+    # Never reuse engines inherited through fork; build this worker's own
+    registry.reset()
+    try:
+        engine = get_tesseract_engine()
+        if engine is not None:
+            engine.warm()
+    except Exception as e:
+        print(f"OCR worker warmup failed: {e}")
+
+
+def ocr_engine_info():
+    """Describe OCR engines (warm or not) and call latency for /healthz."""
+    return {
+        "configured": OCR_ENGINE,
+        "engines": registry.status(),
+        "latency": engine_stats(),
+    }
@@ -0,0 +1,263 @@
+"""Full-text search over stored reports.
+
+SQLite: a contentless FTS5 table (report_fts) whose rowid is the report's
+rowid, indexing original_text, summary and the entity names. It keeps no copy
+of the text, so snippets are cut from the decompressed report. It is filled on
+insert (see the Report after_insert hook in main.py), back-filled in the
+background after startup, and ranked with BM25 weighted towards entities and
+summary.
+
+Postgres: a tsvector column on report (search_tsv) with a GIN index, filled
+the same way by the app rather than generated from the row, so it does not
+depend on where the report body is stored; ranked with ts_rank_cd and
+highlighted with ts_headline.
+"""
+import html
+import json
+import re
+
+from sqlalchemy import text
+
+from .text_store import decompress_text
+
+# Quoted phrases or single terms from the user's query
+QUERY_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# Private-use characters marking matches in raw snippets, before the text is HTML-escaped
+MATCH_START = "\ue000"
+MATCH_END = "\ue001"
+
+
+def highlight_html(snippet):
+    """HTML-escape report text from the index, then turn the match markers into <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_END, HIGHLIGHT_END)
+
+
+def entities_text(entities):
+    """Flatten {label: [names]} (or a list / JSON string of it) into searchable text."""
+    if isinstance(entities, str):
+        try:
+            entities = json.loads(entities)
+        except ValueError:
+            return entities
+    if isinstance(entities, dict):
+        names = []
+        for values in entities.values():
+            if isinstance(values, (list, tuple)):
+                names.extend(str(v) for v in values)
+            elif values:
+                names.append(str(values))
+        return " ".join(names)
+    if isinstance(entities, (list, tuple)):
+        return " ".join(str(v) for v in entities)
+    return ""
+
+
+def report_body(data, legacy_text):
+    """A report's text from its report_text blob, or the uncompressed original_text of older rows."""
+    if data is not None:
+        return decompress_text(bytes(data))
+    return legacy_text or ""
+
+
+# Reports with their body, for back-filling an index
+REPORT_BODIES_SQL = (
+    "SELECT {key}, t.data, r.original_text, r.summary, r.entities"
+    " FROM report r LEFT JOIN report_text t ON t.hash = r.text_hash WHERE {where} LIMIT :n"
+)
+
+
+def _stem(word):
+    """Rough stand-in for the index's porter stemmer, good enough to find words to highlight."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def make_snippet(query, texts, size=16):
+    """A window of about size words from the first of texts matching query, matches wrapped in markers.
+
+    The SQLite index stores no text (so FTS5's snippet() has nothing to cut
+    from); snippets are built here from the decompressed report instead.
+    """
+    stems = {_stem(w.lower()) for w in WORD_RE.findall(query or "")}
+    for doc in texts:
+        words = list(WORD_RE.finditer(doc or ""))
+        hits = {i for i, w in enumerate(words) if any(w.group().lower().startswith(stem) for stem in stems)}
+        if not hits:
+            continue
+        # Start a little before the match whose window covers the most matches
+        start = max(sorted(max(0, h - 2) for h in hits), key=lambda first: sum(first <= h < first + size for h in hits))
+        end = min(len(words), start + size)
+        out, pos = [], words[start].start()
+        for i in range(start, end):
+            w = words[i]
+            out.append(doc[pos:w.start()])
+            out.append(MATCH_START + w.group() + MATCH_END if i in hits else w.group())
+            pos = w.end()
+        snippet = "".join(out)
+        return ("… " if start else "") + snippet + (" …" if end < len(words) else "")
+    body = texts[0] if texts else ""
+    words = (body or "").split()
+    return " ".join(words[:size]) + (" …" if len(words) > size else "")
+
+
+def fts5_query(query):
+    """Turn free text into a safe FTS5 expression: every term or "quoted phrase" must match.
+
+    The last bare term also matches as a prefix, so partial words find results while typing.
+    """
+    parts = []
+    matches = list(QUERY_TERM_RE.finditer(query or ""))
+    for i, m in enumerate(matches):
+        words = WORD_RE.findall(m.group(1) or m.group(2))
+        if not words:
+            continue
+        phrase = '"' + " ".join(words) + '"'
+        if m.group(2) and i == len(matches) - 1 and len(words) == 1:
+            phrase += "*"
+        parts.append(phrase)
+    return " ".join(parts)
+
+
+class SqliteReportSearch:
+    """FTS5 index keyed by report rowid."""
+
+    name = "sqlite-fts5"
+
+    def setup(self, conn):
+        old = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'report_fts'")).scalar()
+        if old is not None and "content=''" not in old:
+            # Earlier versions kept a full copy of every body in the index; re-indexed in the background
+            conn.execute(text("DROP TABLE report_fts"))
+            print("Report search: rebuilding report_fts without stored text")
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS report_fts USING fts5("
+            "original_text, summary, entities, content='', tokenize='porter unicode61')"
+        ))
+        # Persistent default ranking, so ORDER BY rank can use FTS5's optimized top-k path
+        conn.execute(text("INSERT INTO report_fts(report_fts, rank) VALUES ('rank', 'bm25(1.0, 2.0, 4.0)')"))
+
+    def backfill_batch(self, conn, batch_size=500):
+        """Index up to batch_size reports missing from the index; returns how many were indexed."""
+        rows = conn.execute(text(REPORT_BODIES_SQL.format(
+            key="r.rowid", where="r.rowid NOT IN (SELECT rowid FROM report_fts)"
+        )), {"n": batch_size}).fetchall()
+        if rows:
+            # Checked again under the write lock: another worker may have indexed the same batch,
+            # and a contentless table would add its terms a second time
+            conn.execute(
+                text("INSERT INTO report_fts(rowid, original_text, summary, entities)"
+                     " SELECT :r, :o, :s, :e WHERE NOT EXISTS (SELECT 1 FROM report_fts WHERE rowid = :r)"),
+                [{"r": r[0], "o": report_body(r[1], r[2]), "s": r[3] or "", "e": entities_text(r[4])} for r in rows],
+            )
+        return len(rows)
+
+    def index_report(self, conn, report_id, original_text, summary, entities):
+        conn.execute(text(
+            "INSERT INTO report_fts(rowid, original_text, summary, entities)"
+            " SELECT rowid, :o, :s, :e FROM report WHERE id = :id"
+        ), {"id": report_id, "o": original_text or "", "s": summary or "", "e": entities_text(entities)})
+
+    def remove_report(self, conn, report_id):
+        # A contentless table needs the indexed values back to remove their terms
+        row = conn.execute(text(REPORT_BODIES_SQL.format(
+            key="r.rowid", where="r.id = :id AND r.rowid IN (SELECT rowid FROM report_fts)"
+        )), {"id": report_id, "n": 1}).first()
+        if row is not None:
+            conn.execute(text(
+                "INSERT INTO report_fts(report_fts, rowid, original_text, summary, entities)"
+                " VALUES ('delete', :r, :o, :s, :e)"
+            ), {"r": row[0], "o": report_body(row[1], row[2]), "s": row[3] or "", "e": entities_text(row[4])})
+
+    def search(self, conn, query, limit=20, offset=0):
+        """Return up to limit+1 hits (so callers can tell whether another page exists)."""
+        match = fts5_query(query)
+        if not match:
+            return []
+        rows = conn.execute(text(
+            "SELECT r.id, r.summary, r.created_at, hits.score, t.data, r.original_text, r.entities FROM ("
+            "  SELECT rowid, rank AS score"
+            "  FROM report_fts WHERE report_fts MATCH :q ORDER BY rank LIMIT :limit OFFSET :offset"
+            ") AS hits JOIN report r ON r.rowid = hits.rowid LEFT JOIN report_text t ON t.hash = r.text_hash"
+            " ORDER BY hits.score"
+        ), {"q": match, "limit": limit + 1, "offset": offset})
+        # bm25 scores are negative; flip them so higher means more relevant
+        return [{"id": r[0], "summary": r[1], "created_at": r[2],
+                 "snippet": highlight_html(make_snippet(query, (report_body(r[4], r[5]), r[1], entities_text(r[6])))),
+                 "score": round(-r[3], 4)} for r in rows]
+
+
+class PostgresReportSearch:
+    """tsvector column + GIN index on report."""
+
+    name = "postgres-tsvector"
+
+    VECTOR_SQL = (
+        "setweight(to_tsvector('english', :e), 'A') ||"
+        " setweight(to_tsvector('english', :s), 'B') ||"
+        " setweight(to_tsvector('english', :o), 'C')"
+    )
+
+    def setup(self, conn):
+        conn.execute(text("ALTER TABLE report ADD COLUMN IF NOT EXISTS search_tsv tsvector"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_report_search_tsv ON report USING GIN (search_tsv)"))
+
+    def backfill_batch(self, conn, batch_size=500):
+        rows = conn.execute(text(REPORT_BODIES_SQL.format(key="r.id", where="r.search_tsv IS NULL")),
+                            {"n": batch_size}).fetchall()
+        for r in rows:
+            self.index_report(conn, r[0], report_body(r[1], r[2]), r[3], r[4])
+        return len(rows)
+
+    def index_report(self, conn, report_id, original_text, summary, entities):
+        conn.execute(text(f"UPDATE report SET search_tsv = {self.VECTOR_SQL} WHERE id = :id"), {
+            "id": report_id, "o": original_text or "", "s": summary or "", "e": entities_text(entities),
+        })
+
+    def remove_report(self, conn, report_id):
+        pass  # the vector is deleted with its row
+
+    def search(self, conn, query, limit=20, offset=0):
+        if not (query or "").strip():
+            return []
+        rows = conn.execute(text(
+            "SELECT r.id, r.summary, r.created_at, hits.score, t.data, r.original_text FROM ("
+            "  SELECT id, ts_rank_cd(search_tsv, q) AS score"
+            "  FROM report, websearch_to_tsquery('english', :query) AS q"
+            "  WHERE search_tsv @@ q ORDER BY score DESC LIMIT :limit OFFSET :offset"
+            ") AS hits JOIN report r ON r.id = hits.id LEFT JOIN report_text t ON t.hash = r.text_hash"
+            " ORDER BY hits.score DESC"
+        ), {"query": query, "limit": limit + 1, "offset": offset}).fetchall()
+        if not rows:
+            return []
+        # Bodies are decompressed here, then highlighted in one round trip
+        snippets = conn.execute(text(
+            "SELECT ts_headline('english', doc, websearch_to_tsquery('english', :query),"
+            "                   'StartSel=' || :hs || ', StopSel=' || :he || ', MaxFragments=2')"
+            " FROM unnest(CAST(:docs AS text[])) WITH ORDINALITY AS d(doc, n) ORDER BY n"
+        ), {"query": query, "hs": MATCH_START, "he": MATCH_END,
+            "docs": [report_body(r[4], r[5]) for r in rows]}).scalars().all()
+        return [{"id": r[0], "summary": r[1], "created_at": r[2], "snippet": highlight_html(snippet),
+                 "score": round(float(r[3]), 4)} for r, snippet in zip(rows, snippets)]
+
+
+def backfill(search, conn, batch_size=500):
+    """Index every report missing from search's index, in conn's transaction; returns the count."""
+    total = 0
+    while True:
+        indexed = search.backfill_batch(conn, batch_size)
+        if not indexed:
+            return total
+        total += indexed
+
+
+def search_backend_for(engine):
+    """The search implementation for engine's dialect, or None if full-text search is unsupported."""
+    return {"sqlite": SqliteReportSearch, "postgresql": PostgresReportSearch}.get(engine.dialect.name, lambda: None)()
@@ -0,0 +1,25 @@
+"""Compressed, content-addressed report bodies.
+
+Report text is stored once per distinct content in the report_text table,
+keyed by its SHA-256 and zlib-compressed; reports point at it by hash. Re-
+uploads of the same document therefore add no text, and the body is only
+read and decompressed when a caller asks for original_text.
+"""
+import hashlib
+import os
+import zlib
+
+COMPRESSION_LEVEL = int(os.getenv("REPORT_TEXT_COMPRESSION_LEVEL", "6"))
+
+
+def text_digest(text):
+    """Hex SHA-256 of the UTF-8 text, used as the report_text key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress_text(text, level=COMPRESSION_LEVEL):
+    return zlib.compress(text.encode("utf-8"), level)
+
+
+def decompress_text(data):
+    return zlib.decompress(data).decode("utf-8")
@@ -0,0 +1,151 @@
+"""Memory-budgeted registry of MarianMT translation models.
+
+Each Helsinki-NLP model is loaded once, under its own lock, so loading one
+language never blocks requests for another. Resident models are tracked in
+LRU order with their parameter memory; when loading a model would exceed
+the budget, the least recently used models are dropped. A request already
+holding an evicted model keeps using it until it returns.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MB = 1024 * 1024
+
+
+def marian_model_name(target_lang):
+    return f"Helsinki-NLP/opus-mt-en-{target_lang}"
+
+
+def load_marian(model_name):
+    """Load (tokenizer, model) for a MarianMT checkpoint in eval mode."""
+    from transformers import MarianMTModel, MarianTokenizer
+    tokenizer = MarianTokenizer.from_pretrained(model_name)
+    model = MarianMTModel.from_pretrained(model_name)
+    model.eval()
+    return tokenizer, model
+
+
+def model_nbytes(model):
+    """Parameter + buffer memory of a torch model, in bytes."""
+    total = 0
+    for tensors in (model.parameters(), model.buffers()):
+        for t in tensors:
+            total += t.numel() * t.element_size()
+    return total
+
+
+class TranslationModelRegistry:
+    """LRU cache of loaded models bounded by max_bytes of model memory."""
+
+    def __init__(self, max_bytes, loader=load_marian, default_bytes=300 * MB, retry_seconds=300):
+        self.max_bytes = max(0, int(max_bytes))
+        self.loader = loader
+        self.default_bytes = default_bytes
+        self.retry_seconds = retry_seconds
+        self._models = OrderedDict()  # name -> (tokenizer, model, nbytes, loaded_at)
+        self._sizes = {}  # last measured size per name, used to make room before a reload
+        self._errors = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0, "failures": 0}
+
+    def _model_lock(self, name):
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def _lookup(self, name):
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models.move_to_end(name)
+                self.stats["hits"] += 1
+            return entry
+
+    def _expected_bytes(self, name):
+        if name in self._sizes:
+            return self._sizes[name]
+        if self._sizes:
+            return sum(self._sizes.values()) // len(self._sizes)
+        return self.default_bytes
+
+    def _evict_for(self, incoming, keep=None):
+        """Drop LRU models (never keep) until incoming more bytes fit. Caller holds self._lock."""
+        used = sum(e[2] for e in self._models.values())
+        for name in list(self._models):
+            if not self.max_bytes or used + incoming <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            used -= self._models.pop(name)[2]
+            self.stats["evictions"] += 1
+            print(f"Evicted translation model {name} (budget {self.max_bytes // MB}MB)")
+
+    def get(self, name):
+        """Return (tokenizer, model) for name, loading it on first use."""
+        entry = self._lookup(name)
+        if entry is not None:
+            return entry[0], entry[1]
+        with self._model_lock(name):
+            entry = self._lookup(name)
+            if entry is not None:
+                return entry[0], entry[1]
+            failed = self._errors.get(name)
+            if failed and time.monotonic() - failed[1] < self.retry_seconds:
+                raise RuntimeError(f"{name} unavailable: {failed[0]}")
+
+            with self._lock:
+                self._evict_for(self._expected_bytes(name))
+            print(f"Loading translation model: {name}")
+            start = time.perf_counter()
+            try:
+                tokenizer, model = self.loader(name)
+            except Exception as e:
+                with self._lock:
+                    self._errors[name] = (str(e), time.monotonic())
+                    self.stats["failures"] += 1
+                raise
+            nbytes = model_nbytes(model)
+            with self._lock:
+                self._errors.pop(name, None)
+                self._sizes[name] = nbytes
+                self._models[name] = (tokenizer, model, nbytes, time.time())
+                self._evict_for(0, keep=name)
+                self.stats["loads"] += 1
+            print(f"Translation model {name} ready ({nbytes / MB:.0f}MB, {time.perf_counter() - start:.1f}s)")
+            return tokenizer, model
+
+    def preload(self, names):
+        """Load names in order, logging (not raising) failures."""
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Translation model preload failed for {name}: {e}")
+
+    def info(self):
+        """Resident models (LRU first) and memory use for /healthz."""
+        with self._lock:
+            resident = [
+                {"name": name, "mb": round(e[2] / MB, 1), "loaded_at": e[3]}
+                for name, e in self._models.items()
+            ]
+            info = dict(self.stats)
+            info["errors"] = {name: err[0] for name, err in self._errors.items()}
+        info["resident"] = resident
+        info["used_mb"] = round(sum(m["mb"] for m in resident), 1)
+        info["budget_mb"] = self.max_bytes // MB
+        return info
+
+
+def registry_from_env():
+    """Build the registry from TRANSLATION_MODELS_MAX_MB / TRANSLATION_MODEL_RETRY_SECONDS."""
+    max_mb = int(os.getenv("TRANSLATION_MODELS_MAX_MB", "1200"))
+    retry_seconds = int(os.getenv("TRANSLATION_MODEL_RETRY_SECONDS", "300"))
+    return TranslationModelRegistry(max_mb * MB, retry_seconds=retry_seconds)
+
+
+def preload_languages():
+    """Target languages listed in TRANSLATION_PRELOAD (comma-separated, e.g. "ar,fr")."""
+    return [lang.strip() for lang in os.getenv("TRANSLATION_PRELOAD", "").split(",") if lang.strip()]
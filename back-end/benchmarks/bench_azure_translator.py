@@ -0,0 +1,141 @@
+"""Benchmark: pooled, batched AzureTranslator vs one requests.post per text and language.
+
+Starts a local fake of the Translator v3 /translate endpoint (it "translates"
+by tagging each text with its target language) with configurable latency and
+throttling, then translates the same sentences into several languages both
+ways. The fake server counts TCP connections, so keep-alive reuse is visible.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_azure_translator --sentences 200 --langs ar fr de
+    python -m benchmarks.bench_azure_translator --throttle-every 3   # exercise 429 + Retry-After
+    python -m benchmarks.bench_azure_translator --serve 8766         # just run the fake server
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from app.azure_translator import AzureTranslator
+
+
+class FakeState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = 0.02
+        self.throttle_every = 0
+        self.requests = 0
+        self.connections = 0
+
+
+STATE = FakeState()
+
+
+class FakeAzureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with STATE.lock:
+            STATE.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"[]")
+        query = parse_qs(urlparse(self.path).query)
+        with STATE.lock:
+            STATE.requests += 1
+            n = STATE.requests
+        time.sleep(STATE.latency)
+        if not urlparse(self.path).path.endswith("/translate") or not self.headers.get("Ocp-Apim-Subscription-Key"):
+            return self._send(401, {"error": {"code": 401000, "message": "unauthorized"}})
+        if STATE.throttle_every and n % STATE.throttle_every == 0:
+            return self._send(429, {"error": {"code": 429001, "message": "too many requests"}}, {"Retry-After": "1"})
+        targets = query.get("to", [])
+        result = [{"translations": [{"text": f"[{lang}] {item['text']}", "to": lang} for lang in targets]}
+                  for item in body]
+        self._send(200, result)
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_fake(port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeAzureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def legacy_translate(endpoint, text, target):
+    """The old path: a fresh requests.post per text and language."""
+    response = requests.post(
+        endpoint + "/translate",
+        params={"api-version": "3.0", "from": "en", "to": target},
+        headers={"Ocp-Apim-Subscription-Key": "fake", "Content-type": "application/json"},
+        json=[{"text": text}],
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()[0]["translations"][0]["text"]
+
+
+def reset(throttle_every=0):
+    with STATE.lock:
+        STATE.requests = STATE.connections = 0
+        STATE.throttle_every = throttle_every
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--langs", nargs="+", default=["ar", "fr", "de"])
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="only run the fake server on PORT")
+    args = parser.parse_args()
+
+    STATE.latency = args.latency_ms / 1000
+    if args.serve:
+        server = ThreadingHTTPServer(("127.0.0.1", args.serve), FakeAzureHandler)
+        print(f"Fake Azure Translator on http://127.0.0.1:{args.serve} (set AZURE_TRANSLATOR_ENDPOINT to this)")
+        server.serve_forever()
+        return
+
+    server = start_fake()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    sentences = [f"Patient note sentence {i} with blood pressure and glucose values." for i in range(args.sentences)]
+
+    print(f"{'client':>10} {'http reqs':>10} {'connections':>12} {'seconds':>8}")
+    reset()
+    start = time.perf_counter()
+    for lang in args.langs:
+        for sentence in sentences:
+            legacy_translate(endpoint, sentence, lang)
+    print(f"{'legacy':>10} {STATE.requests:>10} {STATE.connections:>12} {time.perf_counter() - start:8.2f}")
+
+    reset(args.throttle_every)
+    client = AzureTranslator("fake", endpoint, region="local", max_retry_after=2)
+    start = time.perf_counter()
+    out = client.translate(sentences, args.langs)
+    elapsed = time.perf_counter() - start
+    assert out[args.langs[0]][0] == f"[{args.langs[0]}] {sentences[0]}"
+    print(f"{'pooled':>10} {STATE.requests:>10} {STATE.connections:>12} {elapsed:8.2f}")
+    print(f"client stats: {client.info()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
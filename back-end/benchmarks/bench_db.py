@@ -0,0 +1,130 @@
+"""Benchmark: concurrent report reads/writes on SQLite, default vs tuned settings.
+
+Builds a throwaway database with a reports table like the app's, prefilled
+with --rows reports, then runs --writers threads inserting reports (one commit
+each, as /process does) alongside --readers threads fetching the newest page
+(the /reports query) for --seconds. "default" uses SQLite's rollback journal
+and no index on created_at; "tuned" uses the app's pragmas (WAL, synchronous
+NORMAL, cache/mmap, busy timeout) and the created_at/id index.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_db --rows 20000 --writers 4 --readers 8 --seconds 5
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, Text, create_engine, insert, select
+
+from app.db_tuning import engine_options_from_env, install_sqlite_pragmas, sqlite_pragmas_from_env
+
+BODY = "Patient presents with chest pain and shortness of breath. " * 40
+
+
+def make_table(metadata, indexed):
+    table = Table(
+        "report", metadata,
+        Column("id", String(36), primary_key=True),
+        Column("user_id", Integer),
+        Column("original_text", Text),
+        Column("summary", Text),
+        Column("created_at", DateTime),
+    )
+    if indexed:
+        Index("ix_report_created_at_id", table.c.created_at, table.c.id)
+    return table
+
+
+def build(path, tuned, rows):
+    uri = f"sqlite:///{path}"
+    if tuned:
+        engine = create_engine(uri, **engine_options_from_env(uri))
+        install_sqlite_pragmas(engine, sqlite_pragmas_from_env())
+    else:
+        # Python's sqlite3 default lock wait, rollback journal, no index
+        engine = create_engine(uri, connect_args={"timeout": 5})
+    metadata = MetaData()
+    table = make_table(metadata, indexed=tuned)
+    metadata.create_all(engine)
+    start = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        batch = []
+        for i in range(rows):
+            batch.append({"id": str(uuid.uuid4()), "user_id": i % 50, "original_text": BODY,
+                          "summary": "Stable.", "created_at": start + timedelta(seconds=i)})
+            if len(batch) == 1000:
+                conn.execute(insert(table), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(table), batch)
+    return engine, table
+
+
+def run(engine, table, writers, readers, seconds):
+    stop = time.monotonic() + seconds
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    read_ms = []
+    lock = threading.Lock()
+    page = (select(table.c.id, table.c.summary, table.c.created_at)
+            .order_by(table.c.created_at.desc(), table.c.id.desc()).limit(50))
+
+    def writer():
+        while time.monotonic() < stop:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(table), {"id": str(uuid.uuid4()), "user_id": 1, "original_text": BODY,
+                                                 "summary": "New.", "created_at": datetime.now()})
+                with lock:
+                    counts["writes"] += 1
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+
+    def reader():
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(page).fetchall()
+                with lock:
+                    counts["reads"] += 1
+                    read_ms.append((time.perf_counter() - start) * 1000)
+            except Exception:
+                with lock:
+                    counts["errors"] += 1
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    read_ms.sort()
+    p95 = read_ms[min(len(read_ms) - 1, int(len(read_ms) * 0.95))] if read_ms else float("nan")
+    return counts, p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'config':>8} {'writes/s':>9} {'reads/s':>9} {'read p95 ms':>12} {'errors':>7}")
+    for name, tuned in (("default", False), ("tuned", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, table = build(os.path.join(tmp, "bench.db"), tuned, args.rows)
+            counts, p95 = run(engine, table, args.writers, args.readers, args.seconds)
+            engine.dispose()
+        print(f"{name:>8} {counts['writes'] / args.seconds:9.1f} {counts['reads'] / args.seconds:9.1f}"
+              f" {p95:12.2f} {counts['errors']:7}")
+
+
+if __name__ == "__main__":
+    main()
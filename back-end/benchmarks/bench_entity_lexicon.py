@@ -0,0 +1,77 @@
+"""Benchmark: fallback entity extraction cost vs lexicon size.
+
+Compares the old keyword loop (one \\b regex search per term per call) with
+the single-pass EntityMatcher. The bundled entity lexicon is padded with
+synthetic terms to show how each approach scales.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_entity_lexicon --sizes 350 5000 50000
+"""
+import argparse
+import re
+import time
+
+from app.lexicon import EntityMatcher, lexicon_paths, load_lexicons
+
+PARAGRAPH = (
+    "History of type 2 diabetes and hypertension, on metformin and lisinopril. "
+    "Presents with chest pain and shortness of breath; troponin pending, aspirin given. "
+    "Mild anemia, hemoglobin 10.9 g/dL. Kidney function stable, no liver disease.\n"
+)
+
+LEGACY_MAX_TERMS = 5000  # the regex loop gets too slow to wait for beyond this
+
+
+def legacy_extract(text, keywords):
+    findings = {}
+    text_lower = text.lower()
+    for label, words in keywords.items():
+        for word in words:
+            if re.search(r'\b' + re.escape(word) + r'\b', text_lower):
+                findings.setdefault(label, set()).add(word.capitalize())
+    return {k: list(v) for k, v in findings.items()}
+
+
+def padded_lexicon(size):
+    mapping = load_lexicons(lexicon_paths("ENTITY_LEXICON_PATH", "entity_lexicon.tsv"))
+    labels = ("DISEASE", "CHEMICAL", "ANATOMY")
+    for i in range(max(0, size - len(mapping))):
+        mapping[f"syntheticterm{i} variant{i % 7}"] = labels[i % 3]
+    return dict(list(mapping.items())[:size])
+
+
+def time_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[350, 5000, 50000])
+    parser.add_argument("--chars", type=int, default=10000, help="length of the text to scan")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    text = (PARAGRAPH * (args.chars // len(PARAGRAPH) + 1))[:args.chars]
+    print(f"{'terms':>7} {'regex loop ms':>14} {'single pass ms':>15} {'build ms':>9} {'entities':>9}")
+    for size in args.sizes:
+        mapping = padded_lexicon(size)
+        start = time.perf_counter()
+        matcher = EntityMatcher(mapping)
+        build_ms = (time.perf_counter() - start) * 1000
+        single = time_call(lambda: matcher.group(text), args.repeat)
+        found = sum(len(v) for v in matcher.group(text).values())
+        if size <= LEGACY_MAX_TERMS:
+            keywords = {}
+            for term, label in mapping.items():
+                keywords.setdefault(label, []).append(term.lower())
+            legacy = f"{time_call(lambda: legacy_extract(text, keywords), max(1, args.repeat // 10)):14.2f}"
+        else:
+            legacy = f"{'(skipped)':>14}"
+        print(f"{size:>7} {legacy} {single:15.2f} {build_ms:9.1f} {found:9}")
+
+
+if __name__ == "__main__":
+    main()
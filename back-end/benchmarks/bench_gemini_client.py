@@ -0,0 +1,145 @@
+"""Benchmark: GeminiGateway behaviour against a local stub Gemini server.
+
+Starts an in-process HTTP server that answers generateContent like the
+Gemini API, with configurable latency and failures, and drives concurrent
+calls through the same gateway the app uses (GEMINI_BASE_URL points the
+google.genai client at the stub). Reports outcomes, retries, latency and
+breaker state per scenario. No API key or network access is needed.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_gemini_client --calls 40 --concurrency 8
+    python -m benchmarks.bench_gemini_client --serve 8765   # just run the stub
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.gemini_client import GeminiUnavailable, gateway_from_env
+
+# name: (latency seconds, status for failing requests, fail every Nth request (0 = never), deadline)
+SCENARIOS = {
+    "healthy": (0.05, 503, 0, 5.0),
+    "flaky_503": (0.05, 503, 2, 5.0),
+    "rate_limited_429": (0.05, 429, 3, 5.0),
+    "outage_500": (0.05, 500, 1, 5.0),
+    "slow": (3.0, 503, 0, 1.0),
+}
+
+RESPONSE_TEXT = json.dumps({"summary": "stub summary", "vitals": {}, "entities": {}})
+
+
+class StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = 0.05
+        self.fail_status = 503
+        self.fail_every = 0
+        self.requests = 0
+
+
+STATE = StubState()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        with STATE.lock:
+            STATE.requests += 1
+            n = STATE.requests
+            latency, status, every = STATE.latency, STATE.fail_status, STATE.fail_every
+        time.sleep(latency)
+        if not self.path.endswith(":generateContent"):
+            self._send(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+        elif every and n % every == 0:
+            self._send(status, {"error": {"code": status, "message": "stub failure", "status": "UNAVAILABLE"}},
+                       {"Retry-After": "1"} if status == 429 else None)
+        else:
+            self._send(200, {"candidates": [{"content": {"role": "model", "parts": [{"text": RESPONSE_TEXT}]},
+                                             "finishReason": "STOP", "index": 0}]})
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_stub(port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_scenario(name, calls, concurrency):
+    latency, status, every, deadline = SCENARIOS[name]
+    with STATE.lock:
+        STATE.latency, STATE.fail_status, STATE.fail_every, STATE.requests = latency, status, every, 0
+    gateway = gateway_from_env("stub-key", "gemini-1.5-flash")
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            gateway.generate("Summarize: patient stable.", deadline=deadline)
+            outcome = "ok"
+        except GeminiUnavailable:
+            outcome = "skipped"
+        except Exception:
+            outcome = "error"
+        return outcome, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(calls)))
+    wall = time.perf_counter() - start
+    latencies = sorted(r[1] for r in results)
+    counts = {k: sum(1 for r in results if r[0] == k) for k in ("ok", "error", "skipped")}
+    info = gateway.info()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    print(f"{name:>17} {counts['ok']:>4} {counts['error']:>6} {counts['skipped']:>8} {info['retries']:>8}"
+          f" {STATE.requests:>9} {p50:8.0f} {p95:8.0f} {wall:7.2f} {info['breaker']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--serve", type=int, metavar="PORT", help="only run the stub server on PORT")
+    args = parser.parse_args()
+
+    if args.serve:
+        server = ThreadingHTTPServer(("127.0.0.1", args.serve), StubHandler)
+        print(f"Stub Gemini listening on http://127.0.0.1:{args.serve}/ (set GEMINI_BASE_URL to this)")
+        server.serve_forever()
+        return
+
+    server = start_stub()
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/"
+    # Keep the demo quick: short backoff, and a generous rate limit unless overridden
+    os.environ.setdefault("GEMINI_BACKOFF_BASE", "0.1")
+    os.environ.setdefault("GEMINI_RATE_PER_MIN", "6000")
+    os.environ.setdefault("GEMINI_BURST", "50")
+    print(f"{'scenario':>17} {'ok':>4} {'errors':>6} {'skipped':>8} {'retries':>8}"
+          f" {'http_reqs':>9} {'p50 ms':>8} {'p95 ms':>8} {'wall s':>7} {'breaker':>10}")
+    for name in args.scenarios:
+        run_scenario(name, args.calls, args.concurrency)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark: per-page cost of the temp-file JPEG pipeline vs the in-memory one.
+
+The legacy path mirrors the old pdf_to_text/image_to_text hand-off: save the
+rendered page as JPEG, cv2.imread it, write a .processed.jpg and reopen it with
+PIL. The in-memory path passes the PIL page straight to load_gray_image.
+Both run the same denoise + threshold; add --ocr to include Tesseract.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_image_pipeline --pages 8 --ocr
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+from PIL import Image, ImageDraw
+
+from app import ocr
+from benchmarks.bench_pdf_ocr import SAMPLE_LINES
+
+def preprocess(gray):
+    denoised = cv2.fastNlMeansDenoising(gray, h=10)
+    return cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+
+
+def make_page(n):
+    img = Image.new("RGB", (2480, 3508), "white")  # A4 @ 300 DPI, like pdf2image output
+    draw = ImageDraw.Draw(img)
+    for i in range(40):
+        draw.text((150, 150 + i * 80), f"[p{n}] {SAMPLE_LINES[i % len(SAMPLE_LINES)]}", fill="black")
+    return img
+
+
+def legacy(page, run_ocr):
+    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
+        path = tmp.name
+    try:
+        page.save(path, "JPEG")
+        gray = cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2GRAY)
+        cv2.imwrite(path + ".processed.jpg", preprocess(gray))
+        img = Image.open(path + ".processed.jpg")
+        img.load()
+        if run_ocr:
+            import pytesseract
+            pytesseract.image_to_string(img, config="--oem 3 --psm 3")
+    finally:
+        for p in (path, path + ".processed.jpg"):
+            if os.path.exists(p):
+                os.unlink(p)
+
+
+def in_memory(page, run_ocr):
+    if run_ocr:
+        ocr.image_to_text(page)
+    else:
+        preprocess(ocr.load_gray_image(page))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--ocr", action="store_true", help="include Tesseract recognition")
+    args = parser.parse_args()
+
+    pages = [make_page(n + 1) for n in range(args.pages)]
+    results = {}
+    for name, fn in (("temp-file JPEG", legacy), ("in-memory", in_memory)):
+        start = time.perf_counter()
+        for page in pages:
+            fn(page, args.ocr)
+        results[name] = (time.perf_counter() - start) / len(pages)
+
+    for name, per_page in results.items():
+        print(f"{name:>15}: {per_page * 1000:8.1f} ms/page")
+    saved = results["temp-file JPEG"] - results["in-memory"]
+    print(f"{'saved':>15}: {saved * 1000:8.1f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark: extract_entities latency and peak memory vs document length.
+
+Repeats a synthetic clinical paragraph to build documents of increasing size
+and reports wall-clock time and tracemalloc peak; both should grow linearly.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_ner --sizes 10000 50000 200000 500000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.isolated_app import load_app
+
+PARAGRAPH = (
+    "The patient has a history of type 2 diabetes mellitus and hypertension treated with "
+    "metformin and lisinopril. Recent labs show anemia with hemoglobin 10.1 g/dL. "
+    "She reports fatigue and dyspnea on exertion; aspirin was started for chest pain.\n"
+)
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 200000, 500000])
+    args = parser.parse_args()
+
+    main = load_app()
+    if main.nlp is None:
+        print("No spaCy model loaded; timing the keyword fallback.")
+    print(f"{'chars':>9} {'seconds':>8} {'us/char':>8} {'peak MB':>8} {'entities':>9}")
+    for size in args.sizes:
+        text = (PARAGRAPH * (size // len(PARAGRAPH) + 1))[:size]
+        tracemalloc.start()
+        start = time.perf_counter()
+        entities = main.extract_entities(text)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        count = sum(len(v) for v in entities.values() if isinstance(v, list))
+        print(f"{size:>9} {elapsed:>8.2f} {elapsed / size * 1e6:>8.2f} {peak / 2**20:>8.1f} {count:>9}")
+
+
+if __name__ == "__main__":
+    main_()
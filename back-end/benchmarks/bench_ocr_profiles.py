@@ -0,0 +1,97 @@
+"""Benchmark: OCR time and accuracy per preprocessing profile.
+
+Fixtures are image files with a same-named .txt holding the expected text
+(e.g. fixtures/cbc.png + fixtures/cbc.txt). Without --fixtures, clean, noisy
+and low-contrast synthetic pages are generated. Accuracy is the character
+similarity (difflib ratio) between OCR output and the expected text.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_ocr_profiles --fixtures path/to/fixtures
+"""
+import argparse
+import difflib
+import os
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from app import ocr
+from benchmarks.bench_pdf_ocr import SAMPLE_LINES
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp"}
+
+
+def synthetic_fixtures():
+    text = "\n".join(SAMPLE_LINES * 3)
+    img = Image.new("L", (1700, 1100), 255)
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(text.splitlines()):
+        draw.text((80, 60 + i * 80), line, fill=0)
+    clean = np.asarray(img)
+    rng = np.random.default_rng(0)
+    noisy = np.clip(clean + rng.normal(0, 25, clean.shape), 0, 255).astype(np.uint8)
+    faded = (clean * 0.35 + 140).astype(np.uint8)
+    return [("clean", clean, text), ("noisy", noisy, text), ("low-contrast", faded, text)]
+
+
+def load_fixtures(folder):
+    fixtures = []
+    for name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(name)
+        truth = os.path.join(folder, stem + ".txt")
+        if ext.lower() in IMAGE_EXTENSIONS and os.path.exists(truth):
+            gray = cv2.imread(os.path.join(folder, name), cv2.IMREAD_GRAYSCALE)
+            with open(truth) as fh:
+                fixtures.append((stem, gray, fh.read()))
+    return fixtures
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, normalize(a), normalize(b)).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", help="folder of images with matching .txt ground truth")
+    parser.add_argument("--no-ocr", action="store_true", help="time preprocessing only")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else synthetic_fixtures()
+    if not fixtures:
+        raise SystemExit("No fixtures found")
+
+    for stem, gray, _ in fixtures:
+        quality = ocr.probe_image_quality(gray)
+        print(f"{stem:>14}: noise={quality['noise']:.2f} contrast={quality['contrast']:.0f}"
+              f" -> auto picks {ocr.choose_ocr_profile(gray)}")
+    print()
+
+    print(f"{'profile':>10} {'preprocess ms':>14} {'total ms':>9} {'accuracy':>9}")
+    for profile in ("auto",) + ocr.OCR_PROFILES:
+        prep_times, total_times, scores = [], [], []
+        for _, gray, truth in fixtures:
+            start = time.perf_counter()
+            ocr.preprocess_for_ocr(gray, profile)
+            prep_times.append(time.perf_counter() - start)
+            if args.no_ocr:
+                continue
+            start = time.perf_counter()
+            try:
+                text = ocr.image_to_text(gray, profile)
+            except RuntimeError:
+                text = ""
+            total_times.append(time.perf_counter() - start)
+            scores.append(similarity(text, truth))
+        total = f"{np.mean(total_times) * 1000:9.1f}" if total_times else f"{'-':>9}"
+        accuracy = f"{np.mean(scores):9.3f}" if scores else f"{'-':>9}"
+        print(f"{profile:>10} {np.mean(prep_times) * 1000:14.1f} {total} {accuracy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark: wall-clock time of scanned-PDF OCR vs page count and OCR_WORKERS.
+
+Builds synthetic image-only PDFs (no text layer, so every page goes through
+pdf2image + Tesseract) and times pdf_to_text sequentially and with the pool.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_pdf_ocr --pages 1 2 4 8 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+from app import ocr
+
+SAMPLE_LINES = [
+    "Patient presents with elevated glucose and hypertension.",
+    "Hemoglobin 11.2 g/dL, white blood cells 7.4 x10^9/L.",
+    "BP 140/90 mmHg, HR 88 bpm, Temp 37.4 C, SpO2 97%.",
+    "Plan: start metformin 500 mg twice daily, recheck in 3 months.",
+]
+
+
+def make_scanned_pdf(path, pages):
+    """Write an image-only PDF with `pages` pages of typed lab text."""
+    images = []
+    for n in range(pages):
+        img = Image.new("RGB", (1654, 2339), "white")  # A4 @ 200 DPI
+        draw = ImageDraw.Draw(img)
+        y = 120
+        for i in range(30):
+            draw.text((120, y), f"[p{n + 1}] {SAMPLE_LINES[i % len(SAMPLE_LINES)]}", fill="black")
+            y += 60
+        images.append(img)
+    images[0].save(path, "PDF", save_all=True, append_images=images[1:], resolution=200)
+
+
+def run(pdf_path, workers):
+    ocr._reset_ocr_pool()
+    ocr.OCR_WORKERS = workers
+    if workers > 1:
+        # Start workers outside the timed region, as a long-running server would
+        ocr.get_ocr_pool().submit(int, 0).result()
+    start = time.perf_counter()
+    text = ocr.pdf_to_text(pdf_path)
+    elapsed = time.perf_counter() - start
+    ocr._reset_ocr_pool()
+    return elapsed, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+    os.environ.setdefault("MAX_PDF_PAGES", str(max(args.pages)))
+
+    print(f"{'pages':>5} {'1 worker (s)':>13} {f'{args.workers} workers (s)':>15} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = os.path.join(tmp, f"scan_{pages}.pdf")
+            make_scanned_pdf(pdf_path, pages)
+            seq, _ = run(pdf_path, 1)
+            par, _ = run(pdf_path, args.workers)
+            print(f"{pages:>5} {seq:>13.2f} {par:>15.2f} {seq / par:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
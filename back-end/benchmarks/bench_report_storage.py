@@ -0,0 +1,183 @@
+"""Benchmark: report storage size and read latency, plain text vs compressed, deduplicated bodies.
+
+Builds two throwaway SQLite databases holding the same --rows synthetic
+reports, a --duplicates fraction of which repeat an earlier upload's text:
+"plain" keeps every body in report.original_text as before; "compressed"
+stores each distinct body once, zlib-compressed, in report_text keyed by its
+SHA-256 (app.text_store). Both are indexed for search (app.report_search,
+whose contentless FTS5 table stores no text). Reports database file size and
+the index's share of it, insert and indexing time, the /reports list page (no
+text) and a single report with its text.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_report_storage --rows 20000 --duplicates 0.3
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import (JSON, Column, DateTime, ForeignKey, Index, Integer, LargeBinary, MetaData, String, Table,
+                        Text, create_engine, insert, select, text)
+
+from app.db_tuning import install_sqlite_pragmas, sqlite_pragmas_from_env
+from app.lexicon import lexicon_paths, load_lexicons
+from app.report_search import SqliteReportSearch, backfill
+from app.text_store import compress_text, decompress_text, text_digest
+
+SENTENCES = (
+    "Patient seen in clinic today accompanied by family.",
+    "Vitals reviewed: BP {bp}/{dia} mmHg, HR {hr} bpm, SpO2 {spo2}% on room air.",
+    "History of {dx} managed with {rx}.",
+    "Laboratory results: HbA1c {a1c}%, creatinine {cr} mg/dL, potassium {k} mmol/L.",
+    "No acute distress. Lungs clear to auscultation bilaterally.",
+    "Plan discussed; follow up in {weeks} weeks or sooner if symptoms worsen.",
+    "Continue {rx} and review medication adherence at next visit.",
+)
+
+
+def synthetic_bodies(count, duplicates, seed=11):
+    """OCR-like report bodies (~4-8KB), a fraction of them repeats of earlier ones."""
+    lexicon = load_lexicons(lexicon_paths("ENTITY_LEXICON_PATH", "entity_lexicon.tsv"))
+    diseases = [t for t, label in lexicon.items() if label == "DISEASE"]
+    drugs = [t for t, label in lexicon.items() if label == "CHEMICAL"]
+    rnd = random.Random(seed)
+    bodies = []
+    for _ in range(count):
+        if bodies and rnd.random() < duplicates:
+            bodies.append(rnd.choice(bodies))
+            continue
+        lines = []
+        for _ in range(rnd.randint(40, 80)):
+            lines.append(rnd.choice(SENTENCES).format(
+                bp=rnd.randint(100, 170), dia=rnd.randint(60, 100), hr=rnd.randint(50, 110),
+                spo2=rnd.randint(90, 100), dx=rnd.choice(diseases), rx=rnd.choice(drugs),
+                a1c=round(rnd.uniform(5, 11), 1), cr=round(rnd.uniform(0.5, 2.5), 2),
+                k=round(rnd.uniform(3.2, 5.6), 1), weeks=rnd.randint(1, 12)))
+        bodies.append(" ".join(lines))
+    return bodies
+
+
+def make_tables(metadata):
+    report_text = Table(
+        "report_text", metadata,
+        Column("hash", String(64), primary_key=True),
+        Column("data", LargeBinary, nullable=False),
+        Column("size", Integer),
+        Column("stored_size", Integer),
+    )
+    report = Table(
+        "report", metadata,
+        Column("id", String(36), primary_key=True),
+        Column("original_text", Text),
+        Column("text_hash", String(64), ForeignKey("report_text.hash"), index=True),
+        Column("summary", Text),
+        Column("entities", JSON),
+        Column("created_at", DateTime),
+    )
+    Index("ix_report_created_at_id", report.c.created_at, report.c.id)
+    return report, report_text
+
+
+def build(path, bodies, compressed):
+    engine = create_engine(f"sqlite:///{path}")
+    install_sqlite_pragmas(engine, sqlite_pragmas_from_env())
+    metadata = MetaData()
+    report, report_text = make_tables(metadata)
+    metadata.create_all(engine)
+    start_at = datetime(2025, 1, 1)
+    stored = set()
+    ids = []
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for i, body in enumerate(bodies):
+            row = {"id": str(uuid.uuid4()), "summary": "Stable; continue current plan.",
+                   "entities": {"CHEMICAL": ["metformin"]}, "created_at": start_at + timedelta(seconds=i)}
+            if compressed:
+                digest = text_digest(body)
+                if digest not in stored:
+                    data = compress_text(body)
+                    conn.execute(insert(report_text), {"hash": digest, "data": data,
+                                                       "size": len(body.encode("utf-8")), "stored_size": len(data)})
+                    stored.add(digest)
+                row["text_hash"] = digest
+            else:
+                row["original_text"] = body
+            conn.execute(insert(report), row)
+            ids.append(row["id"])
+    insert_s = time.perf_counter() - started
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        search = SqliteReportSearch()
+        search.setup(conn)
+        backfill(search, conn)
+    index_s = time.perf_counter() - started
+    engine.dispose()
+    # Rebuild the file so free pages do not count towards its size
+    with create_engine(f"sqlite:///{path}").connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+        conn.exec_driver_sql("VACUUM")
+        fts_bytes = conn.execute(text("SELECT sum(pgsize) FROM dbstat WHERE name LIKE 'report_fts%'")).scalar()
+    return ids, insert_s, index_s, fts_bytes
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def read_latency(path, ids, compressed, repeat, seed=3):
+    engine = create_engine(f"sqlite:///{path}")
+    install_sqlite_pragmas(engine, sqlite_pragmas_from_env())
+    report, report_text = make_tables(MetaData())
+    page = (select(report.c.id, report.c.summary, report.c.created_at)
+            .order_by(report.c.created_at.desc(), report.c.id.desc()).limit(50))
+    with_body = report.outerjoin(report_text, report_text.c.hash == report.c.text_hash)
+    rnd = random.Random(seed)
+    with engine.connect() as conn:
+        def read_one():
+            report_id = rnd.choice(ids)
+            if compressed:
+                data = conn.execute(select(report_text.c.data).select_from(with_body)
+                                    .where(report.c.id == report_id)).scalar_one()
+                return decompress_text(data)
+            return conn.execute(select(report.c.original_text).where(report.c.id == report_id)).scalar_one()
+
+        list_ms = timed(lambda: conn.execute(page).fetchall(), repeat)
+        one_ms = timed(read_one, repeat)
+    engine.dispose()
+    return list_ms, one_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--duplicates", type=float, default=0.3, help="fraction of uploads repeating earlier text")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    bodies = synthetic_bodies(args.rows, args.duplicates)
+    raw_mb = sum(len(b.encode("utf-8")) for b in bodies) / 1e6
+    print(f"{args.rows} reports, {len(set(bodies))} distinct bodies, {raw_mb:.1f}MB of text")
+    print(f"{'storage':>11} {'db MB':>8} {'fts MB':>7} {'insert s':>9} {'index s':>8} {'list p50 ms':>12}"
+          f" {'list p95 ms':>12} {'text p50 ms':>12} {'text p95 ms':>12}")
+    for name, compressed in (("plain", False), ("compressed", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reports.db")
+            ids, insert_s, index_s, fts_bytes = build(path, bodies, compressed)
+            size_mb = os.path.getsize(path) / 1e6
+            (list_p50, list_p95), (one_p50, one_p95) = read_latency(path, ids, compressed, args.repeat)
+        print(f"{name:>11} {size_mb:8.1f} {fts_bytes / 1e6:7.1f} {insert_s:9.2f} {index_s:8.2f} {list_p50:12.3f}"
+              f" {list_p95:12.3f} {one_p50:12.3f} {one_p95:12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark: /reports/search query latency vs number of reports, FTS5 vs LIKE scan.
+
+Builds a throwaway SQLite database of synthetic reports (terms drawn from
+the bundled entity lexicon), indexes it with the app's SqliteReportSearch
+and times a set of queries, compared with the LIKE '%term%' scan clients
+would otherwise need.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_search --rows 10000 100000 300000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from app.db_tuning import install_sqlite_pragmas, sqlite_pragmas_from_env
+from app.lexicon import lexicon_paths, load_lexicons
+from app.report_search import SqliteReportSearch, backfill
+
+QUERIES = ["metformin", "chest pain", '"type 2 diabetes"', "hypertension lisinopril", "warfar", "no-such-term"]
+FILLER = ("Patient seen in clinic today. Vitals reviewed and stable. Plan discussed with the patient "
+          "and family, follow up in four weeks or sooner if symptoms worsen. ")
+
+
+def synthetic_reports(count, seed=7):
+    lexicon = load_lexicons(lexicon_paths("ENTITY_LEXICON_PATH", "entity_lexicon.tsv"))
+    diseases = [t for t, label in lexicon.items() if label == "DISEASE"]
+    drugs = [t for t, label in lexicon.items() if label == "CHEMICAL"]
+    rnd = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        dx = rnd.sample(diseases, 2)
+        rx = rnd.sample(drugs, 2)
+        body = f"History of {dx[0]} and {dx[1]}. Currently taking {rx[0]} and {rx[1]}. " + FILLER * 3
+        yield {
+            "id": str(uuid.uuid4()),
+            "original_text": body,
+            "summary": f"Follow-up for {dx[0]}; continue {rx[0]}.",
+            "entities": json.dumps({"Diseases & Symptoms": dx, "Medications": rx}),
+            "created_at": start + timedelta(minutes=i),
+        }
+
+
+def build(path, rows):
+    engine = create_engine(f"sqlite:///{path}")
+    install_sqlite_pragmas(engine, sqlite_pragmas_from_env())
+    search = SqliteReportSearch()
+    insert = text("INSERT INTO report (id, original_text, summary, entities, created_at)"
+                  " VALUES (:id, :original_text, :summary, :entities, :created_at)")
+    with engine.begin() as conn:
+        # Bodies stay in original_text (text_hash NULL), which the index reads like a pre-report_text row
+        conn.execute(text("CREATE TABLE report_text (hash VARCHAR(64) PRIMARY KEY, data BLOB)"))
+        conn.execute(text("CREATE TABLE report (id VARCHAR(36) PRIMARY KEY, original_text TEXT,"
+                          " text_hash VARCHAR(64), summary TEXT, entities JSON, created_at DATETIME)"))
+        batch = []
+        for row in synthetic_reports(rows):
+            batch.append(row)
+            if len(batch) == 5000:
+                conn.execute(insert, batch)
+                batch = []
+        if batch:
+            conn.execute(insert, batch)
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        search.setup(conn)
+        backfill(search, conn, batch_size=5000)
+    return engine, search, time.perf_counter() - start
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--like-max-rows", type=int, default=100000, help="skip the LIKE scan above this size")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, search, index_s = build(os.path.join(tmp, "search.db"), rows)
+            size_mb = os.path.getsize(os.path.join(tmp, "search.db")) / 1e6
+            print(f"\n{rows} reports: index built in {index_s:.1f}s, database {size_mb:.0f}MB")
+            print(f"{'query':>26} {'hits':>5} {'fts p50 ms':>11} {'fts p95 ms':>11} {'LIKE p50 ms':>12}")
+            with engine.connect() as conn:
+                for q in QUERIES:
+                    hits = search.search(conn, q, limit=20)
+                    p50, p95 = timed(lambda: search.search(conn, q, limit=20), args.repeat)
+                    if rows <= args.like_max_rows:
+                        term = q.strip('"').split()[0]
+                        like = text("SELECT id FROM report WHERE original_text LIKE :t OR summary LIKE :t"
+                                    " ORDER BY created_at DESC LIMIT 21")
+                        like_p50 = f"{timed(lambda: conn.execute(like, {'t': f'%{term}%'}).fetchall(), 3)[0]:12.1f}"
+                    else:
+                        like_p50 = f"{'(skipped)':>12}"
+                    print(f"{q:>26} {len(hits):>5} {p50:11.2f} {p95:11.2f} {like_p50}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
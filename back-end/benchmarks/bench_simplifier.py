@@ -0,0 +1,70 @@
+"""Benchmark: per-call cost of term simplification vs lexicon size.
+
+Compares the old approach (lowercase, then one re.sub per term) with the
+single-pass TermSimplifier. The bundled lexicon is padded with synthetic
+terms to show how each approach scales.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_simplifier --sizes 34 1000 10000 50000
+"""
+import argparse
+import re
+import time
+
+from app.lexicon import TermSimplifier, lexicon_paths, load_lexicons
+
+PARAGRAPH = (
+    "Chronic hypertension with elevated glucose and decreased hemoglobin. "
+    "Bilateral edema noted; patient reports fatigue and dyspnea on exertion. "
+    "Echocardiogram unremarkable, prognosis good, follow up prn.\n"
+)
+
+LEGACY_MAX_TERMS = 5000  # the regex loop gets too slow to wait for beyond this
+
+
+def legacy_simplify(text, patterns):
+    simplified = text.lower()
+    for pattern, simple in patterns:
+        simplified = pattern.sub(simple, simplified)
+    return simplified.capitalize()
+
+
+def padded_lexicon(size):
+    mapping = load_lexicons(lexicon_paths("SIMPLIFY_LEXICON_PATH", "simplification_lexicon.tsv"))
+    for i in range(max(0, size - len(mapping))):
+        mapping[f"syntheticterm{i} variant{i % 7}"] = f"plain wording {i}"
+    return dict(list(mapping.items())[:size])
+
+
+def time_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[34, 1000, 10000, 50000])
+    parser.add_argument("--chars", type=int, default=10000, help="length of the text to simplify")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    text = (PARAGRAPH * (args.chars // len(PARAGRAPH) + 1))[:args.chars]
+    print(f"{'terms':>7} {'re.sub loop ms':>15} {'single pass ms':>15} {'build ms':>9}")
+    for size in args.sizes:
+        mapping = padded_lexicon(size)
+        start = time.perf_counter()
+        simplifier = TermSimplifier(mapping)
+        build_ms = (time.perf_counter() - start) * 1000
+        single = time_call(lambda: simplifier.simplify(text), args.repeat)
+        if size <= LEGACY_MAX_TERMS:
+            patterns = [(re.compile(r"\b" + re.escape(t.lower()) + r"\b"), v) for t, v in mapping.items()]
+            legacy = f"{time_call(lambda: legacy_simplify(text, patterns), max(1, args.repeat // 10)):15.2f}"
+        else:
+            legacy = f"{'(skipped)':>15}"
+        print(f"{size:>7} {legacy} {single:15.2f} {build_ms:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: summarization throughput and p95 latency with and without micro-batching.
+
+Fires concurrent summarize_text calls at several concurrency levels, once with
+batching disabled (SUMMARY_BATCH_MAX=1 behaviour) and once enabled.
+Requires the distilbart summarization pipeline to be loadable.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_summary_batching --concurrency 1 4 8 16 --requests 32
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.bench_ner import PARAGRAPH
+from benchmarks.isolated_app import load_app
+
+
+def run(main, concurrency, requests, batch_max):
+    main.SUMMARY_BATCH_MAX = batch_max
+    texts = [f"Report {i}. " + PARAGRAPH * 6 for i in range(requests)]
+    latencies = []
+
+    def one(text):
+        start = time.perf_counter()
+        main.summarize_text(text)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, texts))
+    wall = time.perf_counter() - start
+    return requests / wall, float(np.percentile(latencies, 95))
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=32)
+    args = parser.parse_args()
+
+    main = load_app()
+    main.models_ready.wait()
+    if main.summarizer is None:
+        raise SystemExit("Summarization pipeline not loaded (install torch + transformers).")
+    batch_max = max(2, main.summary_batcher.max_batch_size)
+
+    print(f"{'conc':>4} {'unbatched req/s':>16} {'p95 s':>7} {'batched req/s':>14} {'p95 s':>7}")
+    for concurrency in args.concurrency:
+        plain = run(main, concurrency, args.requests, 1)
+        batched = run(main, concurrency, args.requests, batch_max)
+        print(f"{concurrency:>4} {plain[0]:>16.2f} {plain[1]:>7.2f} {batched[0]:>14.2f} {batched[1]:>7.2f}")
+    print(main.summary_batcher.info())
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,17 @@
+"""Import app.main against throwaway databases.
+
+app.main creates, migrates and seeds its database at import time; pointing
+it at a temporary directory first keeps benchmarks away from instance/.
+"""
+import os
+import tempfile
+
+
+def load_app():
+    """Return the app.main module, importing it with its databases in a temp dir."""
+    tmp = tempfile.mkdtemp(prefix="ai_med_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'app.db')}"
+    os.environ["ANALYSIS_CACHE_PATH"] = os.path.join(tmp, "analysis_cache.db")
+    os.environ["TRANSLATION_CACHE_PATH"] = os.path.join(tmp, "translation_cache.db")
+    from app import main
+    return main
@@ -0,0 +1,33 @@
+"""Shared fixtures. Run from back-end/: python -m pytest -q
+
+The app configures itself at import time, so the environment is pointed at
+throwaway databases before app.main is first imported.
+"""
+import os
+import tempfile
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="ai_med_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'app.db')}"
+os.environ["ANALYSIS_CACHE_PATH"] = os.path.join(_TMP, "analysis_cache.db")
+os.environ["TRANSLATION_CACHE_PATH"] = os.path.join(_TMP, "translation_cache.db")
+# No external services, whatever a local .env says
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["AZURE_TRANSLATOR_KEY"] = ""
+
+
+@pytest.fixture(scope="session")
+def main():
+    from app import main as app_main
+    return app_main
+
+
+@pytest.fixture
+def client(main):
+    with main.app.app_context():
+        main.db.session.execute(main.db.text("DELETE FROM report"))
+        # Raw deletes skip the ORM hooks, and SQLite reuses the freed rowids
+        main.db.session.execute(main.db.text("INSERT INTO report_fts(report_fts) VALUES ('delete-all')"))
+        main.db.session.commit()
+    return main.app.test_client()
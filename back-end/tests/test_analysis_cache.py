@@ -0,0 +1,53 @@
+import time
+
+from app.analysis_cache import AnalysisCache
+
+
+def test_memory_tier_keeps_most_recently_used(tmp_path):
+    cache = AnalysisCache(None, memory_items=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_disk_tier_evicts_least_recently_used_to_fit_max_bytes(tmp_path):
+    # Each payload is 12 bytes of JSON; room for two of them
+    cache = AnalysisCache(tmp_path / "cache.db", memory_items=0, max_bytes=30)
+    cache.put("a", "x" * 10)
+    time.sleep(0.01)
+    cache.put("b", "y" * 10)
+    time.sleep(0.01)
+    assert cache.get("a") == "x" * 10  # now more recently used than b
+    time.sleep(0.01)
+    cache.put("c", "z" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10
+    assert cache.get("c") == "z" * 10
+    assert cache.info()["evictions"] == 1
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    AnalysisCache(tmp_path / "cache.db").put("k", {"summary": "ok"})
+    reopened = AnalysisCache(tmp_path / "cache.db")
+    assert reopened.get("k") == {"summary": "ok"}
+    assert reopened.info()["disk_hits"] == 1
+
+
+def test_put_many_stores_every_item(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache.db", memory_items=0)
+    cache.put_many([(f"k{i}", i) for i in range(50)])
+    assert [cache.get(f"k{i}") for i in range(50)] == list(range(50))
+    assert cache.info()["disk_entries"] == 50
+
+
+def test_byte_total_is_tracked_across_stores_and_evictions(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache.db", memory_items=0, max_bytes=1000)
+    for i in range(200):
+        cache.put(f"k{i}", "x" * 40)
+    info = cache.info()
+    assert info["disk_bytes"] <= 1000
+    assert cache._disk_bytes == info["disk_bytes"]
+    assert cache.get("k199") == "x" * 40
+    assert cache.get("k0") is None
@@ -0,0 +1,51 @@
+import threading
+
+from app.batching import MicroBatcher
+
+
+def recording_batcher(**kwargs):
+    calls = []
+    release = threading.Event()
+
+    def fn(items, **options):
+        release.wait(5)
+        calls.append((list(items), options))
+        return [f"{item}-{options.get('lang', '')}" for item in items]
+
+    return MicroBatcher(fn, **kwargs), calls, release
+
+
+def test_items_with_the_same_options_share_a_call():
+    batcher, calls, release = recording_batcher(max_batch_size=8, max_wait_ms=200)
+    futures = [batcher.submit_async(i, lang="en") for i in range(3)] + [batcher.submit_async(9, lang="ar")]
+    release.set()
+    assert [f.result(5) for f in futures] == ["0-en", "1-en", "2-en", "9-ar"]
+    assert sorted(calls, key=lambda c: c[1]["lang"]) == [([9], {"lang": "ar"}), ([0, 1, 2], {"lang": "en"})]
+    assert batcher.info()["max_batch"] == 3
+
+
+def test_batches_are_capped_at_max_batch_size():
+    batcher, calls, release = recording_batcher(max_batch_size=2, max_wait_ms=200)
+    futures = [batcher.submit_async(i) for i in range(5)]
+    release.set()
+    assert [f.result(5) for f in futures] == [f"{i}-" for i in range(5)]
+    assert max(len(items) for items, _ in calls) == 2
+
+
+def test_cancelled_item_is_skipped():
+    batcher, calls, release = recording_batcher(max_batch_size=8, max_wait_ms=200)
+    first, second, third = (batcher.submit_async(i) for i in range(3))
+    assert second.cancel()
+    release.set()
+    assert (first.result(5), third.result(5)) == ("0-", "2-")
+    assert calls == [([0, 2], {})]
+
+
+def test_batch_exception_reaches_every_caller():
+    def fn(items):
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(fn, max_wait_ms=50)
+    futures = [batcher.submit_async(i) for i in range(2)]
+    for f in futures:
+        assert isinstance(f.exception(5), ValueError)
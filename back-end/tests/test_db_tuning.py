@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, create_engine, inspect
+
+from app.db_tuning import ensure_columns, ensure_indexes
+
+
+def report_table(metadata, with_index):
+    table = Table("report", metadata, Column("id", Integer, primary_key=True), Column("created_at", String(20)),
+                  Column("text_hash", String(64)))
+    if with_index:
+        Index("ix_report_created_at_id", table.c.created_at, table.c.id)
+    return table
+
+
+def test_existing_database_gets_new_columns_and_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE report (id INTEGER PRIMARY KEY, created_at VARCHAR(20))")
+    metadata = MetaData()
+    report_table(metadata, with_index=True)
+
+    assert ensure_columns(engine, metadata) == ["report.text_hash"]
+    assert ensure_indexes(engine, metadata) == ["ix_report_created_at_id"]
+    assert "ix_report_created_at_id" in {ix["name"] for ix in inspect(engine).get_indexes("report")}
+    # Second start: nothing left to do
+    assert ensure_columns(engine, metadata) == []
+    assert ensure_indexes(engine, metadata) == []
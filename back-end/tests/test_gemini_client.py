@@ -0,0 +1,164 @@
+import time
+
+import pytest
+
+from app import gemini_client
+from app.gemini_client import CircuitBreaker, GeminiGateway, GeminiUnavailable, TokenBucket
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    bucket = TokenBucket(rate=20, capacity=2)
+    assert bucket.acquire() and bucket.acquire()
+    assert not bucket.acquire()
+    assert bucket.acquire(timeout=0.5)  # one token every 50ms
+
+
+def test_token_bucket_gives_up_when_the_wait_exceeds_the_timeout():
+    bucket = TokenBucket(rate=1, capacity=1)
+    assert bucket.acquire()
+    started = time.monotonic()
+    assert not bucket.acquire(timeout=0.1)
+    assert time.monotonic() - started < 0.5
+
+
+def test_breaker_opens_after_threshold_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_released_trial_can_be_retried():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release_trial()
+    assert breaker.allow()
+
+
+class ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class FakeClient:
+    """Stands in for google.genai.Client: answers generate_content from a script."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.models = self
+
+    def generate_content(self, model, contents, config):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return type("Response", (), {"text": outcome})()
+
+
+def gateway(client, **kwargs):
+    options = {"max_retries": 3, "backoff_base": 0.001, "backoff_max": 0.001, "rate_per_minute": 6000,
+               "burst": 100, "breaker": CircuitBreaker(failure_threshold=2, reset_seconds=60)}
+    options.update(kwargs)
+    return GeminiGateway(client, "test-model", **options)
+
+
+def test_retryable_errors_are_retried():
+    client = FakeClient(ApiError(503), ApiError(429), "ok")
+    gw = gateway(client)
+    assert gw.generate("prompt") == "ok"
+    assert client.calls == 3
+    assert gw.info()["retries"] == 2
+    assert gw.breaker.failures == 0
+
+
+def test_fatal_error_is_raised_without_retrying():
+    client = FakeClient(ApiError(400), "never reached")
+    gw = gateway(client)
+    with pytest.raises(ApiError):
+        gw.generate("prompt")
+    assert client.calls == 1
+    assert gw.breaker.failures == 1
+
+
+def test_giving_up_after_max_retries_counts_one_breaker_failure():
+    client = FakeClient(*[ApiError(503)] * 3)
+    gw = gateway(client, max_retries=2)
+    with pytest.raises(ApiError):
+        gw.generate("prompt")
+    assert client.calls == 3
+    assert gw.breaker.failures == 1
+
+
+def test_no_retry_when_backoff_would_pass_the_deadline(monkeypatch):
+    monkeypatch.setattr(gemini_client.random, "uniform", lambda low, high: high)
+    client = FakeClient(ApiError(503), "too late")
+    gw = gateway(client, backoff_base=5, backoff_max=5)
+    started = time.monotonic()
+    with pytest.raises(ApiError):
+        gw.generate("prompt", deadline=1.0)
+    assert client.calls == 1
+    assert time.monotonic() - started < 0.5
+
+
+def test_breaker_opens_and_rejects_without_calling_gemini():
+    client = FakeClient(ApiError(400), ApiError(400))
+    gw = gateway(client)
+    for _ in range(2):
+        with pytest.raises(ApiError):
+            gw.generate("prompt")
+    assert not gw.available()
+    with pytest.raises(GeminiUnavailable):
+        gw.generate("prompt")
+    assert client.calls == 2
+    assert gw.info()["rejected"] == 1
+
+
+def test_successful_trial_closes_the_breaker():
+    client = FakeClient(ApiError(400), "ok")
+    gw = gateway(client, breaker=CircuitBreaker(failure_threshold=1, reset_seconds=0.05))
+    with pytest.raises(ApiError):
+        gw.generate("prompt")
+    time.sleep(0.06)
+    assert gw.generate("prompt") == "ok"
+    assert gw.breaker.state == "closed"
+
+
+def test_trial_slot_is_released_when_the_call_never_goes_out():
+    client = FakeClient(ApiError(400), "ok")
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    gw = gateway(client, rate_per_minute=0.001, burst=1, breaker=breaker)
+    with pytest.raises(ApiError):
+        gw.generate("prompt")  # uses the only token
+    time.sleep(0.06)
+    with pytest.raises(GeminiUnavailable, match="rate limit"):
+        gw.generate("prompt", deadline=0.1)
+    assert client.calls == 1
+    assert gw.breaker.allow()  # the half-open trial is still available
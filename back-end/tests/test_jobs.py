@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def jobs(main, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(main.job_executor, "submit", lambda fn, job_id: submitted.append(job_id))
+    with main.app.app_context():
+        main.Job.query.delete()
+        main.db.session.commit()
+
+    def add(status, worker_id=None, age=0):
+        with main.app.app_context():
+            job = main.Job(status=status, worker_id=worker_id, filename="scan.pdf")
+            main.db.session.add(job)
+            main.db.session.commit()
+            stamp = datetime.utcnow() - timedelta(seconds=age)
+            main.db.session.execute(main.db.text("UPDATE job SET updated_at = :t WHERE id = :id"),
+                                    {"t": stamp.strftime("%Y-%m-%d %H:%M:%S"), "id": job.id})
+            main.db.session.commit()
+            return job.id
+
+    def status(job_id):
+        with main.app.app_context():
+            return main.db.session.get(main.Job, job_id).status
+
+    return add, status, submitted
+
+
+def test_resume_leaves_jobs_with_a_live_lease_alone(main, jobs):
+    add, status, submitted = jobs
+    live = add("running", worker_id="other-host:1:abc", age=5)
+    main.resume_jobs()
+    assert status(live) == "running"
+    assert submitted == []
+
+
+def test_resume_requeues_abandoned_and_queued_jobs(main, jobs):
+    add, status, submitted = jobs
+    abandoned = add("running", worker_id="dead-host:1:abc", age=main.JOB_LEASE_SECONDS + 60)
+    queued = add("queued")
+    done = add("done", age=main.JOB_LEASE_SECONDS + 60)
+    main.resume_jobs()
+    assert status(abandoned) == "queued"
+    assert status(done) == "done"
+    assert sorted(submitted) == sorted([abandoned, queued])
+
+
+def test_run_job_only_runs_claimable_jobs(main, jobs):
+    add, status, _ = jobs
+    live = add("running", worker_id="other-host:1:abc")
+    main.run_job(live)  # not queued: must not be claimed, run or cleaned up
+    with main.app.app_context():
+        job = main.db.session.get(main.Job, live)
+        assert (job.status, job.worker_id, job.attempts) == ("running", "other-host:1:abc", 0)
+
+
+def test_done_job_stores_text_once_and_serves_it(main, client, jobs, monkeypatch):
+    add, status, _ = jobs
+    text = "Creatinine 1.1 mg/dL. " * 100
+    monkeypatch.setattr(main, "analyze_document", lambda *args, **kwargs: {
+        "raw_text": text, "summary": "Kidney function is normal.", "vitals": {}, "entities_pretty": {},
+        "translation": "", "translations": {}})
+    job_id = add("queued")
+    main.run_job(job_id)
+    assert status(job_id) == "done"
+    with main.app.app_context():
+        stored = main.db.session.get(main.Job, job_id).result
+    assert not {"raw_text", "text", "text_excerpt"} & set(stored)
+    result = client.get(f"/jobs/{job_id}").get_json()["result"]
+    assert result["raw_text"] == text
+    assert result["text_excerpt"] == text[:1000]
+    assert result["summary"] == "Kidney function is normal."
+
+
+def test_claiming_a_job_renews_its_lease_in_utc(main, jobs, monkeypatch):
+    add, _, _ = jobs
+    seen = {}
+
+    def analyze_document(*args, **kwargs):
+        seen["updated_at"] = main.db.session.get(main.Job, job_id).updated_at
+        return None
+
+    monkeypatch.setattr(main, "analyze_document", analyze_document)
+    job_id = add("queued", age=main.JOB_LEASE_SECONDS * 10)
+    main.run_job(job_id)
+    assert abs(seen["updated_at"] - main.utc_now()) < timedelta(seconds=5)
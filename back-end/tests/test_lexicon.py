@@ -0,0 +1,29 @@
+from app.lexicon import EntityMatcher, PhraseIndex, TermSimplifier, lexicon_paths, load_lexicons
+
+
+def test_phrase_index_prefers_longest_match():
+    index = PhraseIndex({"heart": "A", "heart failure": "B", "failure": "C"})
+    text = "Heart failure, then failure"
+    matches = [(text[start:end], value) for start, end, value in index.finditer(text)]
+    assert matches == [("Heart failure", "B"), ("failure", "C")]
+
+
+def test_bundled_simplification_lexicon_is_stable():
+    simplifier = TermSimplifier(load_lexicons(lexicon_paths("SIMPLIFY_LEXICON_PATH", "simplification_lexicon.tsv")))
+    assert simplifier.unstable() == []
+
+
+def test_simplifying_twice_changes_nothing():
+    simplifier = TermSimplifier(load_lexicons(lexicon_paths("SIMPLIFY_LEXICON_PATH", "simplification_lexicon.tsv")))
+    once = simplifier.simplify("LDL and HDL were checked; known hypertension and arthritis.")
+    assert simplifier.simplify(once) == once
+
+
+def test_unstable_replacement_is_reported():
+    assert TermSimplifier({"ldl": "bad cholesterol", "cholesterol": "blood fat"}).unstable() == ["ldl"]
+
+
+def test_entities_use_lexicon_spelling():
+    matcher = EntityMatcher(load_lexicons(lexicon_paths("ENTITY_LEXICON_PATH", "entity_lexicon.tsv")))
+    grouped = matcher.group("HBA1C 7.2%, hba1c repeated; ldl high")
+    assert grouped["CHEMICAL"] == ["HbA1c", "LDL"]
@@ -0,0 +1,58 @@
+import pytest
+
+from app import ocr
+
+BODY = "Haemoglobin 13.2 g/dL, white cell count 6.1, platelets 250. " * 5
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self):
+        return self.text
+
+
+@pytest.fixture
+def pdf_layers(monkeypatch):
+    """Make PdfReader return pages with the given text layers."""
+    def install(*texts):
+        class FakeReader:
+            def __init__(self, path):
+                self.pages = [FakePage(t) for t in texts]
+        monkeypatch.setattr("PyPDF2.PdfReader", FakeReader)
+    return install
+
+
+def fake_ocr(monkeypatch, results):
+    def ocr_pdf_pages(pdf_path, page_numbers, dpi, poppler_path=None, profile=None):
+        return [results[n] for n in page_numbers]
+    monkeypatch.setattr(ocr, "ocr_pdf_pages", ocr_pdf_pages)
+
+
+def test_failed_page_keeps_text_layer_and_no_error_text(pdf_layers, monkeypatch):
+    pdf_layers(BODY, "")
+    fake_ocr(monkeypatch, {2: (None, RuntimeError("Unable to get page count. Is poppler installed"))})
+    assert ocr.pdf_to_text("report.pdf") == BODY.strip()
+
+
+def test_whole_document_ocr_failure_falls_back_to_text_layer(pdf_layers, monkeypatch):
+    pdf_layers(BODY, "")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("Unable to get page count. Is poppler installed")
+    monkeypatch.setattr(ocr, "ocr_pdf_pages", fail)
+    assert ocr.pdf_to_text("report.pdf") == BODY.strip()
+
+
+def test_ocr_shorter_than_sparse_layer_is_ignored(pdf_layers, monkeypatch):
+    pdf_layers("Signed: Dr A. Smith, 12/03", "")
+    fake_ocr(monkeypatch, {1: ("Signed", None), 2: ("Page two scanned text", None)})
+    assert ocr.pdf_to_text("report.pdf") == "Signed: Dr A. Smith, 12/03\n\nPage two scanned text"
+
+
+def test_nothing_extracted_raises_diagnostic(pdf_layers, monkeypatch):
+    pdf_layers("", "")
+    fake_ocr(monkeypatch, {1: (None, RuntimeError("OCR failed")), 2: ("   ", None)})
+    with pytest.raises(RuntimeError, match="PDF Analysis Failed"):
+        ocr.pdf_to_text("report.pdf")
@@ -0,0 +1,80 @@
+import io
+
+import pytest
+
+
+class Calls(list):
+    """Uploads analyzed so far; .result overrides fields of the fake analysis."""
+
+
+@pytest.fixture
+def fake_pipeline(main, monkeypatch):
+    calls = Calls()
+
+    def analyze_document(upload_path, target, progress=None, ocr_profile=None):
+        calls.append(upload_path)
+        return dict({"raw_text": "HbA1c 7.1%", "summary": "Blood sugar is a bit high.", "vitals": {},
+                     "entities_pretty": {}, "translation": "", "translations": {}}, **calls.result)
+
+    calls.result = {}
+
+    monkeypatch.setattr(main, "analyze_document", analyze_document)
+    monkeypatch.setattr(main, "models_unavailable_response", lambda: None)
+    return calls
+
+
+def upload(client, data):
+    return client.post("/process", data={"file": (io.BytesIO(data), "report.png")},
+                       content_type="multipart/form-data")
+
+
+def report_count(main):
+    with main.app.app_context():
+        return main.db.session.execute(main.db.text("SELECT COUNT(*) FROM report")).scalar()
+
+
+def test_cache_hit_reuses_the_saved_report(main, client, fake_pipeline):
+    first = upload(client, b"same upload, first test").get_json()
+    again = upload(client, b"same upload, first test").get_json()
+    assert len(fake_pipeline) == 1
+    assert (first["cached"], again["cached"]) == (False, True)
+    assert again["id"] == first["id"]
+    assert again["created_at"] == first["created_at"]
+    assert report_count(main) == 1
+
+
+def test_cache_hit_saves_again_when_its_report_was_deleted(main, client, fake_pipeline):
+    first = upload(client, b"same upload, second test").get_json()
+    with main.app.app_context():
+        main.db.session.execute(main.db.text("DELETE FROM report"))
+        main.db.session.commit()
+    again = upload(client, b"same upload, second test").get_json()
+    third = upload(client, b"same upload, second test").get_json()
+    assert len(fake_pipeline) == 1
+    assert again["id"] != first["id"]
+    assert third["id"] == again["id"]
+    assert report_count(main) == 1
+
+
+@pytest.mark.parametrize("degraded", [
+    {"entities": {"warning": "NER model unavailable"}},
+    {"translation": "(English) Blood sugar is a bit high.",
+     "translations": {"ar": "(English) Blood sugar is a bit high."}},
+])
+def test_degraded_analysis_is_not_cached(main, client, fake_pipeline, degraded):
+    fake_pipeline.result = degraded
+    upload(client, b"degraded upload " + repr(sorted(degraded)).encode())
+    again = upload(client, b"degraded upload " + repr(sorted(degraded)).encode()).get_json()
+    assert len(fake_pipeline) == 2
+    assert again["cached"] is False
+
+
+def test_local_result_is_not_cached_while_gemini_is_configured(main, client, fake_pipeline, monkeypatch):
+    monkeypatch.setattr(main, "client", object())
+    fake_pipeline.result = {"timings": {"winner": "local"}}
+    upload(client, b"gemini timed out")
+    fake_pipeline.result = {"timings": {"winner": "gemini"}}
+    upload(client, b"gemini timed out")
+    again = upload(client, b"gemini timed out").get_json()
+    assert len(fake_pipeline) == 2
+    assert again["cached"] is True
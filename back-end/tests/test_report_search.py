@@ -0,0 +1,87 @@
+from sqlalchemy import create_engine, text
+
+from app.report_search import fts5_query, highlight_html, make_snippet, MATCH_END, MATCH_START, SqliteReportSearch
+
+
+def save(main, text, summary="Follow-up"):
+    with main.app.app_context():
+        report = main.Report(summary=summary, entities={"Medications": ["metformin"]})
+        report.set_text(text)
+        main.db.session.add(report)
+        main.db.session.commit()
+        return report.id
+
+
+def test_snippets_escape_report_html(main, client):
+    save(main, 'Started metformin today. <img src=x onerror=alert(1)> <script>alert(2)</script>')
+    results = client.get("/reports/search?q=metformin").get_json()["results"]
+    snippet = results[0]["snippet"]
+    assert "<img" not in snippet and "<script>" not in snippet
+    assert "&lt;img src=x onerror=alert(1)&gt;" in snippet
+    assert "<mark>metformin</mark>" in snippet
+
+
+def test_search_finds_compressed_text_and_pages(main, client):
+    ids = {save(main, f"Patient {i} has hypertension treated with lisinopril.") for i in range(3)}
+    first = client.get("/reports/search?q=lisinopril&limit=2").get_json()
+    assert len(first["results"]) == 2 and first["next_offset"] == 2
+    second = client.get("/reports/search?q=lisinopril&limit=2&offset=2").get_json()
+    assert second["next_offset"] is None
+    assert {r["id"] for r in first["results"] + second["results"]} == ids
+
+
+def test_highlight_html_escapes_before_marking():
+    assert highlight_html(f"a<b {MATCH_START}x&y{MATCH_END}") == "a&lt;b <mark>x&amp;y</mark>"
+    assert highlight_html(None) is None
+
+
+def test_fts5_query_quotes_terms_and_prefixes_last_word():
+    assert fts5_query('chest "type 2" diab') == '"chest" "type 2" "diab"*'
+    assert fts5_query('AND OR NOT ( *') == '"AND" "OR" "NOT"'
+    assert fts5_query("") == ""
+
+
+def test_maintenance_migrates_and_indexes_older_reports(main, client, monkeypatch):
+    # Reports stored before report_text and the search index existed
+    search = main.report_search
+    monkeypatch.setattr(main, "report_search", None)
+    with main.app.app_context():
+        old = [main.Report(legacy_text=f"Report {i}: warfarin dose adjusted.", summary="Follow-up") for i in range(3)]
+        main.db.session.add_all(old)
+        main.db.session.commit()
+        ids = {report.id for report in old}
+    assert client.get("/reports/search?q=warfarin").status_code == 501
+
+    monkeypatch.setattr(main, "report_search", search)
+    main.maintain_reports(batch_size=2)
+    with main.app.app_context():
+        assert all(main.db.session.get(main.Report, i).text_hash for i in ids)
+    results = client.get("/reports/search?q=warfarin").get_json()["results"]
+    assert {r["id"] for r in results} == ids
+
+
+def test_snippet_is_cut_from_the_report_around_matches():
+    body = "Intro words here. " * 10 + "Patient was treated with metformin for diabetes." + " Filler." * 20
+    snippet = make_snippet("treating diabetes", (body, "Follow-up", ""), size=8)
+    assert snippet.startswith("… ") and snippet.endswith(" …")
+    assert f"{MATCH_START}treated{MATCH_END} with metformin for {MATCH_START}diabetes{MATCH_END}" in snippet
+    # Falls through to the summary when only it matches
+    assert make_snippet("follow", (body, "Follow-up", "")) == f"{MATCH_START}Follow{MATCH_END}-up"
+
+
+def test_index_keeps_no_text_and_removes_reports(main, client):
+    report_id = save(main, "Started metformin today.")
+    with main.app.app_context():
+        conn = main.db.session.connection()
+        assert conn.execute(text("SELECT original_text FROM report_fts")).scalar() is None
+        main.report_search.remove_report(conn, report_id)
+        main.db.session.commit()
+    assert client.get("/reports/search?q=metformin").get_json()["results"] == []
+
+
+def test_setup_replaces_an_index_that_stores_text(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE VIRTUAL TABLE report_fts USING fts5(original_text, summary, entities)"))
+        SqliteReportSearch().setup(conn)
+        assert "content=''" in conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'report_fts'")).scalar()
@@ -0,0 +1,49 @@
+def add_reports(main, count, created_at=None):
+    with main.app.app_context():
+        for i in range(count):
+            report = main.Report(summary=f"report {i}")
+            report.set_text(f"body {i}")
+            main.db.session.add(report)
+        main.db.session.commit()
+        if created_at:
+            # The text form CURRENT_TIMESTAMP writes on SQLite
+            main.db.session.execute(main.db.text("UPDATE report SET created_at = :t"), {"t": created_at})
+            main.db.session.commit()
+
+
+def walk(client, limit):
+    ids, cursor, pages = [], None, 0
+    while True:
+        url = f"/reports?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        resp = client.get(url)
+        assert resp.status_code == 200
+        ids += [r["id"] for r in resp.get_json()]
+        pages += 1
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids, pages
+        assert pages < 50, "pagination does not terminate"
+
+
+def test_pages_cover_every_report_once_within_one_second(main, client):
+    add_reports(main, 5, created_at="2025-01-01 10:00:00")
+    ids, pages = walk(client, limit=2)
+    assert len(ids) == len(set(ids)) == 5
+    assert pages == 3
+
+
+def test_pages_follow_newest_first_order(main, client):
+    add_reports(main, 7)
+    with main.app.app_context():
+        main.db.session.execute(main.db.text(
+            "UPDATE report SET created_at = '2025-01-0' || (CAST(substr(summary, 8) AS INTEGER) % 3 + 1) || ' 09:30:00'"
+        ))
+        main.db.session.commit()
+    ids, _ = walk(client, limit=3)
+    full = [r["id"] for r in client.get("/reports?limit=100").get_json()]
+    assert ids == full
+    assert len(set(ids)) == 7
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/reports?cursor=not-a-cursor").status_code == 400
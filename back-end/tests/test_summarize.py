@@ -0,0 +1,42 @@
+import pytest
+
+
+@pytest.fixture
+def fake_summarizer(main, monkeypatch):
+    batches = []
+
+    def run_summarizer_many(texts, timeout=None, **options):
+        batches.append(list(texts))
+        # Keep only the section markers, so coverage shows in the final summary
+        return [" ".join(w.strip(".") for w in text.split() if w.startswith("Section")) + "." for text in texts]
+
+    monkeypatch.setattr(main, "summarizer", None)
+    monkeypatch.setattr(main, "run_summarizer_many", run_summarizer_many)
+    monkeypatch.setattr(main, "_summarize_once", lambda text: "FINAL " + text)
+    monkeypatch.setattr(main, "SUMMARY_CHUNK_TOKENS", 40)
+    monkeypatch.setattr(main, "SUMMARY_MAX_CHUNKS", 4)
+    return batches
+
+
+def _report(sections):
+    return " ".join(f"Section{i} " + "finding is stable today. " * 6 for i in range(sections))
+
+
+def test_every_chunk_is_summarized(main, fake_summarizer):
+    summary = main.summarize_hierarchical(_report(40))
+    assert len(fake_summarizer) > 10
+    assert max(len(batch) for batch in fake_summarizer) <= 4
+    assert summary.startswith("FINAL ")
+    assert set(summary.replace(".", "").split()[1:]) == {f"Section{i}" for i in range(40)}
+
+
+def test_short_text_is_summarized_once(main, fake_summarizer):
+    assert main.summarize_hierarchical("Short note.") == "FINAL Short note."
+    assert fake_summarizer == []
+
+
+def test_chunks_past_the_budget_keep_their_lead_sentences(main, fake_summarizer, monkeypatch):
+    monkeypatch.setattr(main, "SUMMARY_TIME_BUDGET", 0)
+    summary = main.summarize_hierarchical(_report(3))
+    assert fake_summarizer == []
+    assert all(f"Section{i} finding is stable today" in summary for i in range(3))
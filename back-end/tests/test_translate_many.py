@@ -0,0 +1,69 @@
+import pytest
+
+from app.analysis_cache import AnalysisCache
+
+
+class FakeBackend:
+    """Translates by tagging each segment with the language; records every call."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, segments, target_lang):
+        self.calls.append((list(segments), target_lang))
+        if self.fail:
+            raise RuntimeError("backend down")
+        return [f"<{target_lang}>{seg}" for seg in segments]
+
+
+class FakeAzure:
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, segments, langs):
+        self.calls.append((list(segments), list(langs)))
+        return {lang: [f"[{lang}]{seg}" for seg in segments] for lang in langs}
+
+
+@pytest.fixture
+def backend(main, monkeypatch, tmp_path):
+    fake = FakeBackend()
+    monkeypatch.setattr(main, "azure_translator", None)
+    monkeypatch.setattr(main, "translation_backends", lambda lang: [("fake", fake)])
+    monkeypatch.setattr(main, "translation_cache", AnalysisCache(tmp_path / "translations.db", memory_items=0))
+    return fake
+
+
+def test_order_and_whitespace_are_kept(main, backend):
+    text = "First line.  Second   line!\n\nThird?"
+    assert main.translate_many(text, ["fr"])["fr"] == "<fr>First line.  <fr>Second line!\n\n<fr>Third?"
+
+
+def test_repeated_sentences_are_translated_once_and_cached(main, backend):
+    text = "Take with food. Rest.\nTake   with food."
+    assert main.translate_many(text, ["de"])["de"] == "<de>Take with food. <de>Rest.\n<de>Take with food."
+    assert backend.calls == [(["Take with food.", "Rest."], "de")]
+
+    # A later report reuses the cached sentences and sends only the new one
+    assert main.translate_many("Rest. Drink water.", ["de"])["de"] == "<de>Rest. <de>Drink water."
+    assert backend.calls[1:] == [(["Drink water."], "de")]
+
+
+def test_azure_translates_every_language_in_one_call(main, backend, monkeypatch):
+    azure = FakeAzure()
+    monkeypatch.setattr(main, "azure_translator", azure)
+    results = main.translate_many("Hello. Bye.", ["fr", "en", "ar"])
+    assert results == {"fr": "[fr]Hello. [fr]Bye.", "en": "Hello. Bye.", "ar": "[ar]Hello. [ar]Bye."}
+    assert azure.calls == [(["Hello.", "Bye."], ["fr", "ar"])]
+    assert backend.calls == []
+
+
+def test_failing_backends_fall_back_to_english(main, backend):
+    backend.fail = True
+    results = main.translate_many("Hello.", ["fr", "x-1"])
+    assert results == {"fr": "(English) Hello.", "x-1": "Invalid target language code: x-1"}
+
+    # The fallback is not cached; the next call tries the backend again
+    backend.fail = False
+    assert main.translate_many("Hello.", ["fr"])["fr"] == "<fr>Hello."
@@ -14,10 +14,13 @@ const ReportDetail = () => {
   const { data: report, isLoading, error } = useQuery({
     queryKey: ['report', id],
     queryFn: async () => {
-      const { data } = await axios.get(`${API_BASE_URL}/reports`);
-      // backend currently surfaces list only; try to find by id
-      if (Array.isArray(data)) return data.find(r => String(r.id) === String(id)) || null;
-      return data;
+      try {
+        const { data } = await axios.get(`${API_BASE_URL}/reports/${encodeURIComponent(id)}`);
+        return data;
+      } catch (err) {
+        if (err.response && err.response.status === 404) return null;
+        throw err;
+      }
     },
   });
 
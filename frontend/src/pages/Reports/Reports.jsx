@@ -1,5 +1,5 @@
-import React, { useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import React, { useEffect, useState } from 'react';
+import { useInfiniteQuery, useQuery } from '@tanstack/react-query';
 import axios from 'axios';
 import { format } from 'date-fns';
 import { FileText, Search, Filter, ChevronRight, Activity } from 'lucide-react';
@@ -9,26 +9,42 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000
 
 const Reports = () => {
     const [searchTerm, setSearchTerm] = useState('');
+    const [query, setQuery] = useState('');
     const navigate = useNavigate();
 
-    const { data: reports, isLoading, error } = useQuery({
+    // Search on the server once typing pauses
+    useEffect(() => {
+        const timer = setTimeout(() => setQuery(searchTerm.trim()), 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
+    // /reports returns one page at a time; the next page's cursor comes back in X-Next-Cursor
+    const {
+        data: pages, isLoading, error, fetchNextPage, hasNextPage, isFetchingNextPage,
+    } = useInfiniteQuery({
         queryKey: ['reports'],
-        queryFn: async () => {
-            const { data } = await axios.get(`${API_BASE_URL}/reports`);
-            return data;
+        initialPageParam: null,
+        queryFn: async ({ pageParam }) => {
+            const { data, headers } = await axios.get(`${API_BASE_URL}/reports`, {
+                params: pageParam ? { cursor: pageParam } : {},
+            });
+            return { reports: Array.isArray(data) ? data : [], nextCursor: headers['x-next-cursor'] || null };
         },
+        getNextPageParam: (lastPage) => lastPage.nextCursor,
     });
 
-    const reportsArray = Array.isArray(reports) ? reports : [];
-
-    const filteredReports = reportsArray.filter((report) => {
-        if (!searchTerm) return true;
-        const lower = searchTerm.toLowerCase();
-        const nameMatch = report.patient_name?.toLowerCase().includes(lower);
-        const summaryMatch = report.summary?.toLowerCase().includes(lower);
-        return nameMatch || summaryMatch;
+    const { data: searchResults, isFetching: isSearching } = useQuery({
+        queryKey: ['reports-search', query],
+        enabled: Boolean(query),
+        queryFn: async () => {
+            const { data } = await axios.get(`${API_BASE_URL}/reports/search`, { params: { q: query, limit: 50 } });
+            return data.results || [];
+        },
     });
 
+    const reportsArray = pages ? pages.pages.flatMap((page) => page.reports) : [];
+    const filteredReports = query ? (searchResults || []) : reportsArray;
+
     if (isLoading) return (
         <div className="flex flex-col items-center justify-center p-12 space-y-4">
             <div className="w-12 h-12 border-4 border-cyan-500 border-t-transparent rounded-full animate-spin"></div>
@@ -79,6 +95,10 @@ const Reports = () => {
                             You don't have any analyzed reports yet. Go to the AI Assistant and upload a PDF or image to get started.
                         </p>
                     </div>
+                ) : query && isSearching && !searchResults ? (
+                    <div className="flex justify-center p-12">
+                        <div className="w-8 h-8 border-4 border-cyan-500 border-t-transparent rounded-full animate-spin"></div>
+                    </div>
                 ) : filteredReports.length === 0 ? (
                     <div className="p-12 glass-card rounded-3xl text-center space-y-4">
                         <div className="w-16 h-16 bg-gray-50 rounded-full flex items-center justify-center mx-auto">
@@ -136,6 +156,18 @@ const Reports = () => {
                     ))
                 )}
             </div>
+
+            {!query && hasNextPage && (
+                <div className="flex justify-center">
+                    <button
+                        className="px-6 py-2 glass border-gray-200 rounded-xl text-gray-700 font-medium hover:bg-white transition-colors disabled:opacity-50"
+                        onClick={() => fetchNextPage()}
+                        disabled={isFetchingNextPage}
+                    >
+                        {isFetchingNextPage ? 'Loading...' : 'Load more'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };